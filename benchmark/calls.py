@@ -0,0 +1,63 @@
+"""
+JinjaX Benchmark
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+
+Overhead of each component call: the component tags, compiled to a direct
+call, vs. the same tree written with the `{% call %}` and `{{ }}` calls to
+`catalog.irender()` the tags were rewritten to before.
+"""
+import tempfile
+import timeit
+from pathlib import Path
+
+from jinjax import Catalog
+
+
+number = 2_000
+DEPTH = 10
+WIDTH = 10
+
+TAGS = {
+    "Leaf.jinja": "{#def message #}<b>{{ message }}</b>",
+    "Box.jinja": "<div>{{ content }}</div>",
+    "Tree.jinja": f"""{{#def message #}}
+{"<Box>" * DEPTH}{{% for i in range({WIDTH}) %}}<Leaf message={{{{ message }}}} />{{% endfor %}}{"</Box>" * DEPTH}
+""",
+}
+
+BLOCK = '{% call(_slot="") catalog.irender("Box", __prefix=__prefix, **{}) -%}'
+INLINE = '{{ catalog.irender("Leaf", __prefix=__prefix, **{"message": message}) }}'
+CALLS = {
+    "Leaf.jinja": TAGS["Leaf.jinja"],
+    "Box.jinja": TAGS["Box.jinja"],
+    "Tree.jinja": f"""{{#def message #}}
+{BLOCK * DEPTH}{{% for i in range({WIDTH}) %}}{INLINE}{{% endfor %}}{"{%- endcall %}" * DEPTH}
+""",
+}
+
+# Number of components rendered by each call to `render("Tree")`
+COMPONENTS = 1 + DEPTH + WIDTH
+
+
+def new_catalog(files: dict[str, str]) -> Catalog:
+    folder = Path(tempfile.mkdtemp())
+    for name, source in files.items():
+        (folder / name).write_text(source)
+    catalog = Catalog(auto_reload=False)
+    catalog.add_folder(folder)
+    return catalog
+
+
+def print_line(name: str, time: float) -> None:
+    per_call = 1_000_000 * time / number / COMPONENTS
+    print(f"{name:<12} {per_call:>6.2f}µs per component")
+
+
+if __name__ == "__main__":
+    tags = new_catalog(TAGS)
+    calls = new_catalog(CALLS)
+    assert tags.render("Tree", message="Hi") == calls.render("Tree", message="Hi")
+
+    print(f"{COMPONENTS} components, {number:_} renders\n")
+    print_line("{% call %}", timeit.timeit(lambda: calls.render("Tree", message="Hi"), number=number))
+    print_line("tags", timeit.timeit(lambda: tags.render("Tree", message="Hi"), number=number))
@@ -0,0 +1,67 @@
+"""
+JinjaX Benchmark
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+
+Registering a folder of 2,000 components and loading the metadata of
+some of them, walking the folder and reading each component, or reading
+its `jinjax.index` file.
+"""
+import tempfile
+import timeit
+from functools import partial
+from pathlib import Path
+
+import jinjax
+from jinjax.component import Component
+from jinjax.resources import INDEX_NAME, write_index
+
+
+number = 5
+size = 2_000
+
+SOURCE = """{#def title, level=1 #}
+{#css card.css #}
+<div class="level-{{ level }}">{{ title }}</div>
+"""
+
+
+def make_library(root: Path) -> None:
+    for i in range(size):
+        folder = root / f"group{i % 40}"
+        folder.mkdir(exist_ok=True)
+        (folder / f"Card{i}.jinja").write_text(SOURCE)
+
+
+def register(root: Path, step: int) -> None:
+    catalog = jinjax.Catalog(auto_reload=False)
+    catalog.add_folder(root)
+    for i in range(0, size, step):
+        name = f"group{i % 40}.Card{i}"
+        path, relpath = catalog._get_component_path("", name, ".jinja")
+        # What `Catalog._get_from_file()` does, but without compiling it
+        metadata = catalog._indexed.get(("", str(path)))
+        Component(name=name, path=path, relpath=relpath, metadata=metadata)
+
+
+def print_line(name, time):
+    print(f"{name:<36} {(1_000 * time / number):>8.1f}ms per catalog")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_library(root)
+        print(f"{size:_} components, {number} catalogs\n")
+        for step in (size, 5, 1):
+            loaded = size // step
+            print_line(
+                f"walking, {loaded} loaded",
+                timeit.timeit(partial(register, root, step), number=number),
+            )
+        write_index(root, file_ext=".jinja")
+        for step in (size, 5, 1):
+            loaded = size // step
+            print_line(
+                f"with {INDEX_NAME}, {loaded} loaded",
+                timeit.timeit(partial(register, root, step), number=number),
+            )
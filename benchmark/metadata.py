@@ -0,0 +1,66 @@
+"""
+JinjaX Benchmark
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+
+Parsing the header of components with large comments.
+"""
+import re
+import timeit
+
+from jinjax.component import Component, get_header_end, parse_header
+
+
+number = 2_000
+
+DOCS = "\n".join(
+    f"  This line documents the component in great detail, #{i}." for i in range(200)
+)
+SOURCE = f"""
+{{#
+{DOCS}
+#}}
+{{#def
+  # Style
+  variant: str = "primary",
+  size: str = "md",
+  # Content
+  title: str = "",
+  items: list = [],
+  disabled: bool = false,
+#}}
+{{#css card.css, "shared/base.css" #}}
+{{#js card.js #}}
+<div class="card">{{{{ title }}}}</div>
+"""
+
+# The regular expression the header was parsed with before
+RX_META_HEADER = re.compile(r"^(\s*{#.*?#})+", re.DOTALL)
+
+
+def parse_uncached():
+    parse_header.cache_clear()
+    Component(name="Card", source=SOURCE)
+
+
+def parse_cached():
+    Component(name="Card", source=SOURCE)
+
+
+def find_header_regex():
+    RX_META_HEADER.match(SOURCE)
+
+
+def find_header_scanner():
+    get_header_end(SOURCE)
+
+
+def print_line(name, time):
+    print(f"{name:<28} {(1_000_000 * time / number):>8.1f}µs per call")
+
+
+if __name__ == "__main__":
+    print(f"Header of {len(SOURCE):,} characters, {number:_} calls\n")
+    print_line("find header (old regex)", timeit.timeit(find_header_regex, number=number))
+    print_line("find header (scanner)", timeit.timeit(find_header_scanner, number=number))
+    print_line("parse header (first time)", timeit.timeit(parse_uncached, number=number))
+    print_line("parse header (same header)", timeit.timeit(parse_cached, number=number))
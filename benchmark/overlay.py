@@ -0,0 +1,84 @@
+"""
+JinjaX Benchmark
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+
+Memory used by the catalogs of many tenants overriding one component of
+a shared library: a separate catalog for each one, or an overlay of a
+single catalog.
+"""
+import gc
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import jinjax
+
+
+tenants = 200
+size = 100
+
+PAGE = "<main>{}</main>".format("".join(f"<Card{i} title='Hi' />" for i in range(size)))
+CARD = """{#def title, level=1 #}
+<div class="level-{{ level }}"><Button>{{ title }}</Button></div>
+"""
+
+
+def make_library(root: Path) -> None:
+    (root / "Page.jinja").write_text(PAGE)
+    (root / "Button.jinja").write_text("<button>{{ content }}</button>")
+    for i in range(size):
+        (root / f"Card{i}.jinja").write_text(CARD)
+
+
+def make_tenant(root: Path, i: int) -> Path:
+    folder = root / f"tenant{i}"
+    folder.mkdir()
+    (folder / "Button.jinja").write_text(f"<button class=t{i}>{{{{ content }}}}</button>")
+    return folder
+
+
+def separate(library: Path, folders: list[Path]) -> list[jinjax.Catalog]:
+    catalogs = []
+    for folder in folders:
+        catalog = jinjax.Catalog(auto_reload=False)
+        catalog.add_folder(folder)
+        catalog.add_folder(library)
+        catalog.render("Page")
+        catalogs.append(catalog)
+    return catalogs
+
+
+def overlays(library: Path, folders: list[Path]) -> list[jinjax.Catalog]:
+    base = jinjax.Catalog(auto_reload=False)
+    base.add_folder(library)
+    base.render("Page")
+    catalogs = [base]
+    for folder in folders:
+        catalog = base.overlay(folder)
+        catalog.render("Page")
+        catalogs.append(catalog)
+    return catalogs
+
+
+def measure(func, library: Path, folders: list[Path]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    catalogs = func(library, folders)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalogs
+    return size / 1024 / 1024
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        library = root / "library"
+        library.mkdir()
+        make_library(library)
+        folders = [make_tenant(root, i) for i in range(tenants)]
+
+        print(f"{tenants} tenants, {size + 2} components\n")
+        for name, func in (("separate catalogs", separate), ("overlays", overlays)):
+            print(f"{name:<20} {measure(func, library, folders):>8.1f} MiB")
@@ -0,0 +1,92 @@
+"""
+JinjaX Benchmark
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+
+Rendering the components of a tenant, read from a folder or from a
+SQLite `ComponentStore`, and compiled from a `_source` on each call.
+"""
+import tempfile
+import timeit
+from functools import partial
+from pathlib import Path
+
+import jinjax
+from jinjax.store import ComponentStore
+
+
+number = 2_000
+size = 200
+
+SOURCE = """{#def title, level=1 #}
+{#css card.css #}
+<div class="level-{{ level }}"><Badge>{{ title }}</Badge></div>
+"""
+BADGE = "<span class=badge>{{ content }}</span>"
+
+
+def make_components() -> dict[str, str]:
+    components = {f"cards/Card{i}.jinja": SOURCE for i in range(size)}
+    components["Badge.jinja"] = BADGE
+    return components
+
+
+def render(catalog: jinjax.Catalog, i: int = 0) -> None:
+    catalog.render(f"cards.Card{i % size}", title="Hi")
+
+
+def render_source(catalog: jinjax.Catalog, i: int = 0) -> None:
+    # What we do today with the sources read from the database
+    catalog.render(f"cards.Card{i % size}", title="Hi", _source=SOURCE)
+
+
+def load_tenant(database: Path, preload: bool) -> None:
+    catalog = jinjax.Catalog(auto_reload=False)
+    store = catalog.add_store(database, namespace="acme")
+    if preload:
+        catalog.preload()
+    for i in range(size):
+        render(catalog, i)
+    store.close()
+
+
+def print_line(name, time, number=number):
+    print(f"{name:<36} {(1_000_000 * time / number):>8.1f}µs per render")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        components = make_components()
+        folder = root / "components"
+        for relpath, source in components.items():
+            path = folder / relpath
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(source)
+        database = root / "components.db"
+        store = ComponentStore(database, namespace="acme")
+        store.put_many(components)
+
+        print(f"{size} components, {number:_} renders\n")
+        catalogs = {}
+        for name, auto_reload in (("auto_reload", True), ("no auto_reload", False)):
+            from_folder = jinjax.Catalog(auto_reload=auto_reload)
+            from_folder.add_folder(folder)
+            from_store = jinjax.Catalog(auto_reload=auto_reload)
+            from_store.add_store(store)
+            catalogs[f"folder, {name}"] = (render, from_folder)
+            catalogs[f"store, {name}"] = (render, from_store)
+        from_source = jinjax.Catalog(auto_reload=False)
+        from_source.add_folder(folder)
+        catalogs["_source, no auto_reload"] = (render_source, from_source)
+
+        for name, (func, catalog) in catalogs.items():
+            for i in range(size):
+                func(catalog, i)  # Warm up
+            print_line(name, timeit.timeit(partial(func, catalog), number=number))
+
+        print(f"\nNew catalog rendering the {size} components once\n")
+        for preload in (False, True):
+            time = timeit.timeit(partial(load_tenant, database, preload), number=5)
+            name = "store, preloaded" if preload else "store, read one by one"
+            print_line(name, time, number=5 * size)
+        store.close()
@@ -0,0 +1,334 @@
+"""
+JinjaX Benchmark
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+
+Benchmark suite with regression tracking.
+
+    python suite.py run --out before.json
+    # ...change something...
+    python suite.py run --out after.json
+    python suite.py compare before.json after.json
+
+Each scenario is timed over many samples and reported as percentiles,
+plus the peak memory allocated by one run (measured separately with
+`tracemalloc`, so it doesn't affect the timings).
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import version
+from pathlib import Path
+
+from jinjax import Catalog
+
+
+HERE = Path(__file__).parent
+DEFAULT_THRESHOLD = 0.10
+
+# name -> (setup function, number of samples)
+SCENARIOS: dict[str, tuple[t.Callable[[Path], t.Callable[[], t.Any]], int]] = {}
+
+
+def scenario(samples: int):
+    def decorator(setup):
+        SCENARIOS[setup.__name__] = (setup, samples)
+        return setup
+    return decorator
+
+
+def write(folder: Path, name: str, source: str) -> None:
+    path = folder / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(source.strip())
+
+
+def new_catalog(folder: Path, **kwargs) -> Catalog:
+    catalog = Catalog(**kwargs)
+    catalog.add_folder(HERE)
+    catalog.add_folder(folder)
+    return catalog
+
+
+# Scenarios
+# ----------------------------------------------------------------------------
+
+@scenario(samples=50)
+def cold_compile(folder):
+    """A new catalog each time, so every component is loaded and compiled."""
+    def run():
+        new_catalog(folder).render("Real", message="Hey there")
+    return run
+
+
+@scenario(samples=2_000)
+def warm_render(folder):
+    catalog = new_catalog(folder, auto_reload=False)
+    return lambda: catalog.render("Real", message="Hey there")
+
+
+@scenario(samples=2_000)
+def inlined(folder):
+    """Small leaf components inlined into their parents."""
+    catalog = new_catalog(folder, auto_reload=False, inline_components=True)
+    return lambda: catalog.render("Real", message="Hey there")
+
+
+@scenario(samples=2_000)
+def auto_reload_on(folder):
+    catalog = new_catalog(folder, auto_reload=True)
+    return lambda: catalog.render("Real", message="Hey there")
+
+
+@scenario(samples=2_000)
+def auto_reload_off(folder):
+    catalog = new_catalog(folder, auto_reload=False)
+    return lambda: catalog.render("Real", message="Hey there")
+
+
+@scenario(samples=2_000)
+def no_cache(folder):
+    catalog = new_catalog(folder, use_cache=False)
+    return lambda: catalog.render("Real", message="Hey there")
+
+
+@scenario(samples=500)
+def deep_nesting(folder):
+    """50 levels of components, each one wrapping the next."""
+    depth = 50
+    for level in range(depth - 1):
+        write(folder, f"deep/Level{level}.jinja", f"""
+<div class="level-{level}"><deep.Level{level + 1}>{{{{ content }}}}</deep.Level{level + 1}></div>
+""")
+    write(folder, f"deep/Level{depth - 1}.jinja", "<p>{{ content }}</p>")
+    catalog = new_catalog(folder, auto_reload=False)
+    return lambda: catalog.render("deep.Level0", _content="bottom")
+
+
+@scenario(samples=20)
+def wide_list(folder):
+    """A list of 10,000 items."""
+    write(folder, "wide/Item.jinja", """
+{#def label #}
+<li>{{ label }}</li>
+""")
+    write(folder, "wide/List.jinja", """
+{#def items #}
+<ul>{% for item in items %}<wide.Item label={{ item }} />{% endfor %}</ul>
+""")
+    catalog = new_catalog(folder, auto_reload=False)
+    items = [f"Item {i}" for i in range(10_000)]
+    return lambda: catalog.render("wide.List", items=items)
+
+
+@scenario(samples=2_000)
+def html_attrs(folder):
+    """A component that receives, sets, and renders many attributes."""
+    write(folder, "attrs/Button.jinja", """
+{#def variant="primary", size="md" #}
+{% do attrs.set(class="btn btn-" + variant + " btn-" + size, type="button") %}
+{% do attrs.setdefault(data_variant=variant, aria_pressed="false") %}
+{% do attrs.add_class("rounded", "shadow") %}
+{% do attrs.remove_class("shadow") %}
+<button {{ attrs.render(role="button") }}>{{ content }}</button>
+""")
+    catalog = new_catalog(folder, auto_reload=False)
+    kwargs = {
+        "class": "foo bar baz",
+        "id": "main",
+        "disabled": True,
+        "data_foo": "1",
+        "data_bar": "2",
+        "aria_label": "Press me",
+        "hx_get": "/some/url",
+        "hx_target": "#main",
+    }
+    return lambda: catalog.render(
+        "attrs.Button", variant="danger", _content="Go", **kwargs
+    )
+
+
+@scenario(samples=2_000)
+def fingerprint(folder):
+    """Components with assets, with fingerprinted URLs."""
+    write(folder, "fp/Widget.jinja", """
+{#css fp/extra.css #}
+<div class="widget">{{ content }}</div>
+""")
+    write(folder, "fp/Widget.css", ".widget {}")
+    write(folder, "fp/Widget.js", "")
+    write(folder, "fp/extra.css", "")
+    catalog = new_catalog(folder, auto_reload=False, fingerprint=True)
+    return lambda: catalog.render("fp.Widget", _content="Hi")
+
+
+@scenario(samples=2_000)
+def render_assets(folder):
+    """A page that collects assets from many components and renders them."""
+    for i in range(10):
+        write(folder, f"assets/Part{i}.jinja", f"""
+{{#css assets/part{i}.css #}}
+{{#js assets/part{i}.js #}}
+<span>{i}</span>
+""")
+    parts = "".join(f"<assets.Part{i} />" for i in range(10))
+    write(folder, "assets/Page.jinja", f"""
+<html><head>{{{{ catalog.render_assets() }}}}</head><body>{parts}</body></html>
+""")
+    catalog = new_catalog(folder, auto_reload=False)
+    return lambda: catalog.render("assets.Page")
+
+
+@scenario(samples=500)
+def source(folder):
+    """Rendering from a `_source` string, compiled on every call."""
+    catalog = new_catalog(folder, auto_reload=False)
+    src = (HERE / "Real.jinja").read_text()
+    return lambda: catalog.render("Real", message="Hey there", _source=src)
+
+
+@scenario(samples=50)
+def threads(folder):
+    """8 threads rendering the same components at the same time."""
+    catalog = new_catalog(folder, auto_reload=False)
+    executor = ThreadPoolExecutor(max_workers=8)
+
+    def work(i):
+        for _ in range(50):
+            catalog.render("Real", message=f"Hey {i}")
+
+    return lambda: list(executor.map(work, range(8)))
+
+
+# Running
+# ----------------------------------------------------------------------------
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def measure(name: str, samples: int, quick: bool) -> dict[str, t.Any]:
+    setup, _ = SCENARIOS[name]
+    if quick:
+        samples = max(5, samples // 20)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        func = setup(Path(tmp))
+        func()  # warm up
+
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "samples": samples,
+        "min": timings[0],
+        "mean": statistics.fmean(timings),
+        "p50": percentile(timings, 50),
+        "p90": percentile(timings, 90),
+        "p99": percentile(timings, 99),
+        "max": timings[-1],
+        "memory_peak": peak,
+    }
+
+
+def run(names: list[str], quick: bool = False) -> dict[str, t.Any]:
+    results = {}
+    for name in names:
+        print(f"{name}...", end=" ", file=sys.stderr, flush=True)
+        results[name] = measure(name, SCENARIOS[name][1], quick)
+        print(f"p50 {results[name]['p50'] * 1e6:,.0f}µs", file=sys.stderr)
+
+    return {
+        "meta": {
+            "jinjax": version("jinjax"),
+            "jinja2": version("jinja2"),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float) -> list[str]:
+    """Prints a table comparing two runs and returns the names of the
+    scenarios whose median time or memory peak regressed more than
+    `threshold`."""
+    regressions = []
+    print(f"{'scenario':<16} {'p50 before':>12} {'p50 after':>12} {'change':>8}   {'memory':>8}")
+    for name, after in new["results"].items():
+        before = base["results"].get(name)
+        if not before:
+            print(f"{name:<16} {'-':>12} {after['p50'] * 1e6:>10,.0f}µs")
+            continue
+
+        change = after["p50"] / before["p50"] - 1
+        mem_change = (after["memory_peak"] + 1) / (before["memory_peak"] + 1) - 1
+        flag = ""
+        if change > threshold or mem_change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"{name:<16} {before['p50'] * 1e6:>10,.0f}µs {after['p50'] * 1e6:>10,.0f}µs"
+            f" {change:>+8.1%}   {mem_change:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--out", help="write the results as JSON to this file")
+    run_parser.add_argument(
+        "--only", nargs="+", choices=list(SCENARIOS), help="run only these scenarios"
+    )
+    run_parser.add_argument(
+        "--quick", action="store_true", help="take fewer samples (for smoke tests)"
+    )
+
+    compare_parser = subparsers.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help=f"relative change flagged as a regression (default {DEFAULT_THRESHOLD})",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        data = run(args.only or list(SCENARIOS), quick=args.quick)
+        output = json.dumps(data, indent=2)
+        if args.out:
+            Path(args.out).write_text(output)
+        else:
+            print(output)
+        return 0
+
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+    regressions = compare(base, new, args.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
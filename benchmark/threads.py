@@ -0,0 +1,63 @@
+"""
+JinjaX Benchmark
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+
+Stress test of rendering from many threads at the same time.
+Run it with a free-threaded build (e.g. `python3.13t`) to see
+the throughput scale with the number of threads.
+"""
+import sys
+import sysconfig
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from jinjax import Catalog
+
+
+HERE = Path(__file__).parent
+RENDERS_PER_THREAD = 2_000
+THREADS = (1, 4, 8, 16)
+
+catalog = Catalog(auto_reload=False)
+catalog.add_folder(HERE)
+
+
+def expected(i: int) -> str:
+    return catalog.render("Real", message=f"Hey {i}", _globals={"n": i})
+
+
+def work(i: int) -> int:
+    html = EXPECTED[i]
+    errors = 0
+    for _ in range(RENDERS_PER_THREAD):
+        out = catalog.render("Real", message=f"Hey {i}", _globals={"n": i})
+        if out != html:
+            errors += 1
+    return errors
+
+
+def run(num_threads: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        errors = sum(executor.map(work, range(num_threads)))
+    return time.perf_counter() - start, errors
+
+
+if __name__ == "__main__":
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    print(f"Python {sys.version.split()[0]}, free-threaded build: {free_threaded}, GIL enabled: {gil}\n")
+
+    EXPECTED = {i: expected(i) for i in range(max(THREADS))}
+    base = None
+    for num_threads in THREADS:
+        elapsed, errors = run(num_threads)
+        renders = num_threads * RENDERS_PER_THREAD
+        throughput = renders / elapsed
+        base = base or throughput
+        print(
+            f"{num_threads:>2} threads: {throughput:>10,.0f} renders/s "
+            f"({throughput / base:.1f}x), {errors} corrupted outputs"
+        )
+        assert not errors, "Some renders returned the wrong output"
@@ -13,12 +13,14 @@ from .exceptions import (
 )
 from .html_attrs import HTMLAttrs, LazyString
 from .jinjax import JinjaX
+from .store import ComponentStore
 
 
 __all__ = [
     "Catalog",
     "Component",
     "ComponentNotFound",
+    "ComponentStore",
     "DuplicateDefDeclaration",
     "HTMLAttrs",
     "InvalidArgument",
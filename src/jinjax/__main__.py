@@ -0,0 +1,98 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+
+    python -m jinjax check components/ ui=path/to/ui/components/
+    python -m jinjax index path/to/ui/components/
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from .catalog import DEFAULT_EXTENSION, Catalog
+from .resources import INDEX_NAME, build_index, dump_index, write_index
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="jinjax")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = subparsers.add_parser(
+        "check",
+        help="check the component calls without rendering anything",
+    )
+    check_parser.add_argument(
+        "folders",
+        nargs="+",
+        metavar="[PREFIX=]FOLDER",
+        help="a folder of components, optionally with a prefix",
+    )
+    check_parser.add_argument(
+        "--file-ext",
+        default=DEFAULT_EXTENSION,
+        help=f"extension of the component files (default {DEFAULT_EXTENSION})",
+    )
+
+    index_parser = subparsers.add_parser(
+        "index",
+        help=f"write the {INDEX_NAME} file of folders of components",
+    )
+    index_parser.add_argument(
+        "folders",
+        nargs="+",
+        metavar="FOLDER",
+        help="a folder of components",
+    )
+    index_parser.add_argument(
+        "--file-ext",
+        default=DEFAULT_EXTENSION,
+        help=f"extension of the component files (default {DEFAULT_EXTENSION})",
+    )
+    index_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="don't write anything, fail if an index is missing or outdated",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "index":
+        return index(args.folders, file_ext=args.file_ext, check=args.check)
+    return check(args.folders, file_ext=args.file_ext)
+
+
+def check(folders: list[str], *, file_ext: str) -> int:
+    catalog = Catalog(file_ext=file_ext)
+    for folder in folders:
+        prefix, _, path = folder.rpartition("=")
+        catalog.add_folder(path, prefix=prefix)
+
+    errors = catalog.check()
+    for error in errors:
+        print(error)
+    if errors:
+        print(f"{len(errors)} problem(s) found", file=sys.stderr)
+        return 1
+    return 0
+
+
+def index(folders: list[str], *, file_ext: str, check: bool = False) -> int:
+    outdated = 0
+    for folder in folders:
+        if not check:
+            print(write_index(folder, file_ext=file_ext))
+            continue
+
+        path = Path(folder) / INDEX_NAME
+        current = path.read_text("utf-8") if path.is_file() else None
+        if current != dump_index(build_index(folder, file_ext=file_ext)):
+            print(f"{path} is {'outdated' if current else 'missing'}")
+            outdated += 1
+
+    if outdated:
+        print(f"{outdated} index(es) to update", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,49 +2,101 @@
 JinjaX
 Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
 """
+import gc
 import os
+import random
 import typing as t
+import weakref
 from collections import UserString
+from contextlib import contextmanager
 from contextvars import ContextVar
 from hashlib import sha256
 from pathlib import Path
+from time import perf_counter
 
 import jinja2
 from markupsafe import Markup
 
+from . import stats as events
+from .check import CallError
 from .component import Component
 from .exceptions import ComponentNotFound, InvalidArgument, UnknownPrefix
 from .html_attrs import HTMLAttrs
-from .jinjax import JinjaX
+from .jinjax import CATALOG_VAR, JinjaX
+from .loaders import (
+    CatalogEnvironment,
+    CatalogLoader,
+    ComponentsLoader,
+    TemplateCache,
+    attach_environment,
+    get_template_name,
+)
+from .memo import DEFAULT_MEMO_SIZE, Memo, MemoEntry, MemoInfo
+from .metadata import MetadataCache
+from .profiler import (
+    CACHE_HIT,
+    CACHE_LOAD,
+    CACHE_SOURCE,
+    Profile,
+    active_profile,
+    lookup_status,
+    mark,
+)
+from .resources import Package, ResourceFile, read_index, with_url_prefix
+from .stats import Stats, StatsHook
+from .store import ComponentStore, StoredFile
+from .tracing import (
+    ATTR_CACHE,
+    ATTR_COMPONENT,
+    ATTR_OUTPUT_SIZE,
+    ATTR_PREFIX,
+    COMPONENT_SPAN,
+    DEFAULT_TRACE_DEPTH,
+    RENDER_SPAN,
+    Tracer,
+    trace_depth,
+)
 from .utils import (
     ARGS_PREFIX,
+    DEFAULT_PREFIX,
     DELIMITER,
+    PREFIX_SEP,
     SLASH,
     get_random_id,
     get_url_prefix,
     kebab_case,
     logger,
+    split_name,
 )
 
 
 if t.TYPE_CHECKING:
     from .middleware import ComponentsMiddleware
+    from .parallel import Job
+    from .resources import Anchor, Index
 
 
 DEFAULT_URL_ROOT = "/static/components/"
 ALLOWED_EXTENSIONS = (".css", ".js", ".mjs")
-DEFAULT_PREFIX = ""
 DEFAULT_EXTENSION = ".jinja"
+# The default of Jinja. The automatic size adds one entry per component.
+DEFAULT_TEMPLATE_CACHE_SIZE = 400
 ARGS_ATTRS = "attrs"
 ARGS_CONTENT = "content"
-PREFIX_SEP = ":"
 
 # Create ContextVars containers at module level
 collected_css: dict[int, ContextVar[list[str]]] = {}
 collected_js: dict[int, ContextVar[list[str]]] = {}
 tmpl_globals: dict[int, ContextVar[dict[str, t.Any]]] = {}
+emit_assets_later: dict[int, ContextVar[bool]] = {}
 
 RelPath = Path
+# A component file can also be inside a package archive
+ComponentPath = t.Union[Path, "ResourceFile"]
+# (order, path, relative path) of a component found in its folder. The
+# paths are strings until they are found, because building a `Path` for
+# every file of big folders takes longer than listing them.
+PathEntry = tuple[int, "str | ComponentPath", "str | RelPath"]
 
 
 class CallerWrapper(UserString):
@@ -98,6 +150,21 @@ class Catalog:
             Custom Jinja environment to use. This argument is useful to reuse
             an existing Jinja Environment from your web framework.
 
+        attach:
+            If `True`, instead of copying the extensions, globals, filters,
+            and tests of the `jinja_env` into a new environment, the catalog
+            uses that environment itself. Its settings (like `autoescape`,
+            `undefined`, or `bytecode_cache`) and its cache are shared, and
+            its templates can call components. Only the extension and the
+            loader of the components are added; the templates that are not
+            components are still found with its original loader, and those
+            it had already compiled are compiled again, with the tags of
+            the components. Each render of one of those templates starts
+            with empty `collected_css` and `collected_js` lists, like
+            `Catalog.render()`, so it can use `catalog.render_assets()`.
+            An environment can have only one catalog attached. The default
+            is `False`.
+
         root_url:
             Add this prefix to every asset URL of the static middleware.
             By default, it is `/static/components/`, so, for example,
@@ -119,6 +186,9 @@ class Catalog:
             component file is checked every time to see if the cache
             is up-to-date.
 
+            If `False`, a component that wasn't found isn't searched for
+            again (until a folder is added).
+
             Set to `False` in production.
 
         fingerprint:
@@ -132,6 +202,72 @@ class Catalog:
             **WARNING**: Only works if the server knows how to filter the
             fingerprint to get the real name of the file.
 
+        memo_size:
+            Maximum number of rendered outputs of *pure* components to keep
+            in memory. A component is declared pure by adding a `{#pure#}`
+            comment to its header, meaning its output depends only on its
+            arguments and content. Calls with arguments that aren't
+            strings, numbers, booleans, `None`, or tuples of those are
+            never memoized, and neither is anything with `auto_reload`,
+            because the subcomponents could have changed. Set to `0`
+            to disable.
+
+        check_calls:
+            If `True`, the component tags are checked when a template is
+            compiled, raising a `TemplateSyntaxError` if the component
+            can't be found or a required argument is missing, instead of
+            failing only when the call is rendered. See also `Catalog.check()`.
+
+        inline_components:
+            If `True`, small components called without content are
+            inlined into the compiled code of their parents, instead of
+            being rendered with a call, if they don't have subcomponents,
+            and every variable they use is one of their declared arguments
+            (not even a global of the environment), all of them passed in
+            the tag or with a string, finite number, boolean, or `None`
+            default. Pure components are never inlined. Their assets are
+            still collected.
+
+            An inlined component doesn't appear in the profiles, stats,
+            or traces, and isn't inlined if the Jinja environment has a
+            bytecode cache.
+
+        template_cache_size:
+            Maximum number of compiled templates kept by the Jinja
+            environment. By default, it is 400 plus the number of
+            components found, so it grows with the catalog instead of
+            evicting (and compiling again) components in use. Set to
+            `0` to disable it. With `attach`, the cache of the environment
+            is used as it is, unless a size is given.
+
+        metadata_cache:
+            Path of a file to persist the parsed metadata of the components
+            (arguments and assets), so other processes using the same
+            components don't need to read and parse each one again.
+            The file is read when the catalog is created, and written by
+            `Catalog.save_metadata()`. Each entry is invalidated when the
+            size or last-modified time of its component file changes, or
+            a CSS or JS file with its name is added or removed.
+
+        collect_stats:
+            If `True`, counts the cache hits and misses, lookups of
+            component files, compilations, etc. See `Catalog.stats()`.
+
+        tracer:
+            An OpenTelemetry tracer, like `opentelemetry.trace.get_tracer("jinjax")`,
+            (or any object with a compatible `start_as_current_span()` method).
+            If set, a span is opened for each `Catalog.render()` call, with the
+            component name and prefix, whether it was cached, and the size of
+            the output as attributes.
+
+        trace_depth:
+            Used with `tracer`. How many levels of subcomponents get their own
+            nested span. With `0`, only the call to `Catalog.render()` is traced.
+
+        trace_sample_rate:
+            Used with `tracer`. The fraction, between 0 and 1, of the calls to
+            `Catalog.render()` that are traced.
+
     Attributes:
 
         collected_css:
@@ -143,6 +279,18 @@ class Catalog:
         prefixes:
             Mapping between folder prefixes and the Jinja loader that uses.
 
+    Thread safety:
+
+        A catalog can render in many threads at the same time, including on
+        free-threaded (no-GIL) builds of Python. The state of each render
+        (collected assets, globals) is kept in context variables, and
+        nothing shared is modified while rendering, other than adding
+        entries to the caches.
+
+        With `use_cache=True` and `auto_reload=False`, rendering an already
+        loaded component only reads shared data, without locks. Pure
+        components (see `memo_size`) use a lock to update their cache.
+
     """
 
     __slots__ = (
@@ -153,11 +301,28 @@ class Catalog:
         "fingerprint",
         "auto_reload",
         "use_cache",
+        "check_calls",
+        "inline_components",
+        "template_cache_size",
+        "tracer",
+        "trace_depth",
+        "trace_sample_rate",
         "_cache",
+        "_paths",
+        "_missing",
+        "_indexed",
+        "_resolved",
+        "_generation",
+        "_calls",
+        "_memo",
+        "_metadata",
+        "_stats",
         "_key",
-        # placeholders for delayed asset injection
+        "_parent",
+        "_overlays",
+        # placeholder for delayed asset injection
         "_assets_placeholder",
-        "_emit_assets_later",
+        "__weakref__",
     )
 
     def __init__(
@@ -168,28 +333,58 @@ class Catalog:
         tests: dict[str, t.Any] | None = None,
         extensions: list | None = None,
         jinja_env: jinja2.Environment | None = None,
+        attach: bool = False,
         root_url: str = DEFAULT_URL_ROOT,
         file_ext: str = DEFAULT_EXTENSION,
         use_cache: bool = True,
         auto_reload: bool = True,
         fingerprint: bool = False,
+        memo_size: int = DEFAULT_MEMO_SIZE,
+        check_calls: bool = False,
+        inline_components: bool = False,
+        template_cache_size: int | None = None,
+        metadata_cache: "str | os.PathLike[str] | None" = None,
+        collect_stats: bool = False,
+        tracer: "Tracer | None" = None,
+        trace_depth: int = DEFAULT_TRACE_DEPTH,
+        trace_sample_rate: float = 1.0,
     ) -> None:
-        self.prefixes: dict[str, jinja2.FileSystemLoader] = {}
+        self.prefixes: dict[str, ComponentsLoader] = {}
         self.file_ext = file_ext or DEFAULT_EXTENSION
         self.use_cache = use_cache
         self.auto_reload = auto_reload
         self.fingerprint = fingerprint
+        self.check_calls = check_calls
+        self.inline_components = inline_components
+        self.template_cache_size = template_cache_size
+        self.tracer = tracer
+        self.trace_depth = trace_depth
+        self.trace_sample_rate = trace_sample_rate
 
         root_url = root_url.strip().rstrip(SLASH)
         self.root_url = f"{root_url}{SLASH}"
 
-        env = jinja2.Environment(undefined=jinja2.StrictUndefined)
+        if attach:
+            if jinja_env is None:
+                raise ValueError("`attach` requires a `jinja_env` to attach to")
+            env = attach_environment(
+                jinja_env, CatalogLoader(self.prefixes, parent=jinja_env.loader)
+            )
+        else:
+            env = CatalogEnvironment(
+                undefined=jinja2.StrictUndefined,
+                loader=CatalogLoader(self.prefixes),
+            )
         extensions = [*(extensions or []), "jinja2.ext.do", JinjaX]
         globals = globals or {}
         filters = filters or {}
         tests = tests or {}
 
-        if jinja_env:
+        if attach:
+            # The templates of the environment that call components aren't
+            # components themselves, so they have no prefix.
+            globals.setdefault(ARGS_PREFIX, DEFAULT_PREFIX)
+        elif jinja_env:
             env.extensions.update(jinja_env.extensions)
             env.autoescape = jinja_env.autoescape
             globals.update(jinja_env.globals)
@@ -209,120 +404,103 @@ class Catalog:
         env.filters.update(filters)
         env.tests.update(tests)
         env.extend(catalog=self)
+        if template_cache_size is None and not attach:
+            template_cache_size = DEFAULT_TEMPLATE_CACHE_SIZE
+        # Attached, the cache of the environment is kept, with what's in
+        # it, unless a size is given.
+        if template_cache_size is not None:
+            env.cache = (
+                TemplateCache(template_cache_size, on_evict=self._on_template_evicted)
+                if template_cache_size > 0
+                else None
+            )
 
         self.jinja_env = env
 
         self._cache: dict[str, dict] = {}
-        self._key = id(self)
-        # prepare delayed asset injection: placeholder and flag
-        self._assets_placeholder = f"@@jinjax_assets_{self._key}@@"
-        self._emit_assets_later = False
+        # Component names split into prefix and name
+        # (prefix, file_ext) -> every name of a component -> its path
+        self._paths: dict[tuple[str, str], dict[str, PathEntry]] = {}
+        # Cache keys of the components not found. Only used without
+        # `auto_reload`, because otherwise the file could be created later.
+        self._missing: set[str] = set()
+        # (prefix, path of a component) -> its metadata, read from the index
+        # of its folder. Only used without `auto_reload`, like the index itself.
+        self._indexed: dict[tuple[str, str], dict[str, t.Any]] = {}
+        # (name, caller prefix, file extension) -> (generation, component).
+        # Only used without `auto_reload`. The entries of older generations
+        # are ignored, which is how they are invalidated.
+        self._resolved: dict[tuple[str, str, str], tuple[int, Component]] = {}
+        self._generation = 0
+        # Template name -> the tags of the components it calls, as written.
+        # Recorded when a template is compiled, or read by `get_dependencies()`.
+        self._calls: dict[str, frozenset[str]] = {}
+        self._memo = Memo(memo_size)
+        self._metadata = MetadataCache(metadata_cache) if metadata_cache else None
+        self._stats = Stats() if collect_stats else None
+        # The catalog this one overlays (see `overlay()`), if any,
+        # and the overlays of this one, to forget what they took from it.
+        self._parent: Catalog | None = None
+        self._overlays: weakref.WeakSet[Catalog] = weakref.WeakSet()
+        self._key = key = id(self)
+        # The per-render state lives in context variables, created here,
+        # so concurrent renders in different threads never share it.
+        collected_css[key] = ContextVar(f"collected_css_{key}")
+        collected_js[key] = ContextVar(f"collected_js_{key}")
+        tmpl_globals[key] = ContextVar(f"tmpl_globals_{key}")
+        emit_assets_later[key] = ContextVar(f"emit_assets_later_{key}")
+        # prepare delayed asset injection
+        self._assets_placeholder = f"@@jinjax_assets_{key}@@"
 
     def __del__(self) -> None:
         # Safely clean up context variables associated with this catalog
         try:
             key = self._key
-            # Clean up the collected_css
-            if key in collected_css:
-                del collected_css[key]
-
-            # Clean up the collected_js
-            if key in collected_js:
-                del collected_js[key]
-
-            # Clean up the tmpl_globals
-            if key in tmpl_globals:
-                del tmpl_globals[key]
+            for containers in (
+                collected_css, collected_js, tmpl_globals, emit_assets_later
+            ):
+                containers.pop(key, None)
         except Exception:
             # Ignore exceptions during cleanup
             pass
 
     @property
     def collected_css(self) -> list[str]:
-        key = self._key
-        if key not in collected_css:
-            name = f"collected_css_{key}"
-            collected_css[key] = ContextVar(name)
-            value = []
-            collected_css[key].set(value)
-            return value
-
-        try:
-            # Make a defensive copy to avoid shared references
-            return list(collected_css[key].get())
-        except (KeyError, LookupError):
-            # Handle case where the ContextVar exists but no value was set
-            value = []
-            collected_css[key].set(value)
-            return value
+        # Make a defensive copy to avoid shared references
+        return list(collected_css[self._key].get(()))
 
     @collected_css.setter
     def collected_css(self, value: list[str]) -> None:
-        key = self._key
-        if key not in collected_css:
-            name = f"collected_css_{key}"
-            collected_css[key] = ContextVar(name)
-
         # Make a defensive copy to avoid shared references
-        collected_css[key].set(list(value))
+        collected_css[self._key].set(list(value))
 
     @property
     def collected_js(self) -> list[str]:
-        key = self._key
-        if key not in collected_js:
-            name = f"collected_js_{key}"
-            collected_js[key] = ContextVar(name)
-            value = []
-            collected_js[key].set(value)
-            return value
-
-        try:
-            # Make a defensive copy to avoid shared references
-            return list(collected_js[key].get())
-        except (KeyError, LookupError):
-            # Handle case where the ContextVar exists but no value was set
-            value = []
-            collected_js[key].set(value)
-            return value
+        # Make a defensive copy to avoid shared references
+        return list(collected_js[self._key].get(()))
 
     @collected_js.setter
     def collected_js(self, value: list[str]) -> None:
-        key = self._key
-        if key not in collected_js:
-            name = f"collected_js_{key}"
-            collected_js[key] = ContextVar(name)
-
         # Make a defensive copy to avoid shared references
-        collected_js[key].set(list(value))
+        collected_js[self._key].set(list(value))
 
     @property
     def tmpl_globals(self) -> dict[str, t.Any]:
-        key = self._key
-        if key not in tmpl_globals:
-            name = f"tmpl_globals_{key}"
-            tmpl_globals[key] = ContextVar(name)
-            value = {}
-            tmpl_globals[key].set(value)
-            return value
-
-        try:
-            # Make a defensive copy to avoid shared references
-            return dict(tmpl_globals[key].get())
-        except (KeyError, LookupError):
-            # Handle case where the ContextVar exists but no value was set
-            value = {}
-            tmpl_globals[key].set(value)
-            return value
+        # Make a defensive copy to avoid shared references
+        return dict(tmpl_globals[self._key].get(None) or {})
 
     @tmpl_globals.setter
     def tmpl_globals(self, value: dict[str, t.Any]) -> None:
-        key = self._key
-        if key not in tmpl_globals:
-            name = f"tmpl_globals_{key}"
-            tmpl_globals[key] = ContextVar(name)
-
         # Make a defensive copy to avoid shared references
-        tmpl_globals[key].set(dict(value))
+        tmpl_globals[self._key].set(dict(value))
+
+    @property
+    def _emit_assets_later(self) -> bool:
+        return emit_assets_later[self._key].get(False)
+
+    @_emit_assets_later.setter
+    def _emit_assets_later(self, value: bool) -> None:
+        emit_assets_later[self._key].set(value)
 
     @property
     def paths(self) -> list[Path]:
@@ -332,12 +510,18 @@ class Catalog:
         """
         _paths = []
         for loader in self.prefixes.values():
-            _paths.extend(loader.searchpath)
+            for root in loader.searchpath:
+                if isinstance(root, Package):
+                    # Only the packages in the filesystem have a path
+                    if root.path is not None:
+                        _paths.append(root.path)
+                else:
+                    _paths.append(root)
         return _paths
 
     def add_folder(
         self,
-        root_path: str | Path,
+        root_path: "str | os.PathLike[str]",
         *,
         prefix: str = DEFAULT_PREFIX,
     ) -> None:
@@ -373,19 +557,191 @@ class Catalog:
         added **first** takes precedence. You can use this to override components loaded
         from a library: just add your folder first.
 
+        Without `auto_reload`, if the folder has a `jinjax.index` file, written with
+        `python -m jinjax index FOLDER`, the components are found by reading only that
+        file instead of walking the folder, and their metadata is read from it instead
+        of from each component. Write it again every time the components change, for
+        example, when building a release of a library (`--check` fails if outdated).
+
+        """
+        self._add_root(os.fspath(root_path), prefix=prefix)
+
+    def add_package(
+        self,
+        anchor: "Anchor",
+        *,
+        prefix: str = DEFAULT_PREFIX,
+    ) -> None:
+        """
+        Add the components folder of a Python package, optionally under a
+        prefix. The files are read with `importlib.resources`, so they can
+        be loaded even if the package is inside a zip file (like a zipapp
+        or a PEX) without extracting it.
+
+        Arguments:
+
+            anchor:
+                The name of the package with the components, like
+                `"mylib.components"`, the package itself, or any
+                `importlib.resources` traversable, for example,
+                `zipfile.Path("mylib.zip", at="components/")`.
+
+            prefix:
+                Optional prefix that all the components in the package will
+                have. The default is empty.
+
+        If the folder has a `jinjax.index` file (see `Catalog.add_folder()`),
+        or one just listing the relative path of each file in it (components
+        and assets), one per line, the components are found by reading only
+        that file, instead of walking the folders of the package. Their
+        sources are read when they are first used.
+
+        Everything else works like with `Catalog.add_folder()`, including
+        which component takes precedence if more than one has the same name
+        under the same prefix. The assets of a package inside a zip file
+        aren't served by the middleware.
+
+        """
+        self._add_root(Package(anchor), prefix=prefix)
+
+    def add_store(
+        self,
+        store: "ComponentStore | str | os.PathLike[str]",
+        *,
+        prefix: str = DEFAULT_PREFIX,
+        namespace: str = "",
+    ) -> ComponentStore:
         """
+        Add the components stored in a SQLite database, optionally under
+        a prefix, like a folder. Returns the store, to add, replace, or
+        delete its components (see `ComponentStore`).
+
+        Arguments:
+
+            store:
+                A `ComponentStore`, or the path of the database file,
+                created if it doesn't exist.
+
+            prefix:
+                Optional prefix that all the components in the store will
+                have. The default is empty.
+
+            namespace:
+                If `store` is a path, the namespace of the components in the
+                database to use, for example, the ID of a tenant.
+
+        The components are compiled once and reloaded only when their
+        version changes: with `auto_reload`, that is checked with a single
+        query every time one is rendered; without it, when calling
+        `Catalog.preload()`.
+
+        Like a folder, a store added after another one with the same prefix
+        can't override its components, so add the store of the tenant
+        before the folder of default components.
+
+        """
+        if not isinstance(store, ComponentStore):
+            store = ComponentStore(store, namespace=namespace)
+        self._add_root(store, prefix=prefix)
+        return store
+
+    def overlay(
+        self,
+        folders: "str | os.PathLike[str] | t.Iterable[str | os.PathLike[str]]" = (),
+        *,
+        prefix: str = DEFAULT_PREFIX,
+    ) -> "Catalog":
+        """
+        Returns a lightweight catalog that searches for the components
+        first in its own folders and then in this catalog, for example,
+        to let each tenant of an application override some components
+        of a shared library.
+
+        Everything that isn't overridden is shared with this catalog: the
+        compiled templates, the metadata, and where each component was
+        found. So, instead of growing with the size of the library, each
+        overlay costs roughly the size of the components it overrides.
+
+        Arguments:
+
+            folders:
+                A folder, or a list of folders, with the components that
+                take precedence over those of this catalog.
+
+            prefix:
+                Optional prefix of the components in `folders`. The default
+                is empty. More folders, packages, or stores can be added
+                to the overlay later, under any prefix.
+
+        The overlay has the same settings as this catalog. Its collected
+        assets and its cache of pure components are its own, because a
+        component of this catalog that calls an overridden one renders
+        the overridden one when it's rendered through the overlay.
+
+        A component compiled by this catalog with another one inlined
+        into it (see `inline_components`) is compiled again by the
+        overlay, in case the inlined component was overridden.
+
+        """
+        overlay = Catalog(
+            root_url=self.root_url,
+            file_ext=self.file_ext,
+            use_cache=self.use_cache,
+            auto_reload=self.auto_reload,
+            fingerprint=self.fingerprint,
+            memo_size=self._memo.maxsize,
+            check_calls=self.check_calls,
+            inline_components=self.inline_components,
+            template_cache_size=self.template_cache_size,
+            tracer=self.tracer,
+            trace_depth=self.trace_depth,
+            trace_sample_rate=self.trace_sample_rate,
+        )
+        env = self.jinja_env
+        loader = env.loader
+        assert isinstance(loader, CatalogLoader)
+        # Shares the extensions, globals, filters, bytecode cache, etc.
+        # but with its own loader and cache of compiled templates.
+        overlay_env = env.overlay(loader=CatalogLoader(overlay.prefixes, parent=loader))
+        overlay_env.cache = overlay.jinja_env.cache
+        overlay_env.catalog = overlay  # type: ignore
+        overlay.jinja_env = overlay_env
+        overlay._metadata = self._metadata
+        overlay._stats = self._stats
+        overlay._parent = self
+        self._overlays.add(overlay)
+
+        if isinstance(folders, str | os.PathLike):
+            folders = [folders]
+        for folder in folders:
+            overlay.add_folder(folder, prefix=prefix)
+        return overlay
+
+    def _add_root(self, root: "str | Package", *, prefix: str) -> None:
         prefix = prefix.strip().strip(f"{DELIMITER}{SLASH}").replace(SLASH, DELIMITER)
 
-        root_path = str(root_path)
+        self._paths.clear()
+        self._indexed.clear()
+        self._forget_lookups()
         if prefix in self.prefixes:
             loader = self.prefixes[prefix]
-            if root_path in loader.searchpath:
+            if str(root) in map(str, loader.searchpath):
                 return
-            logger.debug(f"Adding folder `{root_path}` with the prefix `{prefix}`")
-            loader.searchpath.append(root_path)
+            logger.debug(f"Adding folder `{root}` with the prefix `{prefix}`")
+            loader.searchpath.append(root)  # type: ignore
         else:
-            logger.debug(f"Adding folder `{root_path}` with the prefix `{prefix}`")
-            self.prefixes[prefix] = jinja2.FileSystemLoader(root_path)
+            logger.debug(f"Adding folder `{root}` with the prefix `{prefix}`")
+            loader = ComponentsLoader([])
+            loader.searchpath.append(root)  # type: ignore
+            self.prefixes[prefix] = loader
+
+    def _forget_lookups(self) -> None:
+        """Forgets which component each call resolved to, and which ones
+        weren't found, here and in the overlays of this catalog."""
+        self._missing.clear()
+        self._generation += 1
+        for overlay in list(self._overlays):
+            overlay._forget_lookups()
 
     def add_module(self, module: t.Any, *, prefix: str = DEFAULT_PREFIX) -> None:
         """
@@ -431,12 +787,32 @@ class Catalog:
         self.collected_css = []
         self.collected_js = []
         self.tmpl_globals = kw.pop("_globals", kw.pop("__globals", None)) or {}
-        out = self.irender(__name, caller=caller, **kw)
+        if self.tracer is not None and random.random() < self.trace_sample_rate:
+            out = self._irender_traced(RENDER_SPAN, 0, __name, caller=caller, **kw)
+        else:
+            out = self.irender(__name, caller=caller, **kw)
         if self._emit_assets_later:
             # inject full assets bundle in place of the placeholder
             out = self._finalize_assets(out)
         return out
 
+    def _render_host(
+        self,
+        render: t.Callable[..., str],
+        /,
+        *args: t.Any,
+        **kwargs: t.Any,
+    ) -> str:
+        """Renders a template of the attached environment that isn't a
+        component, resetting the collected assets like `render()`."""
+        self.collected_css = []
+        self.collected_js = []
+        self.tmpl_globals = {}
+        out = render(*args, **kwargs)
+        if self._emit_assets_later:
+            out = self._finalize_assets(out)
+        return out
+
     def irender(
         self,
         /,
@@ -453,68 +829,443 @@ class Catalog:
         are later inserted into a parent template.
 
         """
-        content = (kw.pop("_content", kw.pop("__content", "")) or "").strip()
-        attrs = kw.pop("_attrs", kw.pop("__attrs", None)) or {}
+        if self.tracer is not None:
+            depth = trace_depth.get()
+            if depth is not None and depth < self.trace_depth:
+                return self._irender_traced(
+                    COMPONENT_SPAN, depth + 1, __name, caller=caller, **kw
+                )
+
+        profile = active_profile.get()
+        if profile is not None:
+            return self._irender_profiled(profile, __name, caller=caller, **kw)
+
+        component = self._find_component(__name, kw)
+        self._collect_assets(component)
+        return self._render_call(component, kw, caller=caller)
+
+    def _render_tag(
+        self,
+        name: str,
+        prefix: str,
+        kw: dict[str, t.Any],
+        caller: t.Callable | None = None,
+    ) -> str:
+        """Renders a component tag. The code compiled from the tags calls
+        this instead of `irender()`, with a new dictionary of arguments,
+        so they don't need to be unpacked and packed again."""
+        kw[ARGS_PREFIX] = prefix
+        if self.tracer is not None or active_profile.get() is not None:
+            return self.irender(name, caller=caller, **kw)
+
+        component = self._find_component(name, kw)
+        self._collect_assets(component)
+        return self._render_call(component, kw, caller=caller)
+
+    def _collect_inlined(self, name: str, caller_prefix: str) -> None:
+        """Collects the assets of an inlined component."""
+        component = self._find_component(name, {ARGS_PREFIX: caller_prefix})
+        self._collect_assets(component)
+
+    def render_many(
+        self,
+        /,
+        __name: str,
+        rows: t.Iterable[dict[str, t.Any]],
+        *,
+        sep: str = "",
+        **kw,
+    ) -> str:
+        """
+        Resets the `collected_css` and `collected_js` lists and renders the
+        component once for each dictionary of arguments in `rows`.
 
-        component = self._get_component(__name, **kw)
-        root_path = component.root_path
+        See `Catalog.irender_many()`.
 
-        # Get current assets lists
-        css_list = self.collected_css
-        js_list = self.collected_js
+        """
+        self.collected_css = []
+        self.collected_js = []
+        self.tmpl_globals = kw.pop("_globals", kw.pop("__globals", None)) or {}
+        out = self.irender_many(__name, rows, sep=sep, **kw)
+        if self._emit_assets_later:
+            out = self._finalize_assets(out)
+        return out
 
-        # Process CSS assets
-        css_to_add = []
-        for url in component.css:
-            if (
-                root_path
-                and self.fingerprint
-                and not url.startswith(("http://", "https://"))
-            ):
-                url = self._fingerprint(root_path, url)
+    def irender_many(
+        self,
+        /,
+        __name: str,
+        rows: t.Iterable[dict[str, t.Any]],
+        *,
+        sep: str = "",
+        **kw,
+    ) -> str:
+        """
+        Renders the component once for each dictionary of arguments in
+        `rows`, **without** resetting the `collected_css` and `collected_js`
+        lists, and returns the results joined by `sep`.
 
-            if url not in css_list:
-                css_to_add.append(url)
+        The component is found, and its assets collected, only once for the
+        whole batch, unless it's being profiled or traced, so each row
+        appears as a call. Any extra keyword argument is passed to every row,
+        unless the row overrides it. A row can also have `_content` and
+        `_attrs` keys.
 
-        # Update CSS assets in one operation if needed
-        if css_to_add:
-            new_css = list(css_list)
-            new_css.extend(css_to_add)
-            self.collected_css = new_css
+        This is the method to use to render a long list of the same component.
+        From a template:
 
-        # Process JS assets
-        js_to_add = []
-        for url in component.js:
-            if (
-                root_path
-                and self.fingerprint
-                and not url.startswith(("http://", "https://"))
-            ):
-                url = self._fingerprint(root_path, url)
+            ```html+jinja
+            {{ catalog.irender_many("Row", rows, __prefix=__prefix) }}
+            ```
 
-            if url not in js_list:
-                js_to_add.append(url)
+        """
+        if self.tracer is not None or active_profile.get() is not None:
+            # Each row is rendered like a call to `irender()`, so it
+            # appears in the traces and profiles.
+            html = [self.irender(__name, **{**kw, **row}) for row in rows]
+            return Markup(sep).join(html)
 
-        # Update JS assets in one operation if needed
-        if js_to_add:
-            new_js = list(js_list)
-            new_js.extend(js_to_add)
-            self.collected_js = new_js
+        component = self._get_component(__name, **kw)
+        self._collect_assets(component)
+        for key in (
+            "_source", "__source", "_file_ext", "__file_ext", ARGS_PREFIX
+        ):
+            kw.pop(key, None)
 
-        attrs = attrs.as_dict if isinstance(attrs, HTMLAttrs) else attrs
-        attrs.update(kw)
-        kw = attrs
-        args, extra = component.filter_args(kw)
+        html = [self._render_call(component, {**kw, **row}) for row in rows]
+        return Markup(sep).join(html)
+
+    @contextmanager
+    def profile(self) -> t.Iterator[Profile]:
+        """
+        Context manager that records every component rendered inside of it,
+        in this thread or async task, as a tree of invocations.
+
+        Each node of the tree has the number of calls, the total and self
+        time, how the component was obtained (from the cache, loaded from
+        its file, or compiled from a `_source`), and the assets collected.
+        The profile can be exported with `to_collapsed()` (for flame graphs)
+        or `to_chrome_trace()`.
+
+            ```python
+            with catalog.profile() as profile:
+                catalog.render("Page")
+            print(profile.to_collapsed())
+            ```
+
+        """
+        profile = Profile()
+        token = active_profile.set(profile)
         try:
-            args[ARGS_ATTRS] = HTMLAttrs(extra)
-        except Exception as exc:
-            raise InvalidArgument(
-                f"The arguments of the component <{component.name}>"
-                f"were parsed incorrectly as:\n {str(kw)}"
-            ) from exc
+            yield profile
+        finally:
+            active_profile.reset(token)
 
-        args[ARGS_CONTENT] = CallerWrapper(caller=caller, content=content)
-        return component.render(**args)
+    def render_pages(
+        self,
+        jobs: "t.Iterable[Job]",
+        *,
+        workers: int | None = None,
+        factory: "t.Callable[[], Catalog] | None" = None,
+        chunksize: int = 16,
+    ) -> t.Iterator[str]:
+        """
+        Renders independent pages in a pool of worker processes, for example,
+        to build a static site.
+
+        Each job is a `(name, kwargs)` tuple, for which the rendered HTML is
+        yielded, or a `(name, kwargs, path)` tuple, in which case the worker
+        writes the HTML to `path` and the path is yielded instead. The
+        results are yielded in the same order as the jobs.
+
+        Arguments:
+
+            jobs:
+                An iterable of jobs.
+
+            workers:
+                Number of worker processes. By default, the number of CPUs.
+                With `1`, the pages are rendered in this process.
+
+            factory:
+                A picklable function that returns a new `Catalog`, used by
+                each worker to build its own catalog. If it's not set, the
+                workers are forked and inherit this catalog, so this is
+                required in platforms without `fork`.
+
+            chunksize:
+                Number of jobs sent to a worker at once.
+
+        """
+        from .parallel import render_pages
+
+        return render_pages(
+            self,
+            jobs,
+            workers=workers,
+            factory=factory,
+            chunksize=chunksize,
+        )
+
+    def freeze(self, *, gc_freeze: bool = True) -> int:
+        """
+        Loads and compiles every component of the catalog, and stops
+        checking if their files have changed. Returns the number of
+        components loaded.
+
+        Call it before forking the worker processes of a web server (for
+        example, with `gunicorn --preload`) so the workers share the
+        compiled components instead of each one compiling its own copy.
+
+        After this, rendering doesn't write to any shared object (other
+        than the cache of pure components, see `memo_size`, and the
+        statistics, if `collect_stats` is enabled), so the memory pages
+        of the parent process are not copied by the workers. This is
+        true for the calls to a component by its full name, like
+        `"ui:Button"`, or without its prefix from another component
+        under the same one. The first call written in any other way is
+        remembered when it's made.
+
+        Arguments:
+
+            gc_freeze:
+                Also call `gc.freeze()`, so the garbage collector of the
+                workers doesn't touch (and copy) every object created
+                until now.
+
+        """
+        self.use_cache = True
+        self.auto_reload = False
+        env = self.jinja_env
+        env.auto_reload = False
+
+        count = 0
+        for prefix in self.prefixes:
+            count += self._load_prefix(prefix)
+
+        # An LRU cache reorders its entries on every read (for example,
+        # for an `{% include %}`), so it's replaced by a plain dictionary.
+        if isinstance(env.cache, TemplateCache | jinja2.utils.LRUCache):
+            env.cache = dict(env.cache.items())
+
+        if gc_freeze:
+            gc.collect()
+            gc.freeze()
+        return count
+
+    def preload(self, prefix: str = DEFAULT_PREFIX) -> int:
+        """
+        Loads and compiles every component under a prefix, reading those
+        in a `ComponentStore` with a single query. Returns the number of
+        components loaded.
+
+        Those that were replaced in a store since it was last read are
+        forgotten first, like with `Catalog.invalidate()`, so, without
+        `auto_reload`, call it, for example, at the start of each request
+        of a tenant to use the latest version of their components.
+
+        Arguments:
+
+            prefix:
+                The prefix of the components. The default is empty.
+
+        """
+        loader = self.prefixes.get(prefix)
+        if loader is None:
+            raise UnknownPrefix(prefix)
+
+        for root in loader.searchpath:
+            if not isinstance(root, ComponentStore):
+                continue
+            changed = root.preload()
+            if not changed:
+                continue
+            for key in [key for key in self._paths if key[0] == prefix]:
+                del self._paths[key]
+            for relpath in changed:
+                self._invalidate_template(
+                    get_template_name(prefix, relpath), root.get_path(relpath)
+                )
+
+        return self._load_prefix(prefix)
+
+    def _load_prefix(self, prefix: str) -> int:
+        count = 0
+        file_ext = self.file_ext
+        for relpath in self.prefixes[prefix].list_templates():
+            if not relpath.endswith(file_ext):
+                continue
+            name = relpath.removesuffix(file_ext).replace(SLASH, DELIMITER)
+            name = name.removesuffix(f"{DELIMITER}index")
+            component = self._get_from_cache(prefix=prefix, name=name, file_ext=file_ext)
+            if component is None:
+                continue
+            count += 1
+            self._remember_call(prefix, name, file_ext, component)
+        return count
+
+    def _remember_call(
+        self,
+        prefix: str,
+        name: str,
+        file_ext: str,
+        component: Component,
+    ) -> None:
+        """Fills the caches of `_find_component()` for the usual ways of
+        calling a loaded component: by its full name, and, from another
+        component under the same prefix, without it."""
+        generation = self._generation
+        if prefix == DEFAULT_PREFIX:
+            self._resolved[(name, DEFAULT_PREFIX, file_ext)] = (generation, component)
+            return
+
+        cname = f"{prefix}{PREFIX_SEP}{name}"
+        self._resolved[(cname, DEFAULT_PREFIX, file_ext)] = (generation, component)
+        # Searched first under the prefix of the caller
+        self._resolved[(name, prefix, file_ext)] = (generation, component)
+
+    def check(self) -> list[CallError]:
+        """
+        Checks every component of the catalog, without rendering anything,
+        and returns the problems found: invalid headers, syntax errors in
+        the component tags, calls to components that can't be found, and
+        calls without a required argument (when it isn't passed using
+        `_attrs`).
+
+        Only the tags of the components are checked, so templates that
+        aren't components aren't checked, and neither are the calls made
+        with `catalog.irender()`.
+        """
+        env = self.jinja_env
+        ext = t.cast(JinjaX, env.extensions[JinjaX.identifier])
+        errors: list[CallError] = []
+
+        for prefix, loader in self.prefixes.items():
+            for relpath in loader.list_templates():
+                if not relpath.endswith(self.file_ext):
+                    continue
+                name = get_template_name(prefix, relpath)
+                source, filename, _ = env.loader.get_source(env, name)  # type: ignore
+                try:
+                    Component(name=relpath, source=source)
+                except Exception as err:
+                    errors.append(CallError(name, None, "", f"invalid header: {err}"))
+                errors.extend(ext.check(source, name=name, filename=filename))
+
+        return errors
+
+    def get_dependencies(self, cname: str) -> set[str]:
+        """
+        Returns the template names (like "Card.jinja" or "ui:Button.jinja")
+        of the components called by the tags of a component, but not of
+        the ones called by those components.
+
+        The tags are recorded when the component is compiled, or read
+        from its file if it hasn't been yet.
+        """
+        return self._get_callees(self._get_template_name(cname))
+
+    def get_dependents(self, cname: str) -> set[str]:
+        """
+        Returns the template names of the components that call a
+        component, directly or through other components.
+
+        Every component of the catalog is included, but other templates
+        only if they have been compiled.
+        """
+        template = self._get_template_name(cname)
+        return self._get_dependents({template}) - {template}
+
+    def get_dependency_graph(self) -> dict[str, set[str]]:
+        """
+        Returns the template name of every component (and of any other
+        template compiled so far) mapped to the template names of the
+        components it calls. See `Catalog.get_dependencies()`.
+        """
+        templates = set(self._calls)
+        loader = self.jinja_env.loader
+        assert isinstance(loader, CatalogLoader)
+        # With those of the catalogs it overlays, if this is an overlay
+        for name in loader.list_templates():
+            if name.endswith(self.file_ext):
+                templates.add(name)
+        # The folders are walked once, instead of again on every call to
+        # a component that isn't found under the prefix of its caller.
+        self._refresh_paths(self.file_ext)
+        return {
+            template: self._get_callees(template, rebuild=False)
+            for template in templates
+        }
+
+    def invalidate(self, cname: str) -> set[str]:
+        """
+        Forgets what is cached of a component, so its file is read again
+        the next time it's rendered, even without `auto_reload`.
+        Call it, for example, from a file watcher when a component changes,
+        instead of starting with empty caches.
+
+        Only what depends on the component is removed:
+
+        - Its compiled template and its metadata, and those of the templates
+          in which it was inlined (see `inline_components`).
+        - The rendered outputs of it and of every component that calls it,
+          directly or through others, if they are pure (see `memo_size`),
+          because those outputs include it and its assets.
+
+        Returns the template names of the component and of its dependents.
+        """
+        template, path = self._get_template_file(cname)
+        return self._invalidate_template(template, path)
+
+    def _invalidate_template(self, template: str, path: ComponentPath) -> set[str]:
+        self._missing.clear()
+        for key in [key for key in self._indexed if key[1] == str(path)]:
+            self._indexed.pop(key, None)
+
+        loader = self.jinja_env.loader
+        compiled = {template}
+        if isinstance(loader, CatalogLoader):
+            compiled.update(
+                name
+                for name, files in loader.dependencies.items()
+                if str(path) in files
+            )
+
+        cache = self.jinja_env.cache
+        if cache is not None:
+            loader_ref = weakref.ref(loader)
+            for name in compiled:
+                try:
+                    del cache[(loader_ref, name)]
+                except KeyError:
+                    pass
+        for name in compiled:
+            self._calls.pop(name, None)
+
+        def is_compiled(component: dict[str, t.Any] | Component) -> bool:
+            if isinstance(component, Component):
+                prefix, relpath = component.prefix, component.relpath
+            else:
+                prefix, relpath = component["prefix"], component["relpath"]
+            if relpath is None:
+                return False
+            return get_template_name(prefix, relpath.as_posix()) in compiled
+
+        for key, component in list(self._cache.items()):
+            if is_compiled(component):
+                self._cache.pop(key, None)
+        for key, (_, component) in list(self._resolved.items()):
+            if is_compiled(component):
+                self._resolved.pop(key, None)
+
+        dependents = self._get_dependents({template})
+        self._memo.discard(
+            lambda prefix, relpath: get_template_name(prefix, relpath.as_posix())
+            in dependents
+        )
+        for overlay in list(self._overlays):
+            overlay._invalidate_template(template, path)
+        return dependents
 
     def get_middleware(
         self,
@@ -553,6 +1304,10 @@ class Catalog:
             url_prefix = get_url_prefix(prefix)
             url = f"{self.root_url}{url_prefix}"
             for root in loader.searchpath[::-1]:
+                if isinstance(root, Package):
+                    if root.path is None:
+                        continue
+                    root = str(root.path)
                 middleware.add_files(root, url)
 
         return middleware
@@ -569,6 +1324,8 @@ class Catalog:
         prefix, name = self._split_name(cname)
         path, _relpath = self._get_component_path(prefix, name, file_ext=file_ext)
         if not path:
+            if self._stats is not None:
+                self._stats.record(events.NOT_FOUND)
             raise ComponentNotFound(cname, file_ext)
         return path.read_text()
 
@@ -582,6 +1339,73 @@ class Catalog:
         self._emit_assets_later = True
         return self._assets_placeholder
 
+    def memo_info(self) -> MemoInfo:
+        """
+        Returns a named tuple with the `hits`, `misses`, `maxsize`, and
+        `currsize` of the cache of pure components.
+        """
+        return self._memo.info()
+
+    def memo_clear(self) -> None:
+        """
+        Empties the cache of pure components and resets its statistics.
+        """
+        self._memo.clear()
+
+    def save_metadata(self) -> None:
+        """Writes the metadata of the components loaded so far to the
+        `metadata_cache` file, if anything has changed.
+
+        Call it after warming up the catalog (for example, at the end of
+        a deploy script or when a worker stops) so the next processes
+        start with the metadata of every component already parsed.
+        """
+        if self._metadata is None:
+            raise RuntimeError("The catalog has no `metadata_cache` file")
+        self._metadata.save()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Returns the `count` and total `time`, in seconds, of each kind of
+        event recorded since the catalog was created or `reset_stats()`
+        was called. Empty unless the catalog was created with
+        `collect_stats=True` or has a stats hook.
+
+        The events are:
+
+        - `cache.hit`, `cache.miss`, `cache.stale`: lookups of components
+          in the catalog cache. Stale means the file changed since it was
+          cached (only with `auto_reload`).
+        - `lookup`: searches of a component file in the folders of a prefix.
+        - `preprocess`: runs of the JinjaX preprocessor.
+        - `compile`: compilations of templates by Jinja, including the
+          preprocessing.
+        - `fingerprint`: computations of the fingerprint of an asset.
+        - `not_found`: `ComponentNotFound` errors.
+
+        """
+        if self._stats is None:
+            return {}
+        return self._stats.as_dict()
+
+    def reset_stats(self) -> None:
+        """
+        Sets all the counters returned by `Catalog.stats()` to zero.
+        """
+        if self._stats is not None:
+            self._stats.reset()
+
+    def add_stats_hook(self, hook: StatsHook) -> None:
+        """
+        Registers a function to be called with the name of each event
+        (see `Catalog.stats()`) and its duration in seconds, every time
+        one is recorded. Use it to export the events to your metrics
+        system. Adding a hook enables the collection of stats.
+        """
+        if self._stats is None:
+            self._stats = Stats()
+        self._stats.hooks.append(hook)
+
     def _format_collected_assets(self) -> Markup:
         """
         Internal helper to format collected_css and collected_js into
@@ -632,6 +1456,17 @@ class Catalog:
     # Private
 
     def _fingerprint(self, root: Path, filename: str) -> str:
+        stats = self._stats
+        if stats is None:
+            return self._get_fingerprinted_name(root, filename)
+
+        start = perf_counter()
+        try:
+            return self._get_fingerprinted_name(root, filename)
+        finally:
+            stats.record(events.FINGERPRINT, perf_counter() - start)
+
+    def _get_fingerprinted_name(self, root: Path, filename: str) -> str:
         relpath = Path(filename.lstrip(os.path.sep))
         filepath = root / relpath
         if not filepath.is_file():
@@ -647,30 +1482,215 @@ class Catalog:
 
         return f"{parent}{stem}-{fingerprint}{ext}"
 
+    def _irender_profiled(
+        self,
+        profile: Profile,
+        __name: str,
+        /,
+        *,
+        caller: t.Callable | None = None,
+        **kw,
+    ) -> str:
+        with profile.call(__name) as node:
+            lookup_status.set(CACHE_HIT)
+            component = self._get_component(__name, **kw)
+            profile.mark(lookup_status.get())
+            start = perf_counter()
+            self._collect_assets(component)
+            node.assets_time += perf_counter() - start
+            node.assets += len(component.css) + len(component.js)
+            return self._render_call(component, kw, caller=caller)
+
+    def _irender_traced(
+        self,
+        span_name: str,
+        depth: int,
+        __name: str,
+        /,
+        *,
+        caller: t.Callable | None = None,
+        **kw,
+    ) -> str:
+        assert self.tracer
+        token = trace_depth.set(depth)
+        try:
+            with self.tracer.start_as_current_span(span_name) as span:
+                lookup_status.set(CACHE_HIT)
+                component = self._get_component(__name, **kw)
+                span.set_attribute(ATTR_COMPONENT, component.name)
+                span.set_attribute(ATTR_PREFIX, component.prefix)
+                span.set_attribute(ATTR_CACHE, lookup_status.get())
+                self._collect_assets(component)
+                html = self._render_call(component, kw, caller=caller)
+                span.set_attribute(ATTR_OUTPUT_SIZE, len(html))
+                return html
+        finally:
+            trace_depth.reset(token)
+
+    def _collect_assets(self, component: Component) -> None:
+        root_path = component.root_path
+        fingerprint = root_path and self.fingerprint
+
+        css = []
+        for url in component.css:
+            if fingerprint and not url.startswith(("http://", "https://")):
+                url = self._fingerprint(root_path, url)  # type: ignore
+            css.append(url)
+
+        js = []
+        for url in component.js:
+            if fingerprint and not url.startswith(("http://", "https://")):
+                url = self._fingerprint(root_path, url)  # type: ignore
+            js.append(url)
+
+        self._add_assets(css, js)
+
+    def _add_assets(self, css: t.Iterable[str], js: t.Iterable[str]) -> None:
+        # Get current assets lists
+        css_list = self.collected_css
+        js_list = self.collected_js
+
+        css_to_add = [url for url in css if url not in css_list]
+        # Update CSS assets in one operation if needed
+        if css_to_add:
+            self.collected_css = [*css_list, *css_to_add]
+
+        js_to_add = [url for url in js if url not in js_list]
+        # Update JS assets in one operation if needed
+        if js_to_add:
+            self.collected_js = [*js_list, *js_to_add]
+
+    def _render_call(
+        self,
+        component: Component,
+        kw: dict[str, t.Any],
+        *,
+        caller: t.Callable | None = None,
+    ) -> str:
+        content = (kw.pop("_content", kw.pop("__content", "")) or "").strip()
+        attrs = kw.pop("_attrs", kw.pop("__attrs", None)) or {}
+        attrs = attrs.as_dict if isinstance(attrs, HTMLAttrs) else dict(attrs)
+        attrs.update(kw)
+        kw = attrs
+
+        # With `auto_reload`, any subcomponent could have changed since
+        # the output was stored, so it's always rendered again.
+        if component.pure and not caller and not self.auto_reload:
+            key = self._memo.make_key(component, kw, content)
+            if key is not None:
+                return self._render_memoized(key, component, kw, content)
+
+        return self._render_component(component, kw, caller=caller, content=content)
+
+    def _render_component(
+        self,
+        component: Component,
+        kw: dict[str, t.Any],
+        *,
+        caller: t.Callable | None = None,
+        content: str = "",
+    ) -> str:
+        args, extra = component.filter_args(kw)
+        try:
+            args[ARGS_ATTRS] = HTMLAttrs(extra)
+        except Exception as exc:
+            raise InvalidArgument(
+                f"The arguments of the component <{component.name}>"
+                f"were parsed incorrectly as:\n {str(kw)}"
+            ) from exc
+
+        args[ARGS_CONTENT] = CallerWrapper(caller=caller, content=content)
+        if self._parent is not None:
+            # So the templates shared with the parent call the components
+            # through this catalog, instead of the one in their globals.
+            args[CATALOG_VAR] = self
+        return component.render(tmpl_globals[self._key].get(None), **args)
+
+    def _render_memoized(
+        self,
+        key: tuple,
+        component: Component,
+        kw: dict[str, t.Any],
+        content: str,
+    ) -> str:
+        entry = self._memo.get(key)
+        if entry is not None:
+            self._add_assets(entry.css, entry.js)
+            return entry.html
+
+        # Rendered with empty assets lists, so the entry has every asset
+        # the subcomponents ask for, even those already collected before.
+        css_var = collected_css[self._key]
+        js_var = collected_js[self._key]
+        css_token = css_var.set([])
+        js_token = js_var.set([])
+        try:
+            html = self._render_component(component, kw, content=content)
+            css = tuple(css_var.get())
+            js = tuple(js_var.get())
+        finally:
+            css_var.reset(css_token)
+            js_var.reset(js_token)
+
+        self._memo.set(key, MemoEntry(html=html, css=css, js=js))
+        self._add_assets(css, js)
+        return html
+
     def _get_component(self, cname: str, **kw) -> Component:
-        source = kw.pop("_source", kw.pop("__source", ""))
-        file_ext = kw.pop("_file_ext", kw.pop("__file_ext", "")) or self.file_ext
-        caller_prefix = kw.pop(ARGS_PREFIX, "")
+        return self._find_component(cname, kw)
+
+    def _find_component(self, cname: str, kw: dict[str, t.Any]) -> Component:
+        source = kw.get("_source", kw.get("__source", ""))
+        file_ext = kw.get("_file_ext", kw.get("__file_ext", "")) or self.file_ext
+        caller_prefix = kw.get(ARGS_PREFIX, "")
+
+        if not source and self.use_cache and not self.auto_reload:
+            key = (cname, caller_prefix, file_ext)
+            generation = self._generation
+            resolved = self._resolved.get(key)
+            if resolved is not None and resolved[0] == generation:
+                if self._stats is not None:
+                    self._stats.record(events.CACHE_HIT)
+                return resolved[1]
+            component = self._resolve_component(
+                cname, caller_prefix=caller_prefix, file_ext=file_ext
+            )
+            # Without `auto_reload` the cached components never change, so
+            # the same call always resolves to the same component.
+            self._resolved[key] = (generation, component)
+            return component
 
         prefix, name = self._split_name(cname)
-        component = None
-
         if source:
             logger.debug("Rendering from source %s", cname)
-            self.jinja_env.loader = self.prefixes[prefix]
             return self._get_from_source(prefix=prefix, name=name, source=source)
 
+        return self._resolve_component(
+            cname, caller_prefix=caller_prefix, file_ext=file_ext
+        )
+
+    def _resolve_component(
+        self,
+        cname: str,
+        *,
+        caller_prefix: str,
+        file_ext: str,
+    ) -> Component:
+        prefix, name = self._split_name(cname)
+        component = None
+
         logger.debug("Rendering from cache or file %s", cname)
-        get_from = self._get_from_cache if self.use_cache else self._get_from_file
+        if self._parent is None:
+            get_from = self._get_from_cache if self.use_cache else self._get_from_file
+        else:
+            get_from = self._get_from_layers
         if caller_prefix:
-            self.jinja_env.loader = self.prefixes[caller_prefix]
             component = get_from(
                 prefix=caller_prefix,
                 name=cname,
                 file_ext=file_ext
             )
         if not component:
-            self.jinja_env.loader = self.prefixes[prefix]
             component = get_from(
                 prefix=prefix,
                 name=name,
@@ -678,8 +1698,42 @@ class Catalog:
             )
         if component:
             return component
+        if self._stats is not None:
+            self._stats.record(events.NOT_FOUND)
         raise ComponentNotFound(cname, file_ext)
 
+    def _get_from_layers(
+        self,
+        *,
+        prefix: str,
+        name: str,
+        file_ext: str,
+    ) -> Component | None:
+        """Searches for a component in this overlay and, if it's not
+        found, in the catalogs it overlays, reusing what they loaded."""
+        component = None
+        if prefix in self.prefixes:
+            get_from = self._get_from_cache if self.use_cache else self._get_from_file
+            component = get_from(prefix=prefix, name=name, file_ext=file_ext)
+        parent = self._parent
+        if component is not None or parent is None:
+            return component
+
+        component = parent._get_from_layers(prefix=prefix, name=name, file_ext=file_ext)
+        tmpl_name = component.tmpl.name if component and component.tmpl else None
+        if component is None or tmpl_name is None:
+            return component
+
+        loader = parent.jinja_env.loader
+        inlined = isinstance(loader, CatalogLoader) and loader.dependencies.get(tmpl_name)
+        if inlined:
+            # Compiled with other components inlined, that could be overridden
+            copy = Component.from_cache(component.serialize(), auto_reload=False)
+            assert copy is not None
+            copy.tmpl = self.jinja_env.get_template(tmpl_name)
+            return copy
+        return component
+
     def _get_from_source(
         self,
         *,
@@ -687,7 +1741,11 @@ class Catalog:
         name: str,
         source: str,
     ) -> Component:
-        tmpl = self.jinja_env.from_string(source, globals=self.tmpl_globals)
+        env = self.jinja_env
+        # Named so any `{% include %}` inside is searched under the prefix
+        code = env.compile(source, name=get_template_name(prefix, name))
+        tmpl = env.template_class.from_code(env, code, env.make_globals(None))
+        mark(CACHE_SOURCE)
         component = Component(prefix=prefix, name=name, source=source, tmpl=tmpl)
         return component
 
@@ -699,14 +1757,30 @@ class Catalog:
         file_ext: str,
     ) -> Component | None:
         key = f"{prefix}.{name}{file_ext}"
+        if key in self._missing:
+            return None
         cache = self._from_cache(key)
+        stats = self._stats
 
         if cache:
-            component = Component.from_cache(
-                cache, auto_reload=self.auto_reload, globals=self.tmpl_globals
-            )
+            component = Component.from_cache(cache, auto_reload=self.auto_reload)
+            if (
+                component
+                and self.inline_components
+                and self.auto_reload
+                and component.tmpl
+                and not component.tmpl.is_up_to_date
+            ):
+                # A component inlined into this one has changed
+                component = None
             if component:
+                if stats is not None:
+                    stats.record(events.CACHE_HIT)
                 return component
+            if stats is not None:
+                stats.record(events.CACHE_STALE)
+        elif stats is not None:
+            stats.record(events.CACHE_MISS)
 
         logger.debug("Loading %s", key)
         component = self._get_from_file(prefix=prefix, name=name, file_ext=file_ext)
@@ -726,68 +1800,374 @@ class Catalog:
         self._cache[key] = component.serialize()
 
     def _get_from_file(self, *, prefix: str, name: str, file_ext: str) -> Component | None:
-        path, relpath = self._get_component_path(prefix, name, file_ext=file_ext)
+        key = f"{prefix}.{name}{file_ext}"
+        if key in self._missing:
+            return None
+        stats = self._stats
+        if stats is None:
+            path, relpath = self._get_component_path(prefix, name, file_ext=file_ext)
+        else:
+            start = perf_counter()
+            path, relpath = self._get_component_path(prefix, name, file_ext=file_ext)
+            stats.record(events.LOOKUP, perf_counter() - start)
         if path is None or relpath is None:
+            if not self.auto_reload:
+                self._missing.add(key)
             return
-        component = Component(name=name, prefix=prefix, path=path, relpath=relpath)
-        component.tmpl = self.jinja_env.get_template(str(relpath.as_posix()), globals=self.tmpl_globals)
+        metadata = self._indexed.get((prefix, str(path))) if self._indexed else None
+        if metadata is None and isinstance(path, StoredFile):
+            metadata = path.get_metadata(get_url_prefix(prefix))
+        if metadata is not None:
+            component = Component(
+                name=name, prefix=prefix, path=path, relpath=relpath, metadata=metadata
+            )
+        elif self._metadata is None:
+            component = Component(name=name, prefix=prefix, path=path, relpath=relpath)
+        else:
+            component = self._get_with_metadata(
+                prefix=prefix, name=name, path=path, relpath=relpath
+            )
+        component.tmpl = self.jinja_env.get_template(
+            get_template_name(prefix, str(relpath.as_posix()))
+        )
+        mark(CACHE_LOAD)
         return component
 
-    def _split_name(self, cname: str) -> tuple[str, str]:
-        cname = cname.strip().strip(DELIMITER)
-        if PREFIX_SEP not in cname:
-            return DEFAULT_PREFIX, cname
+    def _get_with_metadata(
+        self,
+        *,
+        prefix: str,
+        name: str,
+        path: ComponentPath,
+        relpath: RelPath,
+    ) -> Component:
+        assert self._metadata is not None
+        stat = path.stat()
+        key = (str(path), prefix, str(relpath.as_posix()))
+        siblings = (path.with_suffix(".css").is_file(), path.with_suffix(".js").is_file())
+        metadata = self._metadata.get(key, stat, siblings)
+        component = Component(
+            name=name,
+            prefix=prefix,
+            path=path,
+            relpath=relpath,
+            mtime=stat.st_mtime,
+            metadata=metadata,
+        )
+        if metadata is None:
+            self._metadata.set(key, stat, siblings, component.get_metadata())
+        return component
+
+    def _get_template_name(self, cname: str) -> str:
+        return self._get_template_file(cname)[0]
+
+    def _get_template_file(self, cname: str) -> tuple[str, ComponentPath]:
+        prefix, name = self._split_name(cname)
+        path, relpath = self._get_layered_path(prefix, name, file_ext=self.file_ext)
+        if path is None or relpath is None:
+            raise ComponentNotFound(cname, self.file_ext)
+        return get_template_name(prefix, relpath.as_posix()), path
+
+    def _get_callees(self, template: str, *, rebuild: bool = True) -> set[str]:
+        env = self.jinja_env
+        loader = env.loader
+        assert isinstance(loader, CatalogLoader)
+
+        calls = self._calls.get(template)
+        if calls is None:
+            try:
+                source, _, _ = loader.get_source(env, template)
+            except jinja2.TemplateNotFound:
+                return set()
+            ext = t.cast(JinjaX, env.extensions[JinjaX.identifier])
+            calls = self._calls[template] = frozenset(ext.find_calls(source))
+
+        caller_prefix = loader.split_name(template)[0]
+        callees = set()
+        for tag in calls:
+            try:
+                found = self._find_component_path(
+                    tag, caller_prefix, self.file_ext, rebuild=rebuild
+                )
+            except UnknownPrefix:
+                continue
+            if found is not None:
+                prefix, _, _, relpath = found
+                callees.add(get_template_name(prefix, relpath.as_posix()))
+        return callees
+
+    def _get_dependents(self, templates: set[str]) -> set[str]:
+        """Returns the templates and every template that calls them,
+        directly or through others."""
+        callers: dict[str, set[str]] = {}
+        for caller, callees in self.get_dependency_graph().items():
+            for callee in callees:
+                callers.setdefault(callee, set()).add(caller)
+
+        found = set(templates)
+        pending = list(templates)
+        while pending:
+            for caller in callers.get(pending.pop(), ()):
+                if caller not in found:
+                    found.add(caller)
+                    pending.append(caller)
+        return found
+
+    def _find_component_path(
+        self,
+        cname: str,
+        caller_prefix: str,
+        file_ext: str,
+        *,
+        rebuild: bool = True,
+    ) -> tuple[str, str, ComponentPath, RelPath] | None:
+        """Finds the file of a component the same way it's found when
+        rendering: first under the prefix of the caller, if any. Returns
+        the prefix and name it was found by, and its path."""
+        prefix, name = self._split_name(cname)
+        candidates = [(prefix, name)]
+        if caller_prefix:
+            candidates.insert(0, (caller_prefix, cname))
+
+        for prefix, name in candidates:
+            # Like the default prefix, when every folder has a prefix
+            if not self._has_prefix(prefix):
+                continue
+            path, relpath = self._get_layered_path(
+                prefix, name, file_ext=file_ext, rebuild=rebuild
+            )
+            if path is not None and relpath is not None:
+                return prefix, name, path, relpath
+        return None
+
+    def _has_prefix(self, prefix: str) -> bool:
+        if prefix in self.prefixes:
+            return True
+        return self._parent is not None and self._parent._has_prefix(prefix)
+
+    def _get_layered_path(
+        self,
+        prefix: str,
+        name: str,
+        file_ext: str,
+        *,
+        rebuild: bool = True,
+    ) -> tuple[ComponentPath, RelPath] | tuple[None, None]:
+        """Like `_get_component_path()`, but if this is an overlay, also
+        searches in the catalogs it overlays."""
+        if self._parent is None:
+            return self._get_component_path(
+                prefix, name, file_ext=file_ext, rebuild=rebuild
+            )
+        if prefix in self.prefixes:
+            path, relpath = self._get_component_path(
+                prefix, name, file_ext=file_ext, rebuild=rebuild
+            )
+            if path is not None and relpath is not None:
+                return path, relpath
+        return self._parent._get_layered_path(
+            prefix, name, file_ext=file_ext, rebuild=rebuild
+        )
 
-        prefix, cname = cname.split(PREFIX_SEP, 1)
-        if prefix not in self.prefixes:
+    def _split_name(self, cname: str) -> tuple[str, str]:
+        prefix, name = split_name(cname)
+        if PREFIX_SEP in cname and not self._has_prefix(prefix):
             raise UnknownPrefix(prefix)
-        return prefix, cname
+        return prefix, name
 
     def _get_component_path(
         self,
         prefix: str,
         name: str,
         file_ext: str,
-    ) -> tuple[Path, RelPath] | tuple[None, None]:
-        root_paths = self.prefixes[prefix].searchpath
-
+        *,
+        rebuild: bool = True,
+    ) -> tuple[ComponentPath, RelPath] | tuple[None, None]:
+        """Finds the file of a component under a prefix. With `rebuild`,
+        the folders are walked again if it isn't found."""
         name = name.replace(DELIMITER, SLASH)
         kebab_name = kebab_case(name)
-        dot_names = (f"{name}.", f"{kebab_name}.")
 
-        for root_path in root_paths:
-            for curr_folder, _, files in os.walk(
-                root_path, topdown=False, followlinks=True
-            ):
-                relfolder = os.path.relpath(curr_folder, root_path).strip(".")
-                if relfolder:
-                    if not (
-                        name.startswith(relfolder)
-                        or kebab_name.startswith(relfolder)
-                    ):
-                        continue
+        table = self._paths.get((prefix, file_ext))
+        if table is not None:
+            found = self._find_in_paths(table, name, kebab_name)
+            if found:
+                return found
+            if not rebuild:
+                return None, None
+
+        # Not found or the table is outdated (or not built yet), so the
+        # folders are walked again to find any new or renamed file.
+        table = self._build_paths(prefix, file_ext)
+        self._paths[(prefix, file_ext)] = table
+        self._fit_template_cache()
+        found = self._find_in_paths(table, name, kebab_name)
+        if found:
+            return found
+        return None, None
 
-                    # Allow for index.jinja files in subfolders
-                    # to be called with just the folder name
-                    if relfolder in (name, kebab_name):
-                        filename = f"index{file_ext}"
-                        fullpath = Path(curr_folder) / filename
-                        if fullpath.is_file():
-                            relpath = Path(f"{relfolder}/{filename}")
-                            return fullpath, relpath
+    def _refresh_paths(self, file_ext: str) -> None:
+        """Walks the folders of every prefix again, of this catalog and
+        of those it overlays."""
+        catalog = self
+        while catalog is not None:
+            for prefix in catalog.prefixes:
+                catalog._paths[(prefix, file_ext)] = catalog._build_paths(
+                    prefix, file_ext
+                )
+            catalog._fit_template_cache()
+            catalog = catalog._parent
+
+    def _find_in_paths(
+        self,
+        table: "dict[str, PathEntry]",
+        name: str,
+        kebab_name: str,
+    ) -> tuple[ComponentPath, RelPath] | None:
+        key = name
+        entry = table.get(name)
+        kebab_entry = table.get(kebab_name)
+        if entry is None or (kebab_entry is not None and kebab_entry < entry):
+            key, entry = kebab_name, kebab_entry
+        if entry is None:
+            return None
+
+        order, fullpath, relpath = entry
+        if isinstance(relpath, str):
+            fullpath = Path(fullpath) if isinstance(fullpath, str) else fullpath
+            relpath = Path(relpath)
+            table[key] = (order, fullpath, relpath)
+
+        if self.auto_reload and not fullpath.is_file():  # type: ignore
+            return None
+        return fullpath, relpath  # type: ignore
+
+    def _build_paths(
+        self,
+        prefix: str,
+        file_ext: str,
+    ) -> "dict[str, PathEntry]":
+        """Maps every name a component of this prefix can be called by
+        (without the prefix and with slashes instead of dots) to its
+        path, so it can be found with a dictionary lookup.
+
+        The folders are walked in the same order a component is
+        searched for, so if more than one file match the same name,
+        the first one (the one that should take precedence) is kept.
+        The entries are numbered in that order to choose between the
+        file matching a name and the one matching its kebab-case form.
+        """
+        table: dict[str, PathEntry] = {}
+        index_name = f"index{file_ext}"
+        order = 0
+
+        for root in self.prefixes[prefix].searchpath:
+            index = self._get_index(root, file_ext)
+            if index is not None:
+                url_prefix = get_url_prefix(prefix)
+                for key, filepath in index.names.items():
+                    path = self._get_root_file(root, None, filepath, "")
+                    table.setdefault(key, (order, path, filepath))
+                    order += 1
+                    metadata = index.metadata.get(filepath)
+                    if metadata is not None and not self.auto_reload:
+                        # The same as `str(Path(path))`, used to find it
+                        path = os.path.normpath(path) if isinstance(path, str) else path
+                        self._indexed[(prefix, str(path))] = with_url_prefix(
+                            metadata, url_prefix
+                        )
+                continue
+
+            if isinstance(root, Package):
+                # Listed in its index, instead of walking its folders
+                folders = (
+                    (relfolder, files, None) for relfolder, files in root.walk()
+                )
+            else:
+                folders = (
+                    (os.path.relpath(curr_folder, root).strip("."), files, curr_folder)
+                    for curr_folder, _, files in os.walk(
+                        root, topdown=False, followlinks=True
+                    )
+                )
+
+            for relfolder, files, curr_folder in folders:
+                # Allow for index.jinja files in subfolders
+                # to be called with just the folder name
+                if relfolder and index_name in files:
+                    relpath = f"{relfolder}/{index_name}"
+                    path = self._get_root_file(root, curr_folder, relpath, index_name)
+                    table.setdefault(relfolder, (order, path, relpath))
+                    order += 1
 
                 for filename in files:
+                    if not filename.endswith(file_ext):
+                        continue
                     if relfolder:
                         filepath = f"{relfolder}/{filename}"
                     else:
                         filepath = filename
 
-                    if filepath.startswith(dot_names) and filepath.endswith(file_ext):
-                        fullpath = Path(curr_folder) / filename
-                        relpath = Path(filepath)
-                        if fullpath.is_file():
-                            return fullpath, relpath
-        return None, None
+                    # `Card.jinja` or `Card.en.jinja` are both called "Card"
+                    key = filepath.split(DELIMITER, 1)[0]
+                    if len(key) <= len(relfolder):
+                        continue
+                    path = self._get_root_file(root, curr_folder, filepath, filename)
+                    table.setdefault(key, (order, path, filepath))
+                    order += 1
+
+        return table
+
+    def _get_root_file(
+        self,
+        root: "str | Package",
+        curr_folder: str | None,
+        filepath: str,
+        filename: str,
+    ) -> "str | ResourceFile":
+        if isinstance(root, Package):
+            if root.path is None:
+                return root.get_path(filepath)  # type: ignore
+            return os.path.join(root.path, filepath)
+        if curr_folder is None:
+            return os.path.join(root, filepath)
+        return os.path.join(curr_folder, filename)
+
+    def _get_index(self, root: "str | Package", file_ext: str) -> "Index | None":
+        """Returns the index of the folder if it has one that can be used
+        instead of walking the folder. The index of a folder in the
+        filesystem is ignored with `auto_reload`, because it could be
+        outdated."""
+        if isinstance(root, Package):
+            index = root.index
+        elif self.auto_reload:
+            return None
+        else:
+            index = read_index(Path(root))
+        if index is None or not index.names:
+            return None
+        if index.file_ext != file_ext:
+            return None
+        return index
+
+    def _fit_template_cache(self) -> None:
+        """Grows the Jinja cache to fit every component found so far."""
+        cache = self.jinja_env.cache
+        if self.template_cache_size is not None or not isinstance(
+            cache, TemplateCache
+        ):
+            return
+        paths = {
+            str(entry[1]) for table in self._paths.values() for entry in table.values()
+        }
+        capacity = DEFAULT_TEMPLATE_CACHE_SIZE + len(paths)
+        if capacity > cache.capacity:
+            logger.debug("Growing the template cache to %s", capacity)
+            cache.resize(capacity)
+
+    def _on_template_evicted(self) -> None:
+        if self._stats is not None:
+            self._stats.record(events.TEMPLATE_EVICT)
 
     def _render_attrs(self, attrs: dict[str, t.Any]) -> Markup:
         html_attrs = []
@@ -0,0 +1,73 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import typing as t
+
+from .component import Component
+from .exceptions import UnknownPrefix
+
+
+if t.TYPE_CHECKING:
+    from .catalog import Catalog
+
+
+# Arguments with a dictionary of arguments, so which ones are passed
+# can't be known until the component is rendered.
+DYNAMIC_ARGS = ("_attrs", "__attrs")
+
+
+class CallError(t.NamedTuple):
+    """A problem found in a template without rendering it."""
+
+    template: str
+    lineno: int | None
+    tag: str
+    message: str
+
+    def __str__(self) -> str:
+        where = f"{self.template}:{self.lineno}" if self.lineno else self.template
+        if self.tag:
+            return f"{where}: <{self.tag}> {self.message}"
+        return f"{where}: {self.message}"
+
+
+def find_component(
+    catalog: "Catalog",
+    tag: str,
+    caller_prefix: str,
+    file_ext: str,
+) -> Component | None:
+    """Finds the component of a tag the same way it's found when rendering,
+    but reading only its metadata, without compiling it."""
+    found = catalog._find_component_path(tag, caller_prefix, file_ext)
+    if found is None:
+        return None
+    prefix, name, path, relpath = found
+    return Component(name=name, prefix=prefix, path=path, relpath=relpath)
+
+
+def check_call(
+    catalog: "Catalog",
+    tag: str,
+    args: t.Iterable[str],
+    caller_prefix: str,
+) -> str | None:
+    """Returns what's wrong with a call to the component of `tag` with the
+    arguments named `args`, or `None` if nothing is."""
+    try:
+        component = find_component(catalog, tag, caller_prefix, catalog.file_ext)
+    except UnknownPrefix as err:
+        return str(err)
+    except Exception as err:
+        return f"is invalid: {err}"
+    if component is None:
+        return "component not found"
+
+    args = set(args)
+    if args.intersection(DYNAMIC_ARGS):
+        return None
+    missing = [name for name in component.required if name not in args]
+    if missing:
+        return f"requires the {', '.join(f'`{name}`' for name in missing)} argument(s)"
+    return None
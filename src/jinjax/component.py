@@ -3,8 +3,12 @@ JinjaX
 Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
 """
 import ast
+import mmap
+import os
 import re
 import typing as t
+from copy import deepcopy
+from functools import lru_cache
 from keyword import iskeyword
 from pathlib import Path
 
@@ -22,21 +26,33 @@ from .utils import ARGS_PREFIX, get_url_prefix
 if t.TYPE_CHECKING:
     from typing_extensions import Self
 
-RX_COMMA = re.compile(r"\s*,\s*")
-
-RX_ARGS_START = re.compile(r"{#-?\s*def\s+")
-RX_CSS_START = re.compile(r"{#-?\s*css\s+")
-RX_JS_START = re.compile(r"{#-?\s*js\s+")
+    from .resources import ResourceFile
 
-# This regexp matches the meta declarations (`{#def .. #}``, `{#css .. #}``,
-# and `{#js .. #}`) and regular Jinja comments AT THE BEGINNING of the components source.
-# You can also have comments inside the declarations.
-RX_META_HEADER = re.compile(r"^(\s*{#.*?#})+", re.DOTALL)
+RX_COMMA = re.compile(r"\s*,\s*")
 
 # This regexep matches comments (everything after a `#`)
 # Used to remove them from inside meta declarations
 RX_INTER_COMMENTS = re.compile(r"\s*#[^\n]*")
 
+COMMENT_START = "{#"
+COMMENT_END = "#}"
+
+META_DEF = "def"
+META_CSS = "css"
+META_JS = "js"
+META_PURE = "pure"
+
+# Number of distinct headers whose parsed metadata is remembered
+HEADER_CACHE_SIZE = 2048
+
+# Files bigger than this are memory-mapped to read their header,
+# instead of being read whole.
+MMAP_MIN_SIZE = 64 * 1024
+
+IMMUTABLE_TYPES = (str, int, float, bool, type(None), tuple, frozenset)
+
+ASCII_WHITESPACE = frozenset(b" \t\n\r\x0b\x0c")
+
 
 ALLOWED_NAMES_IN_EXPRESSION_VALUES = {
     "len": len,
@@ -65,6 +81,149 @@ def is_valid_variable_name(name):
     return name.isidentifier() and not iskeyword(name)
 
 
+class Header(t.NamedTuple):
+    required: tuple[str, ...]
+    optional: dict[str, t.Any]
+    css: tuple[str, ...]
+    js: tuple[str, ...]
+    pure: bool
+    defs: int
+
+
+def get_header_end(source: str) -> int:
+    """Returns where the header of the component ends.
+
+    The header are the meta declarations (`{#def .. #}`, `{#css .. #}`,
+    `{#js .. #}`, and `{#pure#}`) and regular Jinja comments AT THE BEGINNING
+    of the component source. This is a single pass that never backtracks,
+    no matter how long the comments are.
+    """
+    end = 0
+    size = len(source)
+    while True:
+        start = end
+        while start < size and source[start].isspace():
+            start += 1
+        if not source.startswith(COMMENT_START, start):
+            return end
+        close = source.find(COMMENT_END, start + 2)
+        if close == -1:
+            return end
+        end = close + 2
+
+
+def read_header(path: "Path | ResourceFile") -> str:
+    """Reads only the header of a component file.
+
+    Big files (with embedded SVG sprites, inline data, etc.) are
+    memory-mapped, so the header is found without reading or
+    decoding the rest of the file.
+    """
+    if not isinstance(path, Path):
+        # Inside an archive, so it can't be memory-mapped
+        data = path.read_bytes()
+        return data[:get_header_end_bytes(data)].decode("utf-8")
+
+    with path.open("rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size < MMAP_MIN_SIZE:
+            data = file.read()
+            return data[:get_header_end_bytes(data)].decode("utf-8")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return data[:get_header_end_bytes(data)].decode("utf-8")
+
+
+def get_header_end_bytes(data: "bytes | mmap.mmap") -> int:
+    """Same as `get_header_end()`, but for the raw content of a file."""
+    start_token = COMMENT_START.encode()
+    end_token = COMMENT_END.encode()
+    end = 0
+    size = len(data)
+    while True:
+        start = end
+        while start < size and data[start] in ASCII_WHITESPACE:
+            start += 1
+        if data[start:start + 2] != start_token:
+            return end
+        close = data.find(end_token, start + 2)
+        if close == -1:
+            return end
+        end = close + 2
+
+
+@lru_cache(maxsize=HEADER_CACHE_SIZE)
+def parse_header(header: str) -> Header:
+    """Parses the header of a component. Memoized, because many components
+    share the exact same header, so each one is only parsed once.
+
+    The result is shared, so don't modify it.
+    """
+    required: tuple[str, ...] = ()
+    optional: dict[str, t.Any] = {}
+    css: list[str] = []
+    js: list[str] = []
+    pure = False
+    defs = 0
+
+    for comment in header.split(COMMENT_END)[:-1]:
+        kind, expr = read_meta_comment(comment)
+        if kind == META_DEF:
+            defs += 1
+            required, optional = parse_args_expr(expr)
+        elif kind == META_CSS:
+            css.append(RX_INTER_COMMENTS.sub("", expr).replace("\n", " "))
+        elif kind == META_JS:
+            js.append(RX_INTER_COMMENTS.sub("", expr).replace("\n", " "))
+        elif kind == META_PURE:
+            pure = True
+
+    return Header(
+        required=required,
+        optional=optional,
+        css=tuple(css),
+        js=tuple(js),
+        pure=pure,
+        defs=defs,
+    )
+
+
+def read_meta_comment(comment: str) -> tuple[str, str]:
+    """Returns the kind and expression of a comment of the header, or
+    empty strings if it's a regular comment."""
+    body = comment.lstrip().removeprefix(COMMENT_START).removeprefix("-")
+    body = body.strip().rstrip(" -\n").lstrip()
+
+    if body == META_PURE:
+        return META_PURE, ""
+
+    for kind in (META_DEF, META_CSS, META_JS):
+        if body.startswith(kind) and body[len(kind):len(kind) + 1].isspace():
+            return kind, body[len(kind):].strip()
+    return "", ""
+
+
+def parse_args_expr(expr: str) -> tuple[tuple[str, ...], dict[str, t.Any]]:
+    expr = expr.strip(" *,/")
+    required = []
+    optional = {}
+
+    try:
+        p = ast.parse(f"def component(*,\n{expr}\n): pass")
+    except SyntaxError as err:
+        raise InvalidArgument(err) from err
+
+    args = p.body[0].args  # type: ignore
+    arg_names = [arg.arg for arg in args.kwonlyargs]
+    for name, value in zip(arg_names, args.kw_defaults):  # noqa: B905
+        if value is None:
+            required.append(name)
+            continue
+        expr = ast.unparse(value)
+        optional[name] = eval_expression(expr)
+
+    return tuple(required), optional
+
+
 class Component:
     """Internal class
     """
@@ -76,6 +235,7 @@ class Component:
         "optional",
         "css",
         "js",
+        "pure",
         "path",
         "relpath",
         "root_path",
@@ -90,7 +250,8 @@ class Component:
     optional: dict[str, t.Any]
     css: list[str]
     js: list[str]
-    path: Path | None
+    pure: bool
+    path: "Path | ResourceFile | None"
     relpath: Path | None
     root_path: Path | None
     mtime: float
@@ -105,8 +266,9 @@ class Component:
         source: str = "",
         mtime: float = 0,
         tmpl: "Template | None" = None,
-        path: "Path | None" = None,
+        path: "Path | ResourceFile | None" = None,
         relpath: "Path | None" = None,
+        metadata: "dict[str, t.Any] | None" = None,
     ) -> None:
         self.name = name
         self.prefix = prefix
@@ -115,14 +277,21 @@ class Component:
         self.optional = {}
         self.css = []
         self.js = []
+        self.pure = False
+
+        if metadata is not None:
+            # Previously parsed, so there's no need to read the file
+            self.set_metadata(metadata)
+        else:
+            if path is not None and not source:
+                source = read_header(path)
+            if source:
+                self.load_metadata(source)
 
         if path is not None:
-            source = source or path.read_text()
             mtime = mtime or path.stat().st_mtime
-        if source:
-            self.load_metadata(source)
 
-        if path is not None and relpath is not None:
+        if metadata is None and path is not None and relpath is not None:
             default_css = str(relpath.with_suffix(".css").as_posix())
             if (path.with_suffix(".css")).is_file():
                 self.css.extend(self.parse_files_expr(default_css))
@@ -142,7 +311,6 @@ class Component:
         cls,
         cache: dict[str, t.Any],
         auto_reload: bool = True,
-        globals: "t.MutableMapping[str, t.Any] | None" = None,
     ) -> "Self | None":
         path = cache["path"]
         mtime = cache["mtime"]
@@ -154,77 +322,54 @@ class Component:
         self = cls(name=cache["name"])
         for key in self.__slots__:
             setattr(self, key, cache[key])
-
-        if self.tmpl:
-            # Create a copy of the globals dictionary to ensure thread safety
-            globals_copy = {**self.tmpl.globals}
-            globals_copy.update(globals or {})
-            self.tmpl.globals = globals_copy
-
         return self
 
     def serialize(self) -> dict[str, t.Any]:
         return {k: getattr(self, k) for k in self.__slots__}
 
+    def get_metadata(self) -> dict[str, t.Any]:
+        """The metadata parsed from the header and the asset files
+        next to the component, for `MetadataCache`."""
+        return {
+            "required": self.required,
+            "optional": self.optional,
+            "css": self.css,
+            "js": self.js,
+            "pure": self.pure,
+        }
+
+    def set_metadata(self, metadata: dict[str, t.Any]) -> None:
+        self.required = list(metadata["required"])
+        self.optional = deepcopy(metadata["optional"])
+        self.css = list(metadata["css"])
+        self.js = list(metadata["js"])
+        self.pure = metadata["pure"]
+
     def load_metadata(self, source: str) -> None:
-        match = RX_META_HEADER.match(source)
-        if not match:
+        end = get_header_end(source)
+        if not end:
             return
 
-        header = match.group(0)
-        # Reversed because I will use `header.pop()`
-        header = header.split("#}")[:-1][::-1]
-        def_found = False
-
-        while header:
-            item = header.pop().strip(" -\n")
-
-            expr = self.read_metadata_item(item, RX_ARGS_START)
-            if expr:
-                if def_found:
-                    raise DuplicateDefDeclaration(self.name)
-                self.required, self.optional = self.parse_args_expr(expr)
-                def_found = True
-                continue
-
-            expr = self.read_metadata_item(item, RX_CSS_START)
-            if expr:
-                expr = RX_INTER_COMMENTS.sub("", expr).replace("\n", " ")
-                self.css = [*self.css, *self.parse_files_expr(expr)]
-                continue
-
-            expr = self.read_metadata_item(item, RX_JS_START)
-            if expr:
-                expr = RX_INTER_COMMENTS.sub("", expr).replace("\n", " ")
-                self.js = [*self.js, *self.parse_files_expr(expr)]
-                continue
-
-    def read_metadata_item(self, source: str, rx_start: re.Pattern) -> str:
-        start = rx_start.match(source)
-        if not start:
-            return ""
-        return source[start.end():].strip()
+        header = parse_header(source[:end])
+        if header.defs > 1:
+            raise DuplicateDefDeclaration(self.name)
+
+        self.required = list(header.required)
+        # The parsed header is shared, so each component needs its own
+        # copy of any mutable default value.
+        self.optional = {
+            name: value if isinstance(value, IMMUTABLE_TYPES) else deepcopy(value)
+            for name, value in header.optional.items()
+        }
+        for expr in header.css:
+            self.css = [*self.css, *self.parse_files_expr(expr)]
+        for expr in header.js:
+            self.js = [*self.js, *self.parse_files_expr(expr)]
+        self.pure = header.pure
 
     def parse_args_expr(self, expr: str) -> tuple[list[str], dict[str, t.Any]]:
-        expr = expr.strip(" *,/")
-        required = []
-        optional = {}
-
-        try:
-            p = ast.parse(f"def component(*,\n{expr}\n): pass")
-        except SyntaxError as err:
-            raise InvalidArgument(err) from err
-
-        args = p.body[0].args  # type: ignore
-        arg_names = [arg.arg for arg in args.kwonlyargs]
-        for name, value in zip(arg_names, args.kw_defaults):  # noqa: B905
-            if value is None:
-                required.append(name)
-                continue
-            expr = ast.unparse(value)
-            optional[name] = eval_expression(expr)
-
-        return required, optional
+        required, optional = parse_args_expr(expr)
+        return list(required), optional
 
     def parse_files_expr(self, expr: str) -> list[str]:
         files = []
@@ -253,10 +398,16 @@ class Component:
         extra = kw.copy()
         return args, extra
 
-    def render(self, **kwargs):
+    def render(self, globals: "dict[str, t.Any] | None" = None, /, **kwargs):
+        """Renders the template. The `globals` of this render are passed as
+        variables, instead of updating the shared `tmpl.globals`, so
+        renders in different threads can't see each other's globals.
+        """
         assert self.tmpl, f"Component {self.name} has no template"
         kwargs.setdefault(ARGS_PREFIX, self.prefix)
-        html = self.tmpl.render(**kwargs).strip()
+        if globals:
+            kwargs = {**globals, **kwargs}
+        html = self.tmpl.render(kwargs).strip()
         return Markup(html)
 
     def __repr__(self) -> str:
@@ -264,7 +415,7 @@ class Component:
 
     def _get_root_path(self) -> Path | None:
         """Get the root path of the component."""
-        if self.path is None or self.relpath is None:
+        if not isinstance(self.path, Path) or self.relpath is None:
             return None
         suffix = str(self.relpath.as_posix())
         if self.url_prefix:
@@ -0,0 +1,139 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import math
+import typing as t
+
+from jinja2 import meta, nodes
+
+from .component import Component, get_header_end
+from .exceptions import ComponentNotFound, UnknownPrefix
+from .store import StoredFile
+from .utils import ARGS_PREFIX
+
+
+if t.TYPE_CHECKING:
+    from .catalog import Catalog
+
+
+# Components with a longer body (after the header) are never inlined
+INLINE_MAX_SIZE = 2000
+
+# Default values that can be written as a literal in the inlined code
+LITERAL_TYPES = (str, int, float, bool, type(None))
+
+# A body with any of these can't be moved inside another template
+UNSAFE_NODES = (
+    nodes.Extends,
+    nodes.Block,
+    nodes.Macro,
+    nodes.CallBlock,
+    nodes.Import,
+    nodes.FromImport,
+    nodes.Include,
+)
+
+# The `+` keep the whitespace around the call with `lstrip_blocks` and
+# `trim_blocks`, like with the calls that aren't inlined.
+INLINE_BLOCK = (
+    "{%+ with [ARGS] %}[ASSETS]{% filter trim %}[BODY]{% endfilter %}{% endwith +%}"
+)
+INLINE_ASSETS = "{% do catalog._collect_inlined([TAG], [ARGS_PREFIX]) %}"
+INLINE_ASSETS = INLINE_ASSETS.replace("[ARGS_PREFIX]", ARGS_PREFIX)
+
+
+def get_inlined(
+    catalog: "Catalog",
+    tag: str,
+    args: list[tuple[str, str]],
+    caller_prefix: str,
+) -> tuple[str, Component] | None:
+    """Returns the code that replaces the call to the component of `tag`,
+    and the component, or `None` if the component can't be inlined.
+
+    Only small components without subcomponents qualify, called without
+    content and only with declared arguments (none that would end in
+    `attrs`), and whose body doesn't use any variable other than those
+    arguments.
+    """
+    try:
+        component = catalog._find_component(tag, {ARGS_PREFIX: caller_prefix})
+    except (ComponentNotFound, UnknownPrefix):
+        return None
+    if component.path is None or component.pure:
+        return None
+    if isinstance(component.path, StoredFile):
+        # Can change at any time without the caller noticing
+        return None
+
+    given = dict(args)
+    declared = {*component.required, *component.optional}
+    if not given.keys() <= declared:
+        return None
+    if any(name not in given for name in component.required):
+        return None
+
+    values = []
+    for name in component.required:
+        values.append(f"{name}={given[name]}")
+    for name, default in component.optional.items():
+        if name in given:
+            values.append(f"{name}={given[name]}")
+        elif is_literal(default):
+            values.append(f"{name}={default!r}")
+        else:
+            return None
+
+    body = get_inlinable_body(catalog, component, declared)
+    if body is None:
+        return None
+
+    assets = ""
+    if component.css or component.js:
+        assets = INLINE_ASSETS.replace("[TAG]", repr(tag))
+
+    code = (
+        INLINE_BLOCK.replace("[ARGS]", ", ".join(values))
+        .replace("[ASSETS]", assets)
+        .replace("[BODY]", body)
+    )
+    return code, component
+
+
+def is_literal(value: t.Any) -> bool:
+    """If the value can be written as a Jinja literal. `repr()` writes the
+    infinite numbers and NaN as names (`inf`, `nan`), that Jinja would
+    read as undefined variables."""
+    if isinstance(value, float):
+        return math.isfinite(value)
+    return isinstance(value, LITERAL_TYPES)
+
+
+def get_inlinable_body(
+    catalog: "Catalog",
+    component: Component,
+    declared: set[str],
+) -> str | None:
+    assert component.path is not None
+    source = component.path.read_text("utf-8")
+    body = source[get_header_end(source):]
+    if len(body) > INLINE_MAX_SIZE:
+        return None
+
+    from .jinjax import RX_RAW, RX_TAG_NAME
+
+    # Only leaf components. The raw blocks of the parent are set aside
+    # before its tags are processed, so the inlined ones would be processed.
+    if RX_TAG_NAME.search(body) or RX_RAW.search(body):
+        return None
+
+    try:
+        ast = catalog.jinja_env.parse(body)
+    except Exception:
+        return None
+    if next(ast.find_all(UNSAFE_NODES), None) is not None:
+        return None
+    if not meta.find_undeclared_variables(ast) <= declared:
+        return None
+    return body
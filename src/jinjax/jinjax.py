@@ -4,22 +4,43 @@ Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
 """
 import re
 import typing as t
+from pathlib import Path
+from time import perf_counter
 from uuid import uuid4
 
+from jinja2 import nodes
+from jinja2.compiler import CodeGenerator, Frame
 from jinja2.exceptions import TemplateSyntaxError
 from jinja2.ext import Extension
 from jinja2.filters import do_forceescape
 
-from .utils import ARGS_PREFIX, logger
+from .check import CallError, check_call
+from .inline import get_inlined
+from .loaders import CatalogLoader
+from .stats import PREPROCESS
+from .utils import ARGS_PREFIX, DEFAULT_PREFIX, logger
 
 
-RENDER_CMD = "catalog.irender"
+if t.TYPE_CHECKING:
+    from jinja2 import Environment
+    from jinja2.parser import Parser
 
-BLOCK_CALL = '{% call(_slot="") [CMD]("[TAG]", [ARGS_PREFIX]=[ARGS_PREFIX][ATTRS]) -%}[CONTENT]{%- endcall %}'
-BLOCK_CALL = BLOCK_CALL.replace("[CMD]", RENDER_CMD).replace("[ARGS_PREFIX]", ARGS_PREFIX)
 
-INLINE_CALL = '{{ [CMD]("[TAG]", [ARGS_PREFIX]=[ARGS_PREFIX][ATTRS]) }}'
-INLINE_CALL = INLINE_CALL.replace("[CMD]", RENDER_CMD).replace("[ARGS_PREFIX]", ARGS_PREFIX)
+TAG_INLINE = "jxrender"
+TAG_BLOCK = "jxcall"
+
+# The `+` keep the whitespace around the tag with `lstrip_blocks` and
+# `trim_blocks`, as if the call were a `{{ ... }}` expression.
+BLOCK_CALL = '{%+ [CMD] "[TAG]", [ATTRS] -%}[CONTENT]{%- end[CMD] +%}'
+BLOCK_CALL = BLOCK_CALL.replace("[CMD]", TAG_BLOCK)
+
+INLINE_CALL = '{%+ [CMD] "[TAG]", [ATTRS] +%}'
+INLINE_CALL = INLINE_CALL.replace("[CMD]", TAG_INLINE)
+
+# The variables the compiled calls read from the template context
+CATALOG_VAR = "catalog"
+RENDER_METHOD = "_render_tag"
+SLOT_VAR = "_slot"
 
 re_raw = r"\{%-?\s*raw\s*-?%\}.+?\{%-?\s*endraw\s*-?%\}"
 RX_RAW = re.compile(re_raw, re.DOTALL)
@@ -42,9 +63,86 @@ re_attr = r"""
 RX_ATTR = re.compile(re_attr, re.VERBOSE | re.DOTALL)
 
 
+def is_component_call(node: nodes.Node) -> bool:
+    """Whether the node is a `catalog._render_tag(...)` call, made by
+    the extension for a component tag."""
+    return (
+        isinstance(node, nodes.Call)
+        and isinstance(node.node, nodes.Getattr)
+        and node.node.attr == RENDER_METHOD
+        and isinstance(node.node.node, nodes.Name)
+        and node.node.node.name == CATALOG_VAR
+        and len(node.args) == 3
+        and not (node.kwargs or node.dyn_args or node.dyn_kwargs)
+    )
+
+
+class JinjaXCodeGenerator(CodeGenerator):
+    """Compiles the calls of the component tags to a direct call to
+    `catalog._render_tag()`, skipping the `context.call()` and
+    `environment.getattr()` indirections of a regular call."""
+
+    def visit_Call(
+        self,
+        node: nodes.Call,
+        frame: Frame,
+        forward_caller: bool = False,
+    ) -> None:
+        if self.environment.is_async or not is_component_call(node):
+            return super().visit_Call(node, frame, forward_caller=forward_caller)
+
+        self.visit(node.node.node, frame)  # type: ignore
+        self.write(f".{RENDER_METHOD}(")
+        for i, arg in enumerate(node.args):
+            if i:
+                self.write(", ")
+            self.visit(arg, frame)
+        if forward_caller:
+            self.write(", caller")
+        self.write(")")
+
+
 class JinjaX(Extension):
-    _name: str | None = None
-    _filename: str | None = None
+    tags = {TAG_INLINE, TAG_BLOCK}
+
+    def __init__(self, environment: "Environment") -> None:
+        super().__init__(environment)
+        # The component calls need a code generator that knows how to
+        # compile them, so it's added to the one of the environment.
+        cls = environment.code_generator_class
+        if not issubclass(cls, JinjaXCodeGenerator):
+            environment.code_generator_class = type(
+                f"JinjaX{cls.__name__}", (JinjaXCodeGenerator, cls), {}
+            )
+
+    def parse(self, parser: "Parser") -> nodes.Node:
+        token = next(parser.stream)
+        lineno = token.lineno
+        name = parser.stream.expect("string").value
+        parser.stream.expect("comma")
+        attrs = parser.parse_expression()
+        if not isinstance(attrs, nodes.Dict):
+            parser.fail("Expected the attributes of the component", lineno)
+
+        call = nodes.Call(
+            nodes.Getattr(nodes.Name(CATALOG_VAR, "load"), RENDER_METHOD, "load"),
+            [nodes.Const(name), nodes.Name(ARGS_PREFIX, "load"), attrs],
+            [],
+            None,
+            None,
+            lineno=lineno,
+        )
+        if token.value == TAG_INLINE:
+            return nodes.Output([call], lineno=lineno)
+
+        body = parser.parse_statements((f"name:end{TAG_BLOCK}",), drop_needle=True)
+        return nodes.CallBlock(
+            call,
+            [nodes.Name(SLOT_VAR, "param")],
+            [nodes.Const("")],
+            body,
+            lineno=lineno,
+        )
 
     def preprocess(
         self,
@@ -52,45 +150,108 @@ class JinjaX(Extension):
         name: t.Optional[str] = None,
         filename: t.Optional[str] = None,
     ) -> str:
-        self.__raw_blocks = {}
-        self._name = name
-        self._filename = filename
-        source = self.replace_raw_blocks(source)
-        source = self.process_tags(source)
-        source = self.restore_raw_blocks(source)
-        self.__raw_blocks = {}
+        stats = getattr(getattr(self.environment, "catalog", None), "_stats", None)
+        start = perf_counter() if stats is not None else 0
+
+        loader = self.environment.loader
+        if name and isinstance(loader, CatalogLoader):
+            # Recorded again if any component is inlined
+            loader.dependencies.pop(name, None)
+
+        # The extension is shared by every template of the environment,
+        # so the state of a preprocessing is kept local to the call.
+        raw_blocks: dict[str, str] = {}
+        calls: set[str] = set()
+        source = self.replace_raw_blocks(source, raw_blocks)
+        source = self.process_tags(source, name=name, filename=filename, calls=calls)
+        source = self.restore_raw_blocks(source, raw_blocks)
+
+        catalog = getattr(self.environment, "catalog", None)
+        if name and catalog is not None:
+            catalog._calls[name] = frozenset(calls)
+
+        if stats is not None:
+            stats.record(PREPROCESS, perf_counter() - start)
         return source
 
-    def replace_raw_blocks(self, source: str) -> str:
+    def replace_raw_blocks(self, source: str, raw_blocks: dict[str, str]) -> str:
         while True:
             match = RX_RAW.search(source)
             if not match:
                 break
             start, end = match.span(0)
-            repl = self._replace_raw_block(match)
+            repl = self._replace_raw_block(match, raw_blocks)
             source = f"{source[:start]}{repl}{source[end:]}"
 
         return source
 
-    def _replace_raw_block(self, match: re.Match) -> str:
+    def _replace_raw_block(self, match: re.Match, raw_blocks: dict[str, str]) -> str:
         uid = f"--RAW-{uuid4().hex}--"
-        self.__raw_blocks[uid] = do_forceescape(match.group(0))
+        raw_blocks[uid] = do_forceescape(match.group(0))
         return uid
 
-    def restore_raw_blocks(self, source: str) -> str:
-        for uid, code in self.__raw_blocks.items():
+    def restore_raw_blocks(self, source: str, raw_blocks: dict[str, str]) -> str:
+        for uid, code in raw_blocks.items():
             source = source.replace(uid, code)
         return source
 
-    def process_tags(self, source: str) -> str:
+    def process_tags(
+        self,
+        source: str,
+        *,
+        name: t.Optional[str] = None,
+        filename: t.Optional[str] = None,
+        errors: t.Optional[list[CallError]] = None,
+        calls: t.Optional[set[str]] = None,
+    ) -> str:
         while True:
             match = RX_TAG_NAME.search(source)
             if not match:
                 break
-            source = self.replace_tag(source, match)
+            source = self.replace_tag(
+                source,
+                match,
+                name=name,
+                filename=filename,
+                errors=errors,
+                calls=calls,
+            )
         return source
 
-    def replace_tag(self, source: str, match: re.Match) -> str:
+    def find_calls(self, source: str) -> set[str]:
+        """Returns the names of the components called by the tags of the
+        source, as they are written, without processing them."""
+        source = RX_RAW.sub("", source)
+        return {match.group("tag") for match in RX_TAG_NAME.finditer(source)}
+
+    def check(
+        self,
+        source: str,
+        *,
+        name: t.Optional[str] = None,
+        filename: t.Optional[str] = None,
+    ) -> list[CallError]:
+        """Returns the problems found in the component tags of the source:
+        syntax errors, components that can't be found, and missing required
+        arguments, without compiling or rendering the template."""
+        errors: list[CallError] = []
+        source = self.replace_raw_blocks(source, {})
+        try:
+            self.process_tags(source, name=name, filename=filename, errors=errors)
+        except TemplateSyntaxError as err:
+            errors.append(CallError(name or "", err.lineno, "", err.message or ""))
+        return errors
+
+    def replace_tag(
+        self,
+        source: str,
+        match: re.Match,
+        *,
+        name: t.Optional[str] = None,
+        filename: t.Optional[str] = None,
+        errors: t.Optional[list[CallError]] = None,
+        calls: t.Optional[set[str]] = None,
+    ) -> str:
         start, curr = match.span(0)
         lineno = source[:start].count("\n") + 1
 
@@ -100,10 +261,14 @@ class JinjaX(Extension):
             raise TemplateSyntaxError(
                 message=f"Syntax error `{tag}`",
                 lineno=lineno,
-                name=self._name,
-                filename=self._filename
+                name=name,
+                filename=filename
             )
 
+        # Keep the line breaks of the opening tag, so the line numbers
+        # of the rest of the template don't change.
+        lines = source.count("\n", start, end)
+
         inline = source[end - 2:end] == "/>"
         if inline:
             content = ""
@@ -114,14 +279,29 @@ class JinjaX(Extension):
                 raise TemplateSyntaxError(
                     message=f"Unclosed component {tag}",
                     lineno=lineno,
-                    name=self._name,
-                    filename=self._filename
+                    name=name,
+                    filename=filename
                 )
             content = source[end:index]
             end = index + len(close_tag)
 
+        if calls is not None:
+            calls.add(tag)
+
         attrs_list = self._parse_attrs(attrs)
-        repl = self._build_call(tag, attrs_list, content)
+        self._check_call(
+            tag,
+            attrs_list,
+            lineno=lineno,
+            name=name,
+            filename=filename,
+            errors=errors,
+        )
+        repl = None
+        if inline:
+            repl = self._inline_call(tag, attrs_list, name=name)
+        if repl is None:
+            repl = self._build_call(tag, attrs_list, content, lines=lines)
 
         return f"{source[:start]}{repl}{source[end:]}"
 
@@ -184,21 +364,82 @@ class JinjaX(Extension):
             return []
         return RX_ATTR.findall(attrs)
 
-    def _build_call(
+    def _check_call(
         self,
         tag: str,
         attrs_list: list[tuple[str, str]],
-        content: str = "",
-    ) -> str:
-        logger.debug(f"{tag} {attrs_list} {'inline' if not content else ''}")
-        attrs = []
+        *,
+        lineno: int,
+        name: t.Optional[str] = None,
+        filename: t.Optional[str] = None,
+        errors: t.Optional[list[CallError]] = None,
+    ) -> None:
+        """Adds the problems of the call to `errors` or, if the catalog has
+        `check_calls` enabled, raises them as syntax errors."""
+        catalog = getattr(self.environment, "catalog", None)
+        if catalog is None or (errors is None and not catalog.check_calls):
+            return
+
+        args = [arg for arg, _ in self._get_args(attrs_list)]
+        message = check_call(catalog, tag, args, self._get_caller_prefix(name))
+        if message is None:
+            return
+        if errors is not None:
+            errors.append(CallError(name or "", lineno, tag, message))
+            return
+        raise TemplateSyntaxError(
+            message=f"<{tag}> {message}",
+            lineno=lineno,
+            name=name,
+            filename=filename,
+        )
+
+    def _get_caller_prefix(self, name: t.Optional[str]) -> str:
+        loader = self.environment.loader
+        if name and isinstance(loader, CatalogLoader):
+            return loader.split_name(name)[0]
+        return DEFAULT_PREFIX
+
+    def _inline_call(
+        self,
+        tag: str,
+        attrs_list: list[tuple[str, str]],
+        *,
+        name: t.Optional[str] = None,
+    ) -> t.Optional[str]:
+        """Returns the body of the called component to replace the call,
+        if the catalog has `inline_components` enabled and the component
+        qualifies. See `inline.get_inlined()`."""
+        env = self.environment
+        catalog = getattr(env, "catalog", None)
+        # The bytecode cache would only check if the parent has changed
+        if catalog is None or not catalog.inline_components or env.bytecode_cache:
+            return None
+
+        prefix = self._get_caller_prefix(name)
+        inlined = get_inlined(catalog, tag, self._get_args(attrs_list), prefix)
+        if inlined is None:
+            return None
+        code, component = inlined
+        loader = env.loader
+        path = component.path
+        # The files inside a package archive don't change
+        if name and isinstance(loader, CatalogLoader) and isinstance(path, Path):
+            loader.add_dependency(name, path, component.mtime)
+        logger.debug(f"{tag} inlined")
+        return code
+
+    def _get_args(self, attrs_list: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """Returns the names of the attributes and their values
+        as Jinja expressions."""
+        args = []
         for name, value in attrs_list:
             name = name.strip().replace("-", "_")
             value = value.strip()
 
             if not value:
                 name = name.lstrip(":")
-                attrs.append(f'"{name}"=True')
+                args.append((name, "True"))
             else:
                 # vue-like syntax
                 if (
@@ -213,11 +454,20 @@ class JinjaX(Extension):
                     value = value[2:-2].strip()
 
                 name = name.lstrip(":")
-                attrs.append(f'"{name}"={value}')
+                args.append((name, value))
+        return args
 
-        str_attrs = "**{" + ", ".join([a.replace("=", ":", 1) for a in attrs]) + "}"
-        if str_attrs:
-            str_attrs = f", {str_attrs}"
+    def _build_call(
+        self,
+        tag: str,
+        attrs_list: list[tuple[str, str]],
+        content: str = "",
+        *,
+        lines: int = 0,
+    ) -> str:
+        logger.debug(f"{tag} {attrs_list} {'inline' if not content else ''}")
+        attrs = [f'"{name}":{value}' for name, value in self._get_args(attrs_list)]
+        str_attrs = "{" + ", ".join(attrs) + "}" + "\n" * lines
 
         if not content:
             call = INLINE_CALL.replace("[TAG]", tag).replace("[ATTRS]", str_attrs)
@@ -0,0 +1,363 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import os
+import posixpath
+import typing as t
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+
+import jinja2
+from jinja2.loaders import split_template_path
+
+from .resources import Package
+from .stats import COMPILE
+from .utils import DEFAULT_PREFIX, PREFIX_SEP
+
+
+# Added to the sources to compute the checksums of the bytecode cache
+BCC_MARK = "jinjax\n"
+
+
+class CatalogLoader(jinja2.BaseLoader):
+    """Jinja loader that dispatches to the loader of each prefix.
+
+    The names of the templates of prefixed components are
+    `"{prefix}:{relpath}"`, so the same relative path under two
+    prefixes are two different entries in the Jinja cache. Using a
+    single loader, instead of swapping `Environment.loader` on each
+    render, makes the environment safe to share between threads.
+
+    The templates that aren't found in its own prefixes are searched for
+    in its `parent`, if any: the loader of the catalog it overlays (see
+    `Catalog.overlay()`), or the original loader of an environment the
+    catalog is attached to.
+    """
+
+    def __init__(
+        self,
+        prefixes: t.Mapping[str, jinja2.BaseLoader],
+        parent: jinja2.BaseLoader | None = None,
+    ) -> None:
+        self.prefixes = prefixes
+        self.parent = parent
+        # Template name -> the files of the components inlined into it
+        # and their last-modified time when they were inlined.
+        self.dependencies: dict[str, dict[str, float]] = {}
+
+    def get_source(
+        self,
+        environment: jinja2.Environment,
+        template: str,
+    ) -> tuple[str, str | None, t.Callable[[], bool] | None]:
+        source, filename, uptodate, _ = self._find_source(environment, template)
+        return source, filename, uptodate
+
+    def _find_source(
+        self,
+        environment: jinja2.Environment,
+        template: str,
+    ) -> tuple[str, str | None, t.Callable[[], bool] | None, bool]:
+        """Like `get_source()`, but also returns if the template was found
+        by a loader that isn't of a catalog, like the original loader of
+        an environment the catalog is attached to."""
+        prefix, name = self.split_name(template)
+        loader = self.prefixes.get(prefix)
+        try:
+            if loader is None:
+                raise jinja2.TemplateNotFound(template)
+            source, filename, uptodate = loader.get_source(environment, name)
+        except jinja2.TemplateNotFound:
+            if self.parent is None:
+                raise
+            if isinstance(self.parent, CatalogLoader):
+                return self.parent._find_source(environment, template)
+            source, filename, uptodate = self.parent.get_source(environment, template)
+            return source, filename, uptodate, True
+
+        def is_uptodate() -> bool:
+            if uptodate is not None and not uptodate():
+                return False
+            for path, mtime in self.dependencies.get(template, {}).items():
+                try:
+                    if os.path.getmtime(path) != mtime:
+                        return False
+                except OSError:
+                    return False
+            return True
+
+        return source, filename, is_uptodate, False
+
+    def load(
+        self,
+        environment: jinja2.Environment,
+        name: str,
+        globals: t.MutableMapping[str, t.Any] | None = None,
+    ) -> jinja2.Template:
+        """Like `jinja2.BaseLoader.load()`, but the bytecode is cached
+        with the checksum of the source marked as compiled with the tags
+        of the components, so the bytecode of a template compiled by an
+        environment before a catalog was attached to it isn't used."""
+        source, filename, uptodate, is_host = self._find_source(environment, name)
+        bcc = environment.bytecode_cache
+        if bcc is None:
+            code = environment.compile(source, name, filename)
+        else:
+            bucket = bcc.get_bucket(environment, name, filename, BCC_MARK + source)
+            if bucket.code is None:
+                bucket.code = environment.compile(source, name, filename)
+                bcc.set_bucket(bucket)
+            code = bucket.code
+        tmpl = environment.template_class.from_code(
+            environment, code, globals or {}, uptodate
+        )
+        if is_host:
+            tmpl.jinjax_host = True  # type: ignore
+        return tmpl
+
+    def add_dependency(self, template: str, path: Path, mtime: float) -> None:
+        """Records that the component at `path` was inlined into `template`,
+        so the template is compiled again if the file changes."""
+        self.dependencies.setdefault(template, {})[str(path)] = mtime
+
+    def list_templates(self) -> list[str]:
+        names = set()
+        if self.parent is not None:
+            try:
+                names.update(self.parent.list_templates())
+            except TypeError:
+                # The loader can't list its templates
+                pass
+        for prefix, loader in self.prefixes.items():
+            for name in loader.list_templates():
+                names.add(get_template_name(prefix, name))
+        return sorted(names)
+
+    def has_prefix(self, prefix: str) -> bool:
+        if prefix in self.prefixes:
+            return True
+        return isinstance(self.parent, CatalogLoader) and self.parent.has_prefix(prefix)
+
+    def split_name(self, template: str) -> tuple[str, str]:
+        if PREFIX_SEP in template:
+            prefix, name = template.split(PREFIX_SEP, 1)
+            if self.has_prefix(prefix):
+                return prefix, name
+        return DEFAULT_PREFIX, template
+
+    def join_path(self, template: str, parent: str) -> str:
+        """Templates included or extended from a prefixed component are
+        searched under the same prefix, unless they have their own."""
+        prefix, _ = self.split_name(parent)
+        if not prefix or self.split_name(template)[0]:
+            return template
+        return get_template_name(prefix, template)
+
+
+class ComponentsLoader(jinja2.FileSystemLoader):
+    """The loader of the components of a prefix.
+
+    Works like `jinja2.FileSystemLoader`, but its search path can also
+    have packages (see `Catalog.add_package()`), read from their index
+    instead of walking their folders.
+    """
+
+    def get_source(
+        self,
+        environment: jinja2.Environment,
+        template: str,
+    ) -> tuple[str, str, t.Callable[[], bool]]:
+        pieces = split_template_path(template)
+        for root in self.searchpath:
+            if isinstance(root, Package):
+                found = root.get_source(posixpath.join(*pieces))
+                if found is not None:
+                    return found
+                continue
+
+            filename = posixpath.join(root, *pieces)
+            if not os.path.isfile(filename):
+                continue
+            with open(filename, encoding=self.encoding) as f:
+                source = f.read()
+            mtime = os.path.getmtime(filename)
+
+            def uptodate(filename: str = filename, mtime: float = mtime) -> bool:
+                try:
+                    return os.path.getmtime(filename) == mtime
+                except OSError:
+                    return False
+
+            return source, os.path.normpath(filename), uptodate
+
+        raise jinja2.TemplateNotFound(template)
+
+    def list_templates(self) -> list[str]:
+        found = set()
+        for root in self.searchpath:
+            if isinstance(root, Package):
+                found.update(root.files)
+            else:
+                loader = jinja2.FileSystemLoader(root, followlinks=self.followlinks)
+                found.update(loader.list_templates())
+        return sorted(found)
+
+
+class CatalogEnvironment(jinja2.Environment):
+    def compile(self, *args, **kwargs) -> t.Any:
+        stats = getattr(getattr(self, "catalog", None), "_stats", None)
+        if stats is None:
+            return super().compile(*args, **kwargs)
+
+        start = perf_counter()
+        try:
+            return super().compile(*args, **kwargs)
+        finally:
+            stats.record(COMPILE, perf_counter() - start)
+
+    def join_path(self, template: str, parent: str) -> str:
+        if isinstance(self.loader, CatalogLoader):
+            joined = self.loader.join_path(template, parent)
+            if joined != template:
+                return joined
+        # The `join_path()` of an environment the catalog is attached to
+        return super().join_path(template, parent)
+
+
+class HostTemplate(jinja2.Template):
+    """The class of the templates of an environment a catalog is attached
+    to. Those that aren't components are rendered with their own assets,
+    like `Catalog.render()` renders a component, so they can also use
+    `catalog.render_assets()`."""
+
+    def render(self, *args: t.Any, **kwargs: t.Any) -> str:
+        catalog = getattr(self.environment, "catalog", None)
+        if catalog is None or not getattr(self, "jinjax_host", False):
+            return super().render(*args, **kwargs)
+        return catalog._render_host(super().render, *args, **kwargs)
+
+
+def attach_environment(
+    env: jinja2.Environment,
+    loader: CatalogLoader,
+) -> jinja2.Environment:
+    """Makes an existing environment load the components with `loader`,
+    in place, instead of copying it, so its settings and its caches are
+    shared with the catalog.
+
+    Like the code generator of the `JinjaX` extension, the class of the
+    environment is replaced by a subclass that also inherits from
+    `CatalogEnvironment`, and the class of its templates by one that also
+    inherits from `HostTemplate`. The original loader of the environment
+    must be the `parent` of `loader`, to keep finding its own templates.
+    """
+    if getattr(env, "catalog", None) is not None:
+        raise ValueError("The Jinja environment already has a catalog attached")
+    cls = type(env)
+    if not issubclass(cls, CatalogEnvironment):
+        env.__class__ = type(f"Catalog{cls.__name__}", (CatalogEnvironment, cls), {})
+    tmpl_cls = env.template_class
+    if not issubclass(tmpl_cls, HostTemplate):
+        env.template_class = type(
+            f"Host{tmpl_cls.__name__}", (HostTemplate, tmpl_cls), {}
+        )
+
+    old_loader = env.loader
+    env.loader = loader
+    cache = env.cache
+    if cache is not None and old_loader is not None:
+        # The templates already compiled were compiled without the
+        # component tags, so they are forgotten to be compiled again.
+        for key in list(cache.keys()):
+            if key[0]() is old_loader:
+                del cache[key]
+    return env
+
+
+class TemplateCache(MutableMapping):
+    """LRU cache of the compiled templates of the catalog environment.
+
+    Used instead of the `jinja2.utils.LRUCache` of Jinja, because reading
+    an entry of that one takes a time proportional to its size, and the
+    catalog grows it to fit every component. It also counts the entries
+    evicted to make room for others, because each of those templates must
+    be compiled again the next time it's used.
+    """
+
+    __slots__ = ("capacity", "evictions", "on_evict", "_data", "_lock")
+
+    def __init__(
+        self,
+        capacity: int,
+        on_evict: t.Callable[[], t.Any] | None = None,
+    ) -> None:
+        self.capacity = capacity
+        self.evictions = 0
+        self.on_evict = on_evict
+        self._data: OrderedDict[t.Any, t.Any] = OrderedDict()
+        self._lock = Lock()
+
+    def __getitem__(self, key: t.Any) -> t.Any:
+        with self._lock:
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def __setitem__(self, key: t.Any, value: t.Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            evicted = self._evict()
+        if evicted and self.on_evict is not None:
+            for _ in range(evicted):
+                self.on_evict()
+
+    def __delitem__(self, key: t.Any) -> None:
+        with self._lock:
+            del self._data[key]
+
+    def __contains__(self, key: t.Any) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> t.Iterator[t.Any]:
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: t.Any, default: t.Any = None) -> t.Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def copy(self) -> "TemplateCache":
+        rv = TemplateCache(self.capacity, on_evict=self.on_evict)
+        rv._data.update(self._data)
+        return rv
+
+    def resize(self, capacity: int) -> None:
+        with self._lock:
+            self.capacity = capacity
+            self._evict()
+
+    def _evict(self) -> int:
+        evicted = 0
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+            evicted += 1
+        self.evictions += evicted
+        return evicted
+
+
+def get_template_name(prefix: str, relpath: str) -> str:
+    if not prefix:
+        return relpath
+    return f"{prefix}{PREFIX_SEP}{relpath}"
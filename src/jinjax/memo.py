@@ -0,0 +1,121 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import typing as t
+from collections import OrderedDict
+from threading import Lock
+
+from markupsafe import Markup
+
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    from .component import Component
+
+
+DEFAULT_MEMO_SIZE = 1024
+
+# Only values of these types can be part of a memo key. Anything else
+# (lists, dicts, custom objects) could be mutated between renders, so
+# a call with them always runs the template.
+MEMOIZABLE_TYPES = (str, Markup, int, float, bool, type(None))
+
+
+class MemoInfo(t.NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class MemoEntry(t.NamedTuple):
+    html: str
+    css: tuple[str, ...]
+    js: tuple[str, ...]
+
+
+def is_memoizable(value: t.Any) -> bool:
+    if isinstance(value, MEMOIZABLE_TYPES):
+        return True
+    if isinstance(value, tuple | frozenset):
+        return all(is_memoizable(item) for item in value)
+    return False
+
+
+class Memo:
+    """Bounded, thread-safe LRU cache of the output of pure components.
+
+    Each entry also stores the CSS/JS assets collected by the subcomponents
+    during the render, so they can still be collected on a cache hit.
+    """
+
+    __slots__ = ("maxsize", "hits", "misses", "_data", "_lock")
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE) -> None:
+        self.maxsize = max(maxsize, 0)
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[tuple, MemoEntry] = OrderedDict()
+        self._lock = Lock()
+
+    def make_key(
+        self,
+        component: "Component",
+        kw: dict[str, t.Any],
+        content: str,
+    ) -> tuple | None:
+        """Returns a key for these arguments or `None` if they
+        can't be memoized."""
+        if not self.maxsize or component.path is None:
+            return None
+        items = []
+        for name, value in sorted(kw.items()):
+            if not is_memoizable(value):
+                return None
+            items.append((name, type(value), value))
+        # By file, instead of by name, so the entries of a component
+        # can be found by `discard()` however it was called.
+        return (
+            component.prefix,
+            component.relpath,
+            component.mtime,
+            str(content),
+            tuple(items),
+        )
+
+    def get(self, key: tuple) -> MemoEntry | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: tuple, entry: MemoEntry) -> None:
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, predicate: t.Callable[[str, "Path"], bool]) -> int:
+        """Removes the entries of the components for which
+        `predicate(prefix, relpath)` is true. Returns how many."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key[0], key[1])]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def info(self) -> MemoInfo:
+        return MemoInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,159 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import json
+import os
+import typing as t
+from pathlib import Path
+from threading import Lock
+
+from .utils import logger
+
+
+# Increase it when the metadata of a component changes, so files
+# written by other versions are ignored instead of misread.
+FORMAT_VERSION = 2
+
+# (path of the component, prefix, relative path)
+MetadataKey = tuple[str, str, str]
+
+# If the CSS and the JS files next to the component exist
+Siblings = tuple[bool, bool]
+
+
+class FileStat(t.Protocol):
+    """What is used of the `stat()` of a component file: an
+    `os.stat_result`, or the `ResourceStat` of a file in a package."""
+
+    @property
+    def st_mtime_ns(self) -> int: ...
+
+    @property
+    def st_size(self) -> int: ...
+
+
+class MetadataCache:
+    """The parsed metadata of the components (arguments and assets),
+    persisted to a single file so other processes, like new workers of
+    a web server, can load it with one read instead of reading and
+    parsing every component file.
+
+    Each entry is valid while the size and last-modified time of its
+    component file don't change, and neither do the CSS and JS files
+    next to it, added to its assets, exist or not. The file is JSON, so the metadata that
+    can't be stored as JSON (like a default argument that is a set) is
+    not cached and is parsed again by each process.
+    """
+
+    __slots__ = ("path", "dirty", "_entries", "_lock")
+
+    def __init__(self, path: "str | os.PathLike[str]") -> None:
+        self.path = Path(path)
+        self.dirty = False
+        self._entries: dict[
+            MetadataKey, tuple[int, int, Siblings, dict[str, t.Any]]
+        ] = {}
+        self._lock = Lock()
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        key: MetadataKey,
+        stat: FileStat,
+        siblings: Siblings,
+    ) -> dict[str, t.Any] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        mtime_ns, size, old_siblings, metadata = entry
+        if mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+            return None
+        if old_siblings != siblings:
+            return None
+        return metadata
+
+    def set(
+        self,
+        key: MetadataKey,
+        stat: FileStat,
+        siblings: Siblings,
+        metadata: dict[str, t.Any],
+    ) -> None:
+        data = to_json(metadata)
+        if data is None:
+            logger.debug("Not caching the metadata of %s", key[0])
+            return
+        with self._lock:
+            self._entries[key] = (stat.st_mtime_ns, stat.st_size, siblings, data)
+            self.dirty = True
+
+    def load(self) -> None:
+        """Reads the file, ignoring it if it doesn't exists or can't be read."""
+        try:
+            data = json.loads(self.path.read_text("utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as err:
+            logger.warning("Ignoring the metadata cache %s: %s", self.path, err)
+            return
+
+        if not isinstance(data, dict) or data.get("version") != FORMAT_VERSION:
+            logger.info("Ignoring the metadata cache %s: other version", self.path)
+            return
+        try:
+            entries = {
+                (str(path), str(prefix), str(relpath)): (
+                    int(mtime_ns),
+                    int(size),
+                    (bool(has_css), bool(has_js)),
+                    dict(metadata),
+                )
+                for (
+                    path, prefix, relpath, mtime_ns, size, has_css, has_js, metadata
+                ) in data["entries"]
+            }
+        except (KeyError, TypeError, ValueError) as err:
+            logger.warning("Ignoring the metadata cache %s: %s", self.path, err)
+            return
+        with self._lock:
+            self._entries.update(entries)
+
+    def save(self) -> None:
+        """Writes the file, if anything has changed since it was read.
+        The file is replaced atomically, so processes reading it at the
+        same time never see a partial file."""
+        with self._lock:
+            if not self.dirty:
+                return
+            entries = [
+                [*key, mtime_ns, size, *siblings, metadata]
+                for key, (mtime_ns, size, siblings, metadata) in self._entries.items()
+            ]
+            data = json.dumps({"version": FORMAT_VERSION, "entries": entries})
+            self.dirty = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(data, "utf-8")
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.dirty = True
+
+
+def to_json(data: dict[str, t.Any]) -> dict[str, t.Any] | None:
+    """Returns the parsed metadata of a component if it can be stored as
+    JSON and is the same after a round trip (no tuples, sets, infinite
+    numbers, etc.), or `None` if it can't."""
+    try:
+        if json.loads(json.dumps(data, allow_nan=False)) == data:
+            return data
+    except (TypeError, ValueError):
+        pass
+    return None
@@ -0,0 +1,79 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import multiprocessing as mp
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+if t.TYPE_CHECKING:
+    from .catalog import Catalog
+
+
+# A page to render: `(name, kwargs)` returns the HTML and
+# `(name, kwargs, path)` writes it to `path` and returns the path instead.
+Job = tuple[str, dict[str, t.Any]] | tuple[str, dict[str, t.Any], "str | Path"]
+
+# The catalog of the current worker process, set by its initializer.
+# Never set in the process that starts the pool.
+_catalog: "Catalog | None" = None
+
+
+def render_job(catalog: "Catalog", job: Job) -> str:
+    name, kw, *output = job
+    html = catalog.render(name, **kw)
+    if not output:
+        return html
+
+    path = Path(output[0])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(html)
+    return str(path)
+
+
+def render_pages(
+    catalog: "Catalog",
+    jobs: t.Iterable[Job],
+    *,
+    workers: int | None = None,
+    factory: "t.Callable[[], Catalog] | None" = None,
+    chunksize: int = 16,
+) -> t.Iterator[str]:
+    if workers == 1:
+        for job in jobs:
+            yield render_job(catalog, job)
+        return
+
+    if factory is None:
+        if "fork" not in mp.get_all_start_methods():
+            raise ValueError(
+                "Rendering in worker processes without a `factory` requires "
+                "the `fork` start method, not available in this platform"
+            )
+        context = mp.get_context("fork")
+    else:
+        context = mp.get_context()
+
+    # The arguments of forked workers are inherited, not pickled
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(None, factory) if factory else (catalog, None),
+    ) as executor:
+        yield from executor.map(_render_job, jobs, chunksize=chunksize)
+
+
+def _init_worker(
+    catalog: "Catalog | None",
+    factory: "t.Callable[[], Catalog] | None",
+) -> None:
+    global _catalog
+    _catalog = factory() if factory is not None else catalog
+
+
+def _render_job(job: Job) -> str:
+    assert _catalog, "The worker has no catalog"
+    return render_job(_catalog, job)
@@ -0,0 +1,157 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import json
+import os
+import threading
+import typing as t
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+
+# The profile recording the renders in the current context, if any
+active_profile: ContextVar["Profile | None"] = ContextVar(
+    "jinjax_active_profile", default=None
+)
+
+CACHE_HIT = "cache"
+CACHE_LOAD = "file"
+CACHE_SOURCE = "source"
+
+# How the last component was obtained. Only the slow paths (loading a file
+# or compiling a source) set it, so instrumented renders reset it to
+# `CACHE_HIT` before looking up a component and read it afterwards.
+lookup_status: ContextVar[str] = ContextVar("jinjax_lookup_status", default=CACHE_HIT)
+
+
+class ProfileNode:
+    """The aggregated invocations of a component from the same call path."""
+
+    __slots__ = ("name", "calls", "total", "assets", "assets_time", "cache", "children")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        # Seconds spent in the component, including its subcomponents
+        self.total = 0.0
+        # Number of CSS/JS assets collected, and the seconds it took
+        self.assets = 0
+        self.assets_time = 0.0
+        # How the component was obtained: from the cache, loaded from
+        # its file (and compiled), or compiled from a `_source` string.
+        self.cache: Counter[str] = Counter()
+        self.children: dict[str, ProfileNode] = {}
+
+    @property
+    def self_time(self) -> float:
+        """Seconds spent in the component, excluding its subcomponents."""
+        return max(self.total - sum(child.total for child in self.children.values()), 0)
+
+    def child(self, name: str) -> "ProfileNode":
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = ProfileNode(name)
+        return node
+
+    def as_dict(self) -> dict[str, t.Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "total": self.total,
+            "self": self.self_time,
+            "assets": self.assets,
+            "assets_time": self.assets_time,
+            "cache": dict(self.cache),
+            "children": [child.as_dict() for child in self.children.values()],
+        }
+
+    def __repr__(self) -> str:
+        return f'<ProfileNode "{self.name}" calls={self.calls} total={self.total:.6f}>'
+
+
+class Profile:
+    """Tree of the component invocations recorded by `Catalog.profile()`.
+
+    Attributes:
+
+        root:
+            A node without a name whose children are the components
+            rendered directly, usually with `Catalog.render()`.
+
+        events:
+            Every single invocation, as `(name, start, duration, depth, cache)`
+            tuples. The start time is relative to the beginning of the profile.
+
+    """
+
+    def __init__(self) -> None:
+        self.root = ProfileNode("")
+        self.events: list[tuple[str, float, float, int, str]] = []
+        self._start = perf_counter()
+        self._stack = [self.root]
+        self._statuses: list[str] = []
+        self._tid = threading.get_ident()
+
+    @contextmanager
+    def call(self, name: str) -> t.Iterator[ProfileNode]:
+        node = self._stack[-1].child(name)
+        depth = len(self._stack) - 1
+        self._stack.append(node)
+        self._statuses.append(CACHE_HIT)
+        start = perf_counter()
+        try:
+            yield node
+        finally:
+            duration = perf_counter() - start
+            self._stack.pop()
+            status = self._statuses.pop()
+            node.calls += 1
+            node.total += duration
+            node.cache[status] += 1
+            self.events.append((name, start - self._start, duration, depth, status))
+
+    def mark(self, status: str) -> None:
+        """Records how the component being rendered was obtained."""
+        if self._statuses:
+            self._statuses[-1] = status
+
+    def to_collapsed(self) -> str:
+        """Returns the profile in the "collapsed stacks" format used by
+        `flamegraph.pl`, speedscope, and others: a line for each call path
+        with the self time in microseconds."""
+        lines = []
+
+        def walk(node: ProfileNode, path: str) -> None:
+            for child in node.children.values():
+                child_path = f"{path};{child.name}" if path else child.name
+                lines.append(f"{child_path} {round(child.self_time * 1_000_000)}")
+                walk(child, child_path)
+
+        walk(self.root, "")
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> str:
+        """Returns the profile in the Trace Event JSON format, that can
+        be opened in `chrome://tracing` or Perfetto."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "cat": "jinjax",
+                "ph": "X",
+                "ts": start * 1_000_000,
+                "dur": duration * 1_000_000,
+                "pid": pid,
+                "tid": self._tid,
+                "args": {"depth": depth, "cache": cache},
+            }
+            for name, start, duration, depth, cache in self.events
+        ]
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+
+
+def mark(status: str) -> None:
+    lookup_status.set(status)
@@ -0,0 +1,308 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import json
+import os
+import posixpath
+import typing as t
+from hashlib import sha256
+from importlib.resources import files
+from importlib.resources.abc import Traversable
+from pathlib import Path
+from types import ModuleType
+
+from .metadata import to_json
+from .utils import SLASH, logger
+
+
+# File at the root of a components folder listing every file in it.
+# Written by `python -m jinjax index` (see `write_index()`), but a plain
+# list of relative paths, one per line, also works for packages.
+INDEX_NAME = "jinjax.index"
+INDEX_COMMENT = "#"
+# Increase it when the format of the index changes
+INDEX_VERSION = 1
+
+Anchor = t.Union[str, ModuleType, Traversable]
+
+
+class ResourceStat(t.NamedTuple):
+    """The subset of `os.stat_result` used for the component files."""
+
+    st_mtime: float
+    st_mtime_ns: int
+    st_size: int
+
+
+class Index(t.NamedTuple):
+    """The content of an index file."""
+
+    # Relative path of each file -> its `size` and `sha256` hash
+    files: dict[str, dict[str, t.Any]]
+    # Each name a component can be called by (without the prefix and with
+    # slashes instead of dots) -> its relative path, in order of precedence
+    names: dict[str, str]
+    # Relative path of each component -> its parsed metadata
+    metadata: dict[str, dict[str, t.Any]]
+    # Extension of the component files
+    file_ext: str
+
+
+class Package:
+    """A folder of components inside a Python package, read with
+    `importlib.resources`, so the package can be installed normally or
+    be inside a zip file (a zipapp, a PEX, etc.).
+
+    The files are listed in the index file of the folder, so they are
+    found with a single read. Without it, the folders are walked.
+    """
+
+    __slots__ = ("name", "root", "path", "index", "files", "mtime")
+
+    def __init__(self, anchor: Anchor) -> None:
+        if isinstance(anchor, str | ModuleType):
+            root = files(anchor)
+            name = anchor if isinstance(anchor, str) else anchor.__name__
+        else:
+            root = anchor
+            name = str(anchor)
+        self.name = name
+        self.root = root
+        # The folder, if the package is in the filesystem
+        self.path = root if isinstance(root, Path) else None
+
+        index = read_index(root)
+        if index is None:
+            logger.debug(f"`{name}` has no {INDEX_NAME} file, walking its folders")
+            index = Index({relpath: {} for relpath in list_files(root)}, {}, {}, "")
+        self.index = index
+        self.files = frozenset(index.files)
+        self.mtime = get_archive_mtime(root) if self.path is None else 0.0
+
+    def __repr__(self) -> str:
+        return f'<Package "{self.name}">'
+
+    def __str__(self) -> str:
+        return self.name
+
+    def get_path(self, relpath: str) -> "Path | ResourceFile":
+        if self.path is not None:
+            return self.path / relpath
+        return ResourceFile(self, relpath)
+
+    def get_source(
+        self,
+        relpath: str,
+    ) -> tuple[str, str, t.Callable[[], bool]] | None:
+        if relpath not in self.files:
+            return None
+        path = self.get_path(relpath)
+        source = path.read_text("utf-8")
+        if isinstance(path, ResourceFile):
+            # The archive doesn't change while it's in use
+            return source, str(path), lambda: True
+
+        mtime = path.stat().st_mtime
+
+        def uptodate() -> bool:
+            try:
+                return path.stat().st_mtime == mtime
+            except OSError:
+                return False
+
+        return source, str(path), uptodate
+
+    def walk(self) -> t.Iterator[tuple[str, list[str]]]:
+        """Yields each folder, relative to the root, and the names of
+        its files, the deepest folders first, like `os.walk(topdown=False)`."""
+        folders: dict[str, list[str]] = {}
+        for relpath in sorted(self.files):
+            folder, filename = posixpath.split(relpath)
+            folders.setdefault(folder, []).append(filename)
+        for folder in sorted(folders, key=lambda folder: -folder.count(SLASH)):
+            if folder:
+                yield folder, folders[folder]
+        if "" in folders:
+            yield "", folders[""]
+
+
+class ResourceFile:
+    """A file of a `Package` that isn't in the filesystem, with the
+    subset of the `pathlib.Path` interface used for the component files.
+    """
+
+    __slots__ = ("package", "relpath")
+
+    def __init__(self, package: Package, relpath: str) -> None:
+        self.package = package
+        self.relpath = relpath
+
+    def __repr__(self) -> str:
+        return f'<ResourceFile "{self}">'
+
+    def __str__(self) -> str:
+        root = str(self.package.root).rstrip(SLASH)
+        return f"{root}{SLASH}{self.relpath}"
+
+    def __eq__(self, other: t.Any) -> bool:
+        return isinstance(other, ResourceFile) and str(self) == str(other)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    @property
+    def resource(self) -> Traversable:
+        return self.package.root.joinpath(*self.relpath.split(SLASH))
+
+    def is_file(self) -> bool:
+        return self.relpath in self.package.files
+
+    @t.overload
+    def open(self, mode: t.Literal["rb"] = "rb") -> t.BinaryIO: ...
+
+    @t.overload
+    def open(self, mode: t.Literal["r"]) -> t.TextIO: ...
+
+    def open(self, mode: t.Literal["r", "rb"] = "rb") -> t.IO[t.Any]:
+        if mode == "r":
+            return self.resource.open("r", encoding="utf-8")
+        return self.resource.open("rb")
+
+    def read_bytes(self) -> bytes:
+        return self.resource.read_bytes()
+
+    def read_text(self, encoding: str = "utf-8") -> str:
+        return self.resource.read_text(encoding)
+
+    def stat(self) -> ResourceStat:
+        mtime = self.package.mtime
+        return ResourceStat(mtime, int(mtime * 1_000_000_000), 0)
+
+    def with_suffix(self, suffix: str) -> "ResourceFile":
+        stem, _ = posixpath.splitext(self.relpath)
+        return type(self)(self.package, f"{stem}{suffix}")
+
+
+def read_index(root: Traversable) -> Index | None:
+    """Returns the index of the folder, or `None` if it doesn't have one
+    or it can't be read."""
+    index = root / INDEX_NAME
+    if not index.is_file():
+        return None
+    try:
+        return parse_index(index.read_text("utf-8"))
+    except (ValueError, KeyError, TypeError) as err:
+        logger.warning("Ignoring the index %s: %s", index, err)
+        return None
+
+
+def parse_index(text: str) -> Index:
+    if not text.lstrip().startswith("{"):
+        lines = (line.strip() for line in text.splitlines())
+        paths = [line for line in lines if line and not line.startswith(INDEX_COMMENT)]
+        return Index({relpath: {} for relpath in paths}, {}, {}, "")
+
+    data = json.loads(text)
+    if data.get("version") != INDEX_VERSION:
+        raise ValueError(f"unsupported version {data.get('version')!r}")
+    return Index(
+        files=dict(data["files"]),
+        names=dict(data["names"]),
+        metadata=dict(data["metadata"]),
+        file_ext=str(data["file_ext"]),
+    )
+
+
+def dump_index(index: Index) -> str:
+    data = {"version": INDEX_VERSION, **index._asdict()}
+    return json.dumps(data, indent=1, ensure_ascii=False) + "\n"
+
+
+def build_index(folder: "str | os.PathLike[str]", *, file_ext: str) -> Index:
+    """Walks a folder of components and returns its index: every name
+    a component can be called by (in the same order of precedence
+    followed when searching for it), the size and hash of each file,
+    and the parsed metadata of each component (arguments and assets,
+    including the CSS/JS files next to it)."""
+    from .catalog import Catalog
+    from .component import Component
+
+    root = Path(folder)
+    # With `auto_reload`, any index already in the folder is ignored
+    catalog = Catalog(file_ext=file_ext, auto_reload=True)
+    catalog.add_folder(root)
+    table = catalog._build_paths("", file_ext)
+    names = {name: str(relpath) for name, (_, _, relpath) in table.items()}
+
+    metadata = {}
+    for relpath in sorted(set(names.values())):
+        try:
+            component = Component(name=relpath, path=root / relpath, relpath=Path(relpath))
+        except Exception as err:
+            logger.warning("Not indexing the metadata of %s: %s", relpath, err)
+            continue
+        data = to_json(component.get_metadata())
+        if data is None:
+            logger.debug("Not indexing the metadata of %s", relpath)
+            continue
+        metadata[relpath] = data
+
+    files = {}
+    for relpath in sorted(list_files(root)):
+        content = (root / relpath).read_bytes()
+        files[relpath] = {"size": len(content), "sha256": sha256(content).hexdigest()}
+
+    return Index(files=files, names=names, metadata=metadata, file_ext=file_ext)
+
+
+def with_url_prefix(metadata: dict[str, t.Any], url_prefix: str) -> dict[str, t.Any]:
+    """The indexes are built without a prefix, so the relative URLs of the
+    assets of the components must be prefixed to use them under one."""
+    if not url_prefix:
+        return metadata
+
+    def prefixed(urls: list[str]) -> list[str]:
+        return [
+            url if url.startswith(("/", "http://", "https://")) else f"{url_prefix}{url}"
+            for url in urls
+        ]
+
+    return {**metadata, "css": prefixed(metadata["css"]), "js": prefixed(metadata["js"])}
+
+
+def write_index(folder: "str | os.PathLike[str]", *, file_ext: str) -> Path:
+    """Writes the index of a folder of components to its `jinjax.index`
+    file. The file is replaced atomically. Returns its path."""
+    path = Path(folder) / INDEX_NAME
+    tmp_path = path.with_name(f"{INDEX_NAME}.{os.getpid()}.tmp")
+    tmp_path.write_text(dump_index(build_index(folder, file_ext=file_ext)), "utf-8")
+    os.replace(tmp_path, path)
+    return path
+
+
+def list_files(root: Traversable, folder: str = "") -> list[str]:
+    """Returns the relative paths of every file in the folder and
+    its subfolders, other than the index file."""
+    found = []
+    for item in root.iterdir():
+        if item.name == "__pycache__":
+            continue
+        relpath = f"{folder}{SLASH}{item.name}" if folder else item.name
+        if item.is_dir():
+            found.extend(list_files(item, relpath))
+        elif relpath != INDEX_NAME:
+            found.append(relpath)
+    return found
+
+
+def get_archive_mtime(root: Traversable) -> float:
+    """Returns the last-modified time of the zip file with the folder,
+    or `0` if it can't be known."""
+    archive = getattr(getattr(root, "root", None), "filename", None)
+    if not archive:
+        return 0.0
+    try:
+        return os.path.getmtime(archive)
+    except OSError:
+        return 0.0
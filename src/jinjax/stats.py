@@ -0,0 +1,76 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import typing as t
+from threading import Lock
+
+
+# A component was found in the catalog cache
+CACHE_HIT = "cache.hit"
+# A component wasn't in the catalog cache
+CACHE_MISS = "cache.miss"
+# A component was in the catalog cache but its file has changed
+CACHE_STALE = "cache.stale"
+# A search of the component file in the folders of a prefix
+LOOKUP = "lookup"
+# A run of the JinjaX preprocessor on a template source
+PREPROCESS = "preprocess"
+# A compilation of a template by Jinja (including the preprocessing)
+COMPILE = "compile"
+# A computation of the fingerprint of an asset file
+FINGERPRINT = "fingerprint"
+# A `ComponentNotFound` error
+NOT_FOUND = "not_found"
+# A compiled template removed from the Jinja cache to make room for another
+TEMPLATE_EVICT = "template.evict"
+
+EVENTS = (
+    CACHE_HIT,
+    CACHE_MISS,
+    CACHE_STALE,
+    LOOKUP,
+    PREPROCESS,
+    COMPILE,
+    FINGERPRINT,
+    NOT_FOUND,
+    TEMPLATE_EVICT,
+)
+
+StatsHook = t.Callable[[str, float], t.Any]
+
+
+class Stats:
+    """Counts and total durations of the internal events of a catalog.
+
+    Hooks are called with the name of the event and its duration in
+    seconds (zero for the events that aren't timed) every time an
+    event is recorded, for example, to export them as metrics.
+    """
+
+    __slots__ = ("counts", "times", "hooks", "_lock")
+
+    def __init__(self) -> None:
+        self.counts: dict[str, int] = dict.fromkeys(EVENTS, 0)
+        self.times: dict[str, float] = dict.fromkeys(EVENTS, 0.0)
+        self.hooks: list[StatsHook] = []
+        self._lock = Lock()
+
+    def record(self, event: str, duration: float = 0.0) -> None:
+        with self._lock:
+            self.counts[event] = self.counts.get(event, 0) + 1
+            self.times[event] = self.times.get(event, 0.0) + duration
+        for hook in self.hooks:
+            hook(event, duration)
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                event: {"count": count, "time": self.times[event]}
+                for event, count in self.counts.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = dict.fromkeys(EVENTS, 0)
+            self.times = dict.fromkeys(EVENTS, 0.0)
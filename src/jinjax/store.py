@@ -0,0 +1,329 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import io
+import json
+import os
+import sqlite3
+import threading
+import typing as t
+
+from .metadata import to_json
+from .resources import Index, Package, ResourceFile, ResourceStat, with_url_prefix
+from .utils import SLASH, logger
+
+
+TABLE = "jinjax_components"
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TABLE} (
+    namespace TEXT NOT NULL DEFAULT '',
+    relpath TEXT NOT NULL,
+    source TEXT NOT NULL,
+    metadata TEXT,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (namespace, relpath)
+)
+"""
+
+
+class StoredComponent(t.NamedTuple):
+    """A row of the components table."""
+
+    source: str
+    # The parsed metadata of the component, as in an index file,
+    # or `None` if it couldn't be stored as JSON
+    metadata: dict[str, t.Any] | None
+    # Increased every time the component is replaced
+    version: int
+
+
+class ComponentStore(Package):
+    """Components stored in a SQLite database instead of in files, for
+    example, those customized by each tenant of an application.
+
+    Each row has the relative path of a component (like a path inside
+    a components folder, `"forms/Input.jinja"`), its source, its parsed
+    metadata, and a version that is increased every time it's replaced.
+    A database can have the components of many tenants, each one in
+    its own `namespace`.
+
+    The versions are used instead of the modification time of a file,
+    so a compiled component is reloaded when its version changes (with
+    `auto_reload`, or after `Catalog.preload()`). Changes made by other
+    processes are found through the `data_version` of the database, so
+    checking if anything changed costs a single query.
+    """
+
+    __slots__ = (
+        "database",
+        "namespace",
+        "_conn",
+        "_lock",
+        "_versions",
+        "_rows",
+        "_data_version",
+    )
+
+    def __init__(
+        self,
+        database: "str | os.PathLike[str]",
+        *,
+        namespace: str = "",
+    ) -> None:
+        self.database = os.fspath(database)
+        self.namespace = namespace
+        self.name = f"{self.database}:{namespace}" if namespace else self.database
+        self.root = None  # type: ignore
+        self.path = None
+        self.mtime = 0.0
+
+        self._lock = threading.RLock()
+        # In autocommit mode; the writes open their own transactions
+        self._conn = sqlite3.connect(
+            self.database, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute(SCHEMA)
+        self._versions: dict[str, int] = {}
+        self._rows: dict[str, StoredComponent] = {}
+        self._data_version: int | None = None
+        self._set_versions({})
+        self.refresh()
+
+    def __repr__(self) -> str:
+        return f'<ComponentStore "{self.name}">'
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def refresh(self) -> set[str]:
+        """Reads the versions of the components again if the database was
+        changed by another connection since the last time. Returns the
+        relative paths of the components added, replaced, or deleted."""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return set()
+            self._data_version = data_version
+            rows = self._conn.execute(
+                f"SELECT relpath, version FROM {TABLE} WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchall()
+            return self._set_versions(dict(rows))
+
+    def preload(self) -> set[str]:
+        """Reads every component of the namespace with a single query, so
+        they don't have to be read one by one when they are first used.
+        Returns the relative paths of the components added, replaced, or
+        deleted since the last time the versions were read."""
+        with self._lock:
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT relpath, source, metadata, version FROM {TABLE}"
+                " WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchall()
+            self._rows = {
+                relpath: StoredComponent(source, load_metadata(metadata), version)
+                for relpath, source, metadata, version in rows
+            }
+            return self._set_versions(
+                {relpath: row.version for relpath, row in self._rows.items()}
+            )
+
+    def get(self, relpath: str) -> StoredComponent | None:
+        """Returns the current source, metadata, and version of a
+        component, or `None` if it doesn't exist."""
+        self.refresh()
+        row = self._rows.get(relpath)
+        if row is not None:
+            return row
+        with self._lock:
+            found = self._conn.execute(
+                f"SELECT source, metadata, version FROM {TABLE}"
+                " WHERE namespace = ? AND relpath = ?",
+                (self.namespace, relpath),
+            ).fetchone()
+        if found is None:
+            return None
+        source, metadata, version = found
+        row = StoredComponent(source, load_metadata(metadata), version)
+        self._rows[relpath] = row
+        return row
+
+    def get_version(self, relpath: str) -> int | None:
+        self.refresh()
+        return self._versions.get(relpath)
+
+    def put(self, relpath: str, source: str) -> int:
+        """Adds or replaces a component and returns its new version.
+        Raises an error if its header is invalid."""
+        return self.put_many({relpath: source})[relpath]
+
+    def put_many(self, components: t.Mapping[str, str]) -> dict[str, int]:
+        """Adds or replaces many components, by relative path, in a single
+        transaction. Returns their new versions."""
+        rows = {
+            relpath: (source, parse_metadata(relpath, source))
+            for relpath, source in components.items()
+        }
+        versions = {}
+        with self._lock, self._transaction():
+            for relpath, (source, metadata) in rows.items():
+                (versions[relpath],) = self._conn.execute(
+                    f"INSERT INTO {TABLE} (namespace, relpath, source, metadata, version)"
+                    " VALUES (?, ?, ?, ?, 1)"
+                    " ON CONFLICT (namespace, relpath) DO UPDATE SET"
+                    " source = excluded.source, metadata = excluded.metadata,"
+                    " version = version + 1"
+                    " RETURNING version",
+                    (self.namespace, relpath, source, dump_metadata(metadata)),
+                ).fetchone()
+            for relpath, (source, metadata) in rows.items():
+                self._rows[relpath] = StoredComponent(source, metadata, versions[relpath])
+            self._set_versions({**self._versions, **versions})
+        return versions
+
+    def delete(self, relpath: str) -> bool:
+        """Deletes a component. Returns `False` if it didn't exist."""
+        with self._lock, self._transaction():
+            cursor = self._conn.execute(
+                f"DELETE FROM {TABLE} WHERE namespace = ? AND relpath = ?",
+                (self.namespace, relpath),
+            )
+            versions = dict(self._versions)
+            versions.pop(relpath, None)
+            self._set_versions(versions)
+        return cursor.rowcount > 0
+
+    def get_path(self, relpath: str) -> "StoredFile":  # type: ignore
+        return StoredFile(self, relpath)
+
+    def get_source(
+        self,
+        relpath: str,
+    ) -> tuple[str, str, t.Callable[[], bool]] | None:
+        row = self.get(relpath)
+        if row is None:
+            return None
+        version = row.version
+
+        def uptodate() -> bool:
+            return self.get_version(relpath) == version
+
+        return row.source, str(self.get_path(relpath)), uptodate
+
+    def walk(self) -> t.Iterator[tuple[str, list[str]]]:
+        self.refresh()
+        return super().walk()
+
+    def _set_versions(self, versions: dict[str, int]) -> set[str]:
+        old = self._versions
+        changed = {
+            relpath
+            for relpath in old.keys() | versions.keys()
+            if old.get(relpath) != versions.get(relpath)
+        }
+        self._versions = versions
+        self.files = frozenset(versions)
+        self.index = Index({relpath: {} for relpath in versions}, {}, {}, "")
+        if changed:
+            self._rows = {
+                relpath: row
+                for relpath, row in self._rows.items()
+                if versions.get(relpath) == row.version
+            }
+        return changed
+
+    def _transaction(self) -> "Transaction":
+        return Transaction(self._conn)
+
+
+class Transaction:
+    """Runs the statements of a connection in autocommit mode inside an
+    immediate transaction, so the versions are increased atomically."""
+
+    __slots__ = ("conn",)
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __enter__(self) -> None:
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type: t.Any, *args: t.Any) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class StoredFile(ResourceFile):
+    """A component of a `ComponentStore`, with the subset of the
+    `pathlib.Path` interface used for the component files. Its
+    modification time is its version."""
+
+    __slots__ = ()
+
+    package: ComponentStore
+
+    def __repr__(self) -> str:
+        return f'<StoredFile "{self}">'
+
+    def __str__(self) -> str:
+        return f"{self.package.name}{SLASH}{self.relpath}"
+
+    def is_file(self) -> bool:
+        # As of the last time the versions were checked, because it's
+        # always followed by a `stat()`, that checks them again.
+        return self.relpath in self.package.files
+
+    @t.overload
+    def open(self, mode: t.Literal["rb"] = "rb") -> t.BinaryIO: ...
+
+    @t.overload
+    def open(self, mode: t.Literal["r"]) -> t.TextIO: ...
+
+    def open(self, mode: t.Literal["r", "rb"] = "rb") -> t.IO[t.Any]:
+        if mode == "r":
+            return io.StringIO(self.read_text())
+        return io.BytesIO(self.read_bytes())
+
+    def read_bytes(self) -> bytes:
+        return self.read_text().encode("utf-8")
+
+    def read_text(self, encoding: str = "utf-8") -> str:
+        row = self.package.get(self.relpath)
+        if row is None:
+            raise FileNotFoundError(str(self))
+        return row.source
+
+    def stat(self) -> ResourceStat:
+        # A deleted component has no version, like a file in a package
+        # has the modification time of the archive, even if it's missing.
+        version = self.package.get_version(self.relpath) or 0
+        return ResourceStat(float(version), version, 0)
+
+    def get_metadata(self, url_prefix: str) -> dict[str, t.Any] | None:
+        """The metadata stored with the component, if any."""
+        row = self.package.get(self.relpath)
+        if row is None or row.metadata is None:
+            return None
+        return with_url_prefix(row.metadata, url_prefix)
+
+
+def parse_metadata(relpath: str, source: str) -> dict[str, t.Any] | None:
+    """Parses the metadata of a component to store it with its source.
+    Raises an error if the header of the component is invalid."""
+    from .component import Component
+
+    data = to_json(Component(name=relpath, source=source).get_metadata())
+    if data is None:
+        logger.debug("Not storing the metadata of %s", relpath)
+    return data
+
+
+def dump_metadata(metadata: dict[str, t.Any] | None) -> str | None:
+    return None if metadata is None else json.dumps(metadata)
+
+
+def load_metadata(text: str | None) -> dict[str, t.Any] | None:
+    return None if text is None else json.loads(text)
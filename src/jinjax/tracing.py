@@ -0,0 +1,35 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import typing as t
+from contextvars import ContextVar
+
+
+DEFAULT_TRACE_DEPTH = 1
+
+RENDER_SPAN = "jinjax.render"
+COMPONENT_SPAN = "jinjax.component"
+
+ATTR_COMPONENT = "jinjax.component"
+ATTR_PREFIX = "jinjax.prefix"
+ATTR_CACHE = "jinjax.cache"
+ATTR_OUTPUT_SIZE = "jinjax.output_size"
+
+# Depth of the current span inside a sampled render (`0` for the span
+# of `Catalog.render()`), or `None` if the current render isn't traced.
+trace_depth: ContextVar[int | None] = ContextVar("jinjax_trace_depth", default=None)
+
+
+class Span(t.Protocol):
+    def set_attribute(self, key: str, value: t.Any) -> t.Any: ...
+
+
+class Tracer(t.Protocol):
+    """The subset of `opentelemetry.trace.Tracer` used by the catalog,
+    so you can pass `opentelemetry.trace.get_tracer("jinjax")` or any
+    object with the same method."""
+
+    def start_as_current_span(
+        self, name: str, *args: t.Any, **kwargs: t.Any
+    ) -> t.ContextManager[Span]: ...
@@ -5,15 +5,21 @@ Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
 import logging
 import re
 import uuid
+from functools import lru_cache
 
 
 logger = logging.getLogger("jinjax")
 
 DELIMITER = "."
 SLASH = "/"
+PREFIX_SEP = ":"
+DEFAULT_PREFIX = ""
 
 ARGS_PREFIX = "__prefix"
 
+RX_KEBAB_ACRONYM = re.compile(r"([A-Z]+)([A-Z][a-z])")
+RX_KEBAB_WORD = re.compile(r"([a-z\d])([A-Z])")
+
 
 def get_url_prefix(prefix: str) -> str:
     url_prefix = prefix.strip().strip(f"{DELIMITER}{SLASH}").replace(DELIMITER, SLASH)
@@ -26,6 +32,18 @@ def get_random_id(prefix="id") -> str:
     return f"{prefix}-{str(uuid.uuid4().hex)}"
 
 
+@lru_cache(maxsize=2048)
+def split_name(cname: str) -> tuple[str, str]:
+    """Returns the prefix and the name of a component called `cname`,
+    without checking that the prefix exists."""
+    name = cname.strip().strip(DELIMITER)
+    if PREFIX_SEP not in name:
+        return DEFAULT_PREFIX, name
+    prefix, name = name.split(PREFIX_SEP, 1)
+    return prefix, name
+
+
+@lru_cache(maxsize=2048)
 def kebab_case(word: str) -> str:
     """Returns the lowercased kebab-cases form of `word`.
     Returns the right result even whith acronyms::
@@ -44,7 +62,7 @@ def kebab_case(word: str) -> str:
         'my-folder.device-type'
 
     """
-    word = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1-\2", word)
-    word = re.sub(r"([a-z\d])([A-Z])", r"\1-\2", word)
+    word = RX_KEBAB_ACRONYM.sub(r"\1-\2", word)
+    word = RX_KEBAB_WORD.sub(r"\1-\2", word)
     word = word.replace("_", "-")
     return word.lower()
@@ -0,0 +1,129 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import jinja2
+import pytest
+from markupsafe import Markup
+
+import jinjax
+from jinjax.loaders import CatalogEnvironment, TemplateCache
+
+
+@pytest.fixture()
+def host_env(folder_t, tmp_path):
+    (folder_t / "greeting.html").write_text("Jinja still works")
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(folder_t),
+        bytecode_cache=jinja2.FileSystemBytecodeCache(str(tmp_path)),
+        autoescape=True,
+    )
+
+
+def test_attach_in_place(host_env, folder):
+    (folder / "Greeting.jinja").write_text("{#def name #}<b>Hi {{ name }}</b>")
+    host_env.get_template("greeting.html")
+    cache = host_env.cache
+    bytecode_cache = host_env.bytecode_cache
+
+    catalog = jinjax.Catalog(jinja_env=host_env, attach=True)
+    catalog.add_folder(folder)
+
+    assert catalog.jinja_env is host_env
+    assert isinstance(host_env, CatalogEnvironment)
+    assert host_env.cache is cache
+    assert host_env.bytecode_cache is bytecode_cache
+    assert host_env.autoescape is True
+
+    assert catalog.render("Greeting", name="<Tom>") == Markup("<b>Hi &lt;Tom&gt;</b>")
+    assert host_env.get_template("greeting.html").render() == "Jinja still works"
+
+
+def test_templates_compiled_before_attaching(host_env, folder, folder_t):
+    (folder / "Card.jinja").write_text("<div>{{ content }}</div>")
+    (folder_t / "page.html").write_text("<main><Card>Hi</Card></main>")
+    # Compiled without the JinjaX extension, so the tag is left as it is
+    assert host_env.get_template("page.html").render() == "<main><Card>Hi</Card></main>"
+
+    catalog = jinjax.Catalog(jinja_env=host_env, attach=True)
+    catalog.add_folder(folder)
+
+    assert host_env.get_template("page.html").render() == "<main><div>Hi</div></main>"
+
+
+@pytest.mark.parametrize("undefined", [jinja2.Undefined, jinja2.StrictUndefined])
+def test_host_templates_can_call_components(host_env, folder, folder_t, undefined):
+    (folder / "Card.jinja").write_text("{#css card.css #}<div>{{ content }}</div>")
+    (folder_t / "page.html").write_text("<main><Card>{{ title }}</Card></main>")
+    host_env.undefined = undefined
+
+    catalog = jinjax.Catalog(jinja_env=host_env, attach=True)
+    catalog.add_folder(folder)
+
+    html = host_env.get_template("page.html").render(title="Hello")
+    assert html == "<main><div>Hello</div></main>"
+    assert catalog.collected_css == ["card.css"]
+
+
+def test_host_templates_have_their_own_assets(host_env, folder, folder_t):
+    (folder / "Card.jinja").write_text("{#css card.css #}<div>{{ content }}</div>")
+    (folder / "Icon.jinja").write_text("{#css icon.css #}<i></i>")
+    (folder_t / "page.html").write_text(
+        "<head>{{ catalog.render_assets() }}</head><Card>{{ title }}</Card>"
+    )
+    (folder_t / "icon.html").write_text("<head>{{ catalog.render_assets() }}</head><Icon />")
+
+    catalog = jinjax.Catalog(jinja_env=host_env, attach=True)
+    catalog.add_folder(folder)
+
+    html = host_env.get_template("page.html").render(title="Hi")
+    assert html == (
+        '<head><link rel="stylesheet" href="/static/components/card.css"></head>'
+        "<div>Hi</div>"
+    )
+    html = host_env.get_template("icon.html").render()
+    assert html == (
+        '<head><link rel="stylesheet" href="/static/components/icon.css"></head>'
+        "<i></i>"
+    )
+
+
+def test_host_join_path(folder, folder_t):
+    class HostEnvironment(jinja2.Environment):
+        def join_path(self, template, parent):
+            return f"partials/{template}"
+
+    (folder_t / "partials").mkdir()
+    (folder_t / "partials" / "nav.html").write_text("<nav></nav>")
+    (folder_t / "page.html").write_text('{% include "nav.html" %}')
+    host_env = HostEnvironment(loader=jinja2.FileSystemLoader(folder_t))
+
+    catalog = jinjax.Catalog(jinja_env=host_env, attach=True)
+    catalog.add_folder(folder)
+    assert host_env.get_template("page.html").render() == "<nav></nav>"
+
+
+def test_components_take_precedence(host_env, folder, folder_t):
+    (folder / "Card.jinja").write_text("<div>component</div>")
+    (folder_t / "Card.jinja").write_text("<div>template</div>")
+
+    catalog = jinjax.Catalog(jinja_env=host_env, attach=True)
+    catalog.add_folder(folder)
+    assert catalog.render("Card") == Markup("<div>component</div>")
+
+
+def test_attach_with_template_cache_size(host_env):
+    catalog = jinjax.Catalog(jinja_env=host_env, attach=True, template_cache_size=10)
+    assert isinstance(catalog.jinja_env.cache, TemplateCache)
+    assert catalog.jinja_env.cache.capacity == 10
+
+
+def test_attach_only_one_catalog(host_env):
+    jinjax.Catalog(jinja_env=host_env, attach=True)
+    with pytest.raises(ValueError):
+        jinjax.Catalog(jinja_env=host_env, attach=True)
+
+
+def test_attach_requires_an_environment():
+    with pytest.raises(ValueError):
+        jinjax.Catalog(attach=True)
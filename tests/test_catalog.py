@@ -5,6 +5,7 @@ Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
 import pytest
 
 import jinjax
+from jinjax.utils import split_name
 
 
 def test_add_folder_with_default_prefix():
@@ -76,3 +77,130 @@ def test_add_module_fails_with_other_modules():
     module = Module()
     with pytest.raises(AttributeError):
         catalog.add_module(module)
+
+
+def test_component_paths_are_found_without_walking_again(catalog, folder, monkeypatch):
+    (folder / "ui").mkdir()
+    (folder / "ui" / "Button.jinja").write_text("<button></button>")
+    (folder / "ui" / "icon-button.jinja").write_text("<button>icon</button>")
+    (folder / "ui" / "index.jinja").write_text("<ui.Button />")
+    (folder / "Card.en.jinja").write_text("<div></div>")
+
+    def find(name):
+        path, relpath = catalog._get_component_path("", name, ".jinja")
+        return relpath and relpath.as_posix()
+
+    assert find("ui.Button") == "ui/Button.jinja"
+
+    walks = []
+    real_walk = jinjax.catalog.os.walk
+
+    def walk(*args, **kwargs):
+        walks.append(args)
+        return real_walk(*args, **kwargs)
+
+    monkeypatch.setattr(jinjax.catalog.os, "walk", walk)
+    assert find("ui.IconButton") == "ui/icon-button.jinja"
+    assert find("ui.icon-button") == "ui/icon-button.jinja"
+    assert find("ui") == "ui/index.jinja"
+    assert find("Card") == "Card.en.jinja"
+    assert walks == []
+
+    # New files are found by walking the folder again
+    (folder / "New.jinja").write_text("<p></p>")
+    assert find("New") == "New.jinja"
+    assert len(walks) == 1
+
+
+def test_first_folder_takes_precedence(tmp_path):
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    (first / "Card.jinja").write_text("first")
+    (second / "Card.jinja").write_text("second")
+    (second / "Other.jinja").write_text("<Card />")
+
+    catalog = jinjax.Catalog()
+    catalog.add_folder(first)
+    catalog.add_folder(second)
+    assert catalog.render("Other") == "first"
+
+
+def test_resolved_components_are_reused(catalog, folder, tmp_path, monkeypatch):
+    (folder / "Card.jinja").write_text("<div>{{ content }}</div>")
+    (folder / "List.jinja").write_text(
+        "{% for i in range(3) %}<Card>{{ i }}</Card>{% endfor %}"
+    )
+    assert catalog.render("List") == "<div>0</div><div>1</div><div>2</div>"
+
+    component = catalog._get_component("Card")
+    assert catalog._get_component("Card") is component
+
+    def fail(*args, **kwargs):
+        raise AssertionError("resolved again")
+
+    monkeypatch.setattr(jinjax.Catalog, "_resolve_component", fail)
+    assert catalog.render("List") == "<div>0</div><div>1</div><div>2</div>"
+    monkeypatch.undo()
+
+    # Adding a folder invalidates them
+    other = tmp_path / "other"
+    other.mkdir()
+    catalog.add_folder(other, prefix="other")
+    assert catalog._get_component("Card") is not component
+
+
+def test_resolved_components_with_auto_reload(folder):
+    catalog = jinjax.Catalog(auto_reload=True)
+    catalog.add_folder(folder)
+    (folder / "Card.jinja").write_text("<div></div>")
+    assert catalog._get_component("Card") is not catalog._get_component("Card")
+
+
+def test_template_cache_grows_with_the_components(folder):
+    for i in range(450):
+        (folder / f"Item{i}.jinja").write_text(f"<p>{i}</p>")
+    catalog = jinjax.Catalog(collect_stats=True)
+    catalog.add_folder(folder)
+
+    for _ in range(2):
+        for i in range(450):
+            catalog.render(f"Item{i}")
+
+    cache = catalog.jinja_env.cache
+    assert cache.capacity == 400 + 450
+    assert len(cache) == 450
+    assert catalog.stats()["template.evict"]["count"] == 0
+
+
+def test_template_cache_evictions(folder):
+    for i in range(3):
+        (folder / f"Item{i}.jinja").write_text(f"<p>{i}</p>")
+    catalog = jinjax.Catalog(template_cache_size=2, collect_stats=True)
+    catalog.add_folder(folder)
+
+    for i in range(3):
+        catalog.render(f"Item{i}")
+
+    cache = catalog.jinja_env.cache
+    assert cache.capacity == 2
+    assert cache.evictions == 1
+    assert [key[1] for key in cache] == ["Item1.jinja", "Item2.jinja"]
+    assert catalog.stats()["template.evict"]["count"] == 1
+
+
+def test_template_cache_disabled(folder):
+    (folder / "Item.jinja").write_text("<p></p>")
+    catalog = jinjax.Catalog(template_cache_size=0)
+    catalog.add_folder(folder)
+
+    assert catalog.render("Item") == "<p></p>"
+    assert catalog.jinja_env.cache is None
+
+
+def test_split_names_are_bounded(catalog):
+    for i in range(3000):
+        with pytest.raises(jinjax.ComponentNotFound):
+            catalog.irender(f"Icon{i}")
+    assert split_name.cache_info().currsize <= split_name.cache_info().maxsize
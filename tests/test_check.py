@@ -0,0 +1,77 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import jinja2
+import pytest
+
+import jinjax
+from jinjax.__main__ import main
+
+
+def test_check_catalog(catalog, folder):
+    (folder / "Card.jinja").write_text("{#def title, level=1 #}<div>{{ title }}</div>")
+    (folder / "Page.jinja").write_text("""<Card title="ok" />
+<Card level={{ 2 }}
+/>
+<Nope />
+<Card _attrs={{ {"title": "ok"} }} />
+<ui:Card title="a" />
+""")
+    (folder / "Broken.jinja").write_text("{#def a #}{#def b #}\n<Card title='a'")
+
+    errors = sorted(catalog.check(), key=lambda e: (e.template, e.lineno or 0))
+    assert [(e.template, e.lineno, e.tag) for e in errors] == [
+        ("Broken.jinja", None, ""),
+        ("Broken.jinja", 2, ""),
+        ("Page.jinja", 2, "Card"),
+        ("Page.jinja", 4, "Nope"),
+        ("Page.jinja", 6, "ui:Card"),
+    ]
+    assert str(errors[2]) == "Page.jinja:2: <Card> requires the `title` argument(s)"
+    assert errors[3].message == "component not found"
+    assert "ui" in errors[4].message
+
+
+def test_check_prefixed_calls(catalog, folder, folder_t):
+    catalog.add_folder(folder_t, prefix="ui")
+    (folder_t / "Icon.jinja").write_text("{#def name #}<i>{{ name }}</i>")
+    (folder_t / "Button.jinja").write_text("<button><Icon /></button>")
+    (folder / "Icon.jinja").write_text("<i></i>")
+    (folder / "Page.jinja").write_text("<Icon /><ui:Icon name='a' />")
+
+    errors = catalog.check()
+    assert [(e.template, e.tag) for e in errors] == [("ui:Button.jinja", "Icon")]
+
+
+def test_check_only_prefixed_folders(folder):
+    catalog = jinjax.Catalog()
+    catalog.add_folder(folder, prefix="ui")
+    (folder / "Page.jinja").write_text("<Missing /><Icon />")
+    (folder / "Icon.jinja").write_text("<i></i>")
+
+    errors = catalog.check()
+    assert [(e.template, e.tag, e.message) for e in errors] == [
+        ("ui:Page.jinja", "Missing", "component not found"),
+    ]
+
+
+def test_check_calls_when_compiling(folder):
+    catalog = jinjax.Catalog(check_calls=True)
+    catalog.add_folder(folder)
+    (folder / "Card.jinja").write_text("{#def title #}<div>{{ title }}</div>")
+    (folder / "Page.jinja").write_text("<p>\n{% if false %}<Card />{% endif %}</p>")
+
+    with pytest.raises(jinja2.TemplateSyntaxError, match="<Card> requires") as err:
+        catalog.render("Page")
+    assert err.value.lineno == 2
+
+
+def test_check_command(folder, folder_t, capsys):
+    (folder / "Page.jinja").write_text("<ui:Nope />")
+    (folder_t / "Nope.jinja").write_text("<Missing />")
+    assert main(["check", str(folder), f"ui={folder_t}"]) == 1
+    assert "ui:Nope.jinja:1: <Missing> component not found" in capsys.readouterr().out
+
+    (folder / "Missing.jinja").write_text("")
+    assert main(["check", str(folder), f"ui={folder_t}"]) == 0
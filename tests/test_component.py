@@ -2,9 +2,12 @@
 JinjaX
 Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
 """
+from pathlib import Path
+
 import pytest
 
 from jinjax import Component, DuplicateDefDeclaration, InvalidArgument
+from jinjax.component import MMAP_MIN_SIZE, parse_header, read_header
 
 
 def test_load_args():
@@ -317,3 +320,70 @@ def test_fake_decl():
 """.strip())
     assert com.required == ["arg"]
     assert com.optional == {}
+
+
+def test_header_is_parsed_once():
+    parse_header.cache_clear()
+    source = """
+{# A very long description #}
+{#def items=[], size="md" #}
+{#css a.css #}
+<p></p>
+"""
+    com1 = Component(name="A", source=source)
+    com2 = Component(name="B", source=source, url_prefix="b/")
+
+    info = parse_header.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+    assert com1.optional == com2.optional == {"items": [], "size": "md"}
+    # Mutable default values are not shared
+    assert com1.optional["items"] is not com2.optional["items"]
+    assert com1.css == ["a.css"]
+    assert com2.css == ["b/a.css"]
+
+
+def test_header_with_any_whitespace():
+    com = Component(
+        name="Test.jinja",
+        source="\t{#- def a, b=1 -#}\r\n\t{# css a.css #}\n{#pure#}<p></p>",
+    )
+    assert com.required == ["a"]
+    assert com.optional == {"b": 1}
+    assert com.css == ["a.css"]
+    assert com.pure
+
+
+def test_unclosed_comment_is_not_header():
+    com = Component(
+        name="Test.jinja",
+        source="{#def a #}\n{# unclosed\n",
+    )
+    assert com.required == ["a"]
+
+
+@pytest.mark.parametrize("padding", [10, MMAP_MIN_SIZE])
+def test_read_only_the_header(tmp_path, padding):
+    path = tmp_path / "Sprite.jinja"
+    header = '\n{# Icons #}\n\t{#def name, size="24" #}\n{#css sprite.css #}'
+    body = "<path d='M0' />" * padding
+    path.write_text(f"{header}\n<svg>{body}</svg>")
+
+    assert read_header(path) == header
+    com = Component(name="Sprite", path=path, relpath=Path("Sprite.jinja"))
+    assert com.required == ["name"]
+    assert com.optional == {"size": "24"}
+    assert com.css == ["sprite.css"]
+
+
+def test_read_header_of_files_without_one(tmp_path):
+    path = tmp_path / "Empty.jinja"
+    path.write_text("")
+    assert read_header(path) == ""
+
+    path.write_text("<p>{# not a header #}</p>")
+    assert read_header(path) == ""
+
+    path.write_text("{#def a #}{# unclosed " + "x" * MMAP_MIN_SIZE)
+    assert read_header(path) == "{#def a #}"
@@ -0,0 +1,166 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import pytest
+from markupsafe import Markup
+
+import jinjax
+
+
+@pytest.fixture()
+def tree(folder, tmp_path):
+    """Page -> Card -> Icon, Page -> ui:Button -> ui:Icon"""
+    ui = tmp_path / "ui"
+    ui.mkdir()
+    (folder / "Icon.jinja").write_text("<i>icon</i>")
+    (folder / "Card.jinja").write_text("<div><Icon />{{ content }}</div>")
+    (folder / "Page.jinja").write_text(
+        "<Card>{% raw %}<Raw />{% endraw %}</Card><ui:Button />"
+    )
+    (folder / "Lonely.jinja").write_text("<p></p>")
+    (ui / "Icon.jinja").write_text("<i>ui</i>")
+    (ui / "Button.jinja").write_text("<button><Icon /></button>")
+    return folder, ui
+
+
+@pytest.fixture()
+def catalog(tree):
+    folder, ui = tree
+    catalog = jinjax.Catalog(auto_reload=False)
+    catalog.add_folder(folder)
+    catalog.add_folder(ui, prefix="ui")
+    return catalog
+
+
+def test_get_dependencies(catalog):
+    assert catalog.get_dependencies("Page") == {"Card.jinja", "ui:Button.jinja"}
+    assert catalog.get_dependencies("Card") == {"Icon.jinja"}
+    # Searched first under the prefix of the caller
+    assert catalog.get_dependencies("ui:Button") == {"ui:Icon.jinja"}
+    assert catalog.get_dependencies("Icon") == set()
+
+
+def test_get_dependencies_of_missing_component(catalog):
+    with pytest.raises(jinjax.ComponentNotFound):
+        catalog.get_dependencies("Nope")
+
+
+def test_get_dependents(catalog):
+    assert catalog.get_dependents("Icon") == {"Card.jinja", "Page.jinja"}
+    assert catalog.get_dependents("ui:Icon") == {"ui:Button.jinja", "Page.jinja"}
+    assert catalog.get_dependents("Page") == set()
+    assert catalog.get_dependents("Lonely") == set()
+
+
+def test_get_dependency_graph(catalog):
+    assert catalog.get_dependency_graph() == {
+        "Card.jinja": {"Icon.jinja"},
+        "Icon.jinja": set(),
+        "Lonely.jinja": set(),
+        "Page.jinja": {"Card.jinja", "ui:Button.jinja"},
+        "ui:Button.jinja": {"ui:Icon.jinja"},
+        "ui:Icon.jinja": set(),
+    }
+
+
+def test_calls_are_recorded_when_compiled(catalog):
+    catalog.render("Page")
+    assert catalog._calls["Page.jinja"] == frozenset({"Card", "ui:Button"})
+    assert catalog._calls["Card.jinja"] == frozenset({"Icon"})
+
+
+def test_invalidate_reloads_the_component(catalog, tree):
+    folder, _ = tree
+    assert "<div><i>icon</i>" in catalog.render("Page")
+
+    (folder / "Icon.jinja").write_text("<i>new</i>")
+    # Without `auto_reload` the change is not seen...
+    assert "new" not in catalog.render("Page")
+
+    # ...until the component is invalidated
+    assert catalog.invalidate("Icon") == {"Icon.jinja", "Card.jinja", "Page.jinja"}
+    assert "<div><i>new</i>" in catalog.render("Page")
+
+
+def test_invalidate_only_the_component(catalog, tree):
+    catalog.render("Page")
+    env = catalog.jinja_env
+    before = {key[1] for key in env.cache.keys()}
+
+    catalog.invalidate("ui:Icon")
+    after = {key[1] for key in env.cache.keys()}
+
+    assert before - after == {"ui:Icon.jinja"}
+    assert "ui.Icon.jinja" not in catalog._cache
+    assert ".Icon.jinja" in catalog._cache
+    assert ".Card.jinja" in catalog._cache
+
+
+def test_invalidate_pure_dependents(catalog, tree):
+    folder, _ = tree
+    (folder / "Card.jinja").write_text("{#pure#}<div><Icon />{{ content }}</div>")
+    (folder / "Lonely.jinja").write_text("{#pure#}<p></p>")
+    catalog.render("Card", _content="a")
+    catalog.render("Lonely")
+    assert catalog.memo_info().currsize == 2
+
+    (folder / "Icon.jinja").write_text("<i>new</i>")
+    catalog.invalidate("Icon")
+
+    # Only the output that includes `Icon` was removed
+    assert catalog.memo_info().currsize == 1
+    assert catalog.render("Card", _content="a") == Markup("<div><i>new</i>a</div>")
+
+
+def test_invalidate_inlined_parent(folder):
+    (folder / "Icon.jinja").write_text("<i>old</i>")
+    (folder / "Page.jinja").write_text("<p><Icon /></p>")
+    catalog = jinjax.Catalog(auto_reload=False, inline_components=True)
+    catalog.add_folder(folder)
+    assert catalog.render("Page") == Markup("<p><i>old</i></p>")
+
+    (folder / "Icon.jinja").write_text("<i>new</i>")
+    catalog.invalidate("Icon")
+    assert catalog.render("Page") == Markup("<p><i>new</i></p>")
+
+
+def test_invalidate_after_freeze(catalog, tree):
+    folder, _ = tree
+    catalog.freeze(gc_freeze=False)
+    (folder / "Icon.jinja").write_text("<i>new</i>")
+
+    catalog.invalidate("Icon")
+    assert "<i>new</i>" in catalog.render("Page")
+
+
+def test_graph_with_only_prefixed_folders(tree):
+    folder, ui = tree
+    catalog = jinjax.Catalog(auto_reload=False)
+    catalog.add_folder(ui, prefix="ui")
+    (ui / "Card.jinja").write_text("<div><Missing /><Icon /></div>")
+
+    graph = catalog.get_dependency_graph()
+    assert graph["ui:Card.jinja"] == {"ui:Icon.jinja"}
+    assert catalog.invalidate("ui:Icon") == {
+        "ui:Icon.jinja", "ui:Button.jinja", "ui:Card.jinja"
+    }
+
+
+def test_graph_walks_each_folder_once(catalog, tree, monkeypatch):
+    folder, ui = tree
+    for i in range(20):
+        # Searched first, and not found, under their own prefix
+        (ui / f"Card{i}.jinja").write_text("<div><Lonely /></div>")
+
+    walks = []
+    build_paths = jinjax.Catalog._build_paths
+
+    def counted(self, prefix, file_ext):
+        walks.append(prefix)
+        return build_paths(self, prefix, file_ext)
+
+    monkeypatch.setattr(jinjax.Catalog, "_build_paths", counted)
+    graph = catalog.get_dependency_graph()
+    assert graph["ui:Card0.jinja"] == {"Lonely.jinja"}
+    assert sorted(walks) == ["", "ui"]
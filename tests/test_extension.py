@@ -8,22 +8,22 @@ VALID_DATA = (
     # Simple case
     (
         """<Foo bar="baz">content</Foo>""",
-        """{% call(_slot="") catalog.irender("Foo", __prefix=__prefix, **{"bar":"baz"}) -%}content{%- endcall %}""",
+        """{%+ jxcall "Foo", {"bar":"baz"} -%}content{%- endjxcall +%}""",
     ),
     # Self-closing tag
     (
         """<Alert type="success" message="Success!" />""",
-        """{{ catalog.irender("Alert", __prefix=__prefix, **{"type":"success", "message":"Success!"}) }}""",
+        """{%+ jxrender "Alert", {"type":"success", "message":"Success!"} +%}""",
     ),
     # No attributes
     (
         """<Foo>content</Foo>""",
-        """{% call(_slot="") catalog.irender("Foo", __prefix=__prefix, **{}) -%}content{%- endcall %}""",
+        """{%+ jxcall "Foo", {} -%}content{%- endjxcall +%}""",
     ),
     # No attributes, self-closing tag
     (
         """<Foo />""",
-        """{{ catalog.irender("Foo", __prefix=__prefix, **{}) }}""",
+        """{%+ jxrender "Foo", {} +%}""",
     ),
     # Line breaks
     (
@@ -31,7 +31,7 @@ VALID_DATA = (
           bar="baz"
           lorem="ipsum"
         >content</Foo>""",
-        """{% call(_slot="") catalog.irender("Foo", __prefix=__prefix, **{"bar":"baz", "lorem":"ipsum"}) -%}content{%- endcall %}""",
+        """{%+ jxcall "Foo", {"bar":"baz", "lorem":"ipsum"}\n\n\n -%}content{%- endjxcall +%}""",
     ),
     # Line breaks, self-closing tag
     (
@@ -40,32 +40,32 @@ VALID_DATA = (
           lorem="ipsum"
           green
         />""",
-        """{{ catalog.irender("Foo", __prefix=__prefix, **{"bar":"baz", "lorem":"ipsum", "green":True}) }}""",
+        """{%+ jxrender "Foo", {"bar":"baz", "lorem":"ipsum", "green":True}\n\n\n\n +%}""",
     ),
     # Subfolder in tag name
     (
         """<sub.Alert type="success">content</sub.Alert>""",
-        """{% call(_slot="") catalog.irender("sub.Alert", __prefix=__prefix, **{"type":"success"}) -%}content{%- endcall %}""",
+        """{%+ jxcall "sub.Alert", {"type":"success"} -%}content{%- endjxcall +%}""",
     ),
     # Python expression in attribute and boolean attributes
     (
         """<Foo bar={{ 42 + 4 }} green large>content</Foo>""",
-        """{% call(_slot="") catalog.irender("Foo", __prefix=__prefix, **{"bar":42 + 4, "green":True, "large":True}) -%}content{%- endcall %}""",
+        """{%+ jxcall "Foo", {"bar":42 + 4, "green":True, "large":True} -%}content{%- endjxcall +%}""",
     ),
     # Prefix in tag name and `'}}'` in attribute
     (
         """<ui:Button lorem={{ 'ipsum }}' }} foo="bar">content</ui:Button>""",
-        """{% call(_slot="") catalog.irender("ui:Button", __prefix=__prefix, **{"lorem":'ipsum }}', "foo":"bar"}) -%}content{%- endcall %}""",
+        """{%+ jxcall "ui:Button", {"lorem":'ipsum }}', "foo":"bar"} -%}content{%- endjxcall +%}""",
     ),
     # `>` in expression
     (
         """<CloseBtn disabled={{ num > 4 }} />""",
-        """{{ catalog.irender("CloseBtn", __prefix=__prefix, **{"disabled":num > 4}) }}""",
+        """{%+ jxrender "CloseBtn", {"disabled":num > 4} +%}""",
     ),
     # `>` in attribute value
     (
         """<CloseBtn data-closer-action="click->closer#close" />""",
-        """{{ catalog.irender("CloseBtn", __prefix=__prefix, **{"data_closer_action":"click->closer#close"}) }}""",
+        """{%+ jxrender "CloseBtn", {"data_closer_action":"click->closer#close"} +%}""",
     ),
 )
 
@@ -131,14 +131,59 @@ def test_process_nested_Same_tag():
 </Card>
     """
     expected = """
-{% call(_slot="") catalog.irender("Card", __prefix=__prefix, **{"class":"card"}) -%}
+{%+ jxcall "Card", {"class":"card"} -%}
   WTF
-  {% call(_slot="") catalog.irender("Card", __prefix=__prefix, **{"class":"card-header"}) -%}abc{%- endcall %}
-  {% call(_slot="") catalog.irender("Card", __prefix=__prefix, **{"class":"card-body"}) -%}
-    <div>{% call(_slot="") catalog.irender("Card", __prefix=__prefix, **{}) -%}Text{%- endcall %}</div>
-  {%- endcall %}
-{%- endcall %}
+  {%+ jxcall "Card", {"class":"card-header"} -%}abc{%- endjxcall +%}
+  {%+ jxcall "Card", {"class":"card-body"} -%}
+    <div>{%+ jxcall "Card", {} -%}Text{%- endjxcall +%}</div>
+  {%- endjxcall +%}
+{%- endjxcall +%}
 """
     result = jinjax.process_tags(source)
     print(result)
     assert result.strip() == expected.strip()
+
+
+def test_component_calls_are_compiled_to_direct_calls():
+    env = jinja2.Environment(extensions=[JinjaX])
+    source = env.preprocess('<Foo bar="baz" /><Foo>content</Foo>')
+    code = env.compile(source, raw=True)
+
+    assert "._render_tag('Foo', " in code
+    assert "environment.getattr" not in code
+
+
+def test_keep_custom_code_generator():
+    from jinja2.compiler import CodeGenerator
+
+    class MyCodeGenerator(CodeGenerator):
+        pass
+
+    class MyEnvironment(jinja2.Environment):
+        code_generator_class = MyCodeGenerator
+
+    env = MyEnvironment(extensions=[JinjaX])
+    assert issubclass(env.code_generator_class, MyCodeGenerator)
+    assert "._render_tag('Foo', " in env.compile(env.preprocess("<Foo />"), raw=True)
+
+
+def test_render_tags_from_other_environment(catalog, folder):
+    (folder / "Foo.jinja").write_text("<b>{{ content }}</b>")
+    env = jinja2.Environment(extensions=[JinjaX])
+    env.globals["catalog"] = catalog
+    env.globals["__prefix"] = ""
+
+    tmpl = env.from_string("<Foo>Hi</Foo><Foo />")
+    assert tmpl.render() == "<b>Hi</b><b></b>"
+
+
+def test_whitespace_with_trim_and_lstrip_blocks(catalog, folder):
+    (folder / "Icon.jinja").write_text("<i></i>")
+    (folder / "Card.jinja").write_text("<b>{{ content }}</b>")
+    env = catalog.jinja_env
+    env.trim_blocks = True
+    env.lstrip_blocks = True
+
+    tmpl = env.from_string("<ul>\n  <Icon />\n  <Icon />\n  <Card>x</Card>\n</ul>")
+    expected = "<ul>\n  <i></i>\n  <i></i>\n  <b>x</b>\n</ul>"
+    assert tmpl.render(catalog=catalog, __prefix="") == expected
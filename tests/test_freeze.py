@@ -0,0 +1,77 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import gc
+
+from markupsafe import Markup
+
+import jinjax
+
+
+def test_freeze_loads_every_component(folder):
+    (folder / "Card.jinja").write_text("{#def title #}<div>{{ title }}</div>")
+    (folder / "ui").mkdir()
+    (folder / "ui" / "Button.jinja").write_text("<button>{{ content }}</button>")
+    (folder / "ui" / "index.jinja").write_text("<ui.Button>Go</ui.Button>")
+    (folder / "ui" / "Button.css").write_text("button {}")
+
+    catalog = jinjax.Catalog(collect_stats=True)
+    catalog.add_folder(folder)
+    assert catalog.freeze(gc_freeze=False) == 3
+    assert not catalog.auto_reload
+    assert isinstance(catalog.jinja_env.cache, dict)
+
+    catalog.reset_stats()
+    assert catalog.render("Card", title="Hi") == Markup("<div>Hi</div>")
+    assert catalog.render("ui") == Markup("<button>Go</button>")
+
+    stats = catalog.stats()
+    assert stats["cache.miss"]["count"] == 0
+    assert stats["compile"]["count"] == 0
+
+
+def test_freeze_prefixed_components(folder, tmp_path):
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "Card.jinja").write_text("<section>{{ content }}</section>")
+
+    catalog = jinjax.Catalog(use_cache=False, collect_stats=True)
+    catalog.add_folder(folder)
+    catalog.add_folder(other, prefix="other")
+    assert catalog.freeze(gc_freeze=False) == 1
+
+    catalog.reset_stats()
+    assert catalog.render("other:Card", _content="x") == Markup("<section>x</section>")
+    assert catalog.stats()["cache.hit"]["count"] == 1
+
+
+def test_freeze_gc(folder):
+    (folder / "Card.jinja").write_text("<div></div>")
+    catalog = jinjax.Catalog()
+    catalog.add_folder(folder)
+    try:
+        catalog.freeze()
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+
+def test_render_after_freeze_does_not_grow_the_caches(folder, tmp_path):
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "Icon.jinja").write_text("<i></i>")
+    (other / "Card.jinja").write_text("<section><Icon /></section>")
+    (folder / "Page.jinja").write_text("<main><other:Card /><Title /></main>")
+    (folder / "Title.jinja").write_text("<h1></h1>")
+
+    catalog = jinjax.Catalog()
+    catalog.add_folder(folder)
+    catalog.add_folder(other, prefix="other")
+    catalog.freeze(gc_freeze=False)
+    resolved = dict(catalog._resolved)
+
+    html = catalog.render("Page")
+    assert html == Markup("<main><section><i></i></section><h1></h1></main>")
+    assert catalog.render("other:Icon") == Markup("<i></i>")
+    assert catalog._resolved == resolved
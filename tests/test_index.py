@@ -0,0 +1,146 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import json
+import zipfile
+from hashlib import sha256
+
+import pytest
+from markupsafe import Markup
+
+import jinjax
+from jinjax.__main__ import main
+from jinjax.resources import INDEX_NAME, build_index, write_index
+
+
+@pytest.fixture()
+def library(folder):
+    (folder / "Card.jinja").write_text("{#def title #}<div><ButtonGroup />{{ title }}</div>")
+    (folder / "Card.css").write_text("")
+    (folder / "button-group.jinja").write_text("{#js group.js #}<span></span>")
+    (folder / "forms").mkdir()
+    (folder / "forms" / "index.jinja").write_text("<form></form>")
+    (folder / "forms" / "Input.jinja").write_text("{#def type='text' #}<input type={{ type }}>")
+    return folder
+
+
+def test_build_index(library):
+    index = build_index(library, file_ext=".jinja")
+
+    assert index.file_ext == ".jinja"
+    assert index.names == {
+        "forms": "forms/index.jinja",
+        "forms/Input": "forms/Input.jinja",
+        "forms/index": "forms/index.jinja",
+        "Card": "Card.jinja",
+        "button-group": "button-group.jinja",
+    }
+    content = (library / "Card.jinja").read_bytes()
+    assert index.files["Card.jinja"] == {
+        "size": len(content),
+        "sha256": sha256(content).hexdigest(),
+    }
+    assert "Card.css" in index.files
+    assert index.metadata["Card.jinja"] == {
+        "required": ["title"],
+        "optional": {},
+        "css": ["Card.css"],
+        "js": [],
+        "pure": False,
+    }
+    assert index.metadata["forms/Input.jinja"]["optional"] == {"type": "text"}
+
+
+def test_metadata_not_stored_as_json_is_not_indexed(library):
+    (library / "Tags.jinja").write_text("{#def tags={1, 2} #}<i></i>")
+    (library / "Size.jinja").write_text("{#def size=1e999 #}<i></i>")
+    index = build_index(library, file_ext=".jinja")
+
+    assert "Tags.jinja" not in index.metadata
+    assert "Size.jinja" not in index.metadata
+    assert "Tags.jinja" in index.files
+    assert "Card.jinja" in index.metadata
+
+
+def test_add_folder_uses_the_index(library, monkeypatch):
+    write_index(library, file_ext=".jinja")
+    # Changed after writing the index
+    (library / "Card.jinja").write_text("{#def title, extra=1 #}<div>{{ title }}</div>")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("walked")
+
+    monkeypatch.setattr("jinjax.catalog.os.walk", fail)
+    catalog = jinjax.Catalog(auto_reload=False)
+    catalog.add_folder(library)
+
+    assert catalog.render("Card", title="Hi") == Markup("<div>Hi</div>")
+    assert catalog.render("forms") == Markup("<form></form>")
+    assert catalog.render("ButtonGroup") == Markup("<span></span>")
+    # The metadata was read from the index
+    component = catalog._get_component("Card")
+    assert component.optional == {}
+    assert component.css == ["Card.css"]
+
+
+def test_index_is_ignored_with_auto_reload(library):
+    write_index(library, file_ext=".jinja")
+    (library / "New.jinja").write_text("<p>new</p>")
+
+    catalog = jinjax.Catalog(auto_reload=True)
+    catalog.add_folder(library)
+    assert catalog.render("New") == Markup("<p>new</p>")
+
+    catalog = jinjax.Catalog(auto_reload=False)
+    catalog.add_folder(library)
+    with pytest.raises(jinjax.ComponentNotFound):
+        catalog.render("New")
+
+
+@pytest.mark.parametrize("content", [
+    "{not json",
+    json.dumps({"version": 999, "files": {}, "names": {}, "metadata": {}}),
+    json.dumps({
+        "version": 1,
+        "files": {},
+        "names": {"Card": "Card.jinja"},
+        "metadata": {},
+        "file_ext": ".html",
+    }),
+])
+def test_invalid_index_is_ignored(library, content):
+    (library / INDEX_NAME).write_text(content)
+    (library / "New.jinja").write_text("<p>new</p>")
+
+    catalog = jinjax.Catalog(auto_reload=False)
+    catalog.add_folder(library)
+    assert catalog.render("New") == Markup("<p>new</p>")
+
+
+def test_zipped_package_with_index(library, tmp_path):
+    write_index(library, file_ext=".jinja")
+    archive = tmp_path / "lib.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for path in library.rglob("*"):
+            if path.is_file():
+                zf.write(path, path.relative_to(library).as_posix())
+
+    catalog = jinjax.Catalog(auto_reload=False)
+    catalog.add_package(zipfile.Path(archive), prefix="lib")
+    assert catalog.render("lib:Card", title="Hi") == Markup("<div><span></span>Hi</div>")
+    assert catalog.collected_css == ["lib/Card.css"]
+    assert catalog.collected_js == ["lib/group.js"]
+
+
+def test_index_command(library, capsys):
+    assert main(["index", "--check", str(library)]) == 1
+    assert "missing" in capsys.readouterr().out
+
+    assert main(["index", str(library)]) == 0
+    assert (library / INDEX_NAME).is_file()
+    assert main(["index", "--check", str(library)]) == 0
+
+    (library / "Card.jinja").write_text("<div></div>")
+    assert main(["index", "--check", str(library)]) == 1
+    assert "outdated" in capsys.readouterr().out
@@ -0,0 +1,123 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import os
+
+import jinja2
+import pytest
+from markupsafe import Markup
+
+import jinjax
+
+
+@pytest.fixture()
+def catalog(folder):
+    catalog = jinjax.Catalog(inline_components=True)
+    catalog.add_folder(folder)
+    return catalog
+
+
+def compiled(catalog, name):
+    env = catalog.jinja_env
+    source, _, _ = env.loader.get_source(env, name)
+    return env.compile(env.preprocess(source, name=name), raw=True)
+
+
+def test_inline_leaf_component(catalog, folder):
+    (folder / "Icon.jinja").write_text("""
+{#def name, size=24 #}
+{#css icon.css #}
+<i class="icon-{{ name }}" data-size="{{ size }}"></i>
+""")
+    (folder / "Page.jinja").write_text("""
+{#css page.css #}
+<p>{% for name in ["a", "b"] %}<Icon name={{ name }} />{% endfor %}</p>
+""")
+
+    html = catalog.render("Page")
+    assert html == Markup(
+        '<p><i class="icon-a" data-size="24"></i><i class="icon-b" data-size="24"></i></p>'
+    )
+    assert "_render_tag('Icon'" not in compiled(catalog, "Page.jinja")
+    assert catalog.collected_css == ["page.css", "icon.css"]
+
+
+@pytest.mark.parametrize("source, call", [
+    # Uses `attrs`
+    ("<i {{ attrs.render() }}></i>", "<Icon />"),
+    # An undeclared argument would go to `attrs`
+    ("{#def name #}<i>{{ name }}</i>", '<Icon name="a" extra="b" />'),
+    # Missing a required argument
+    ("{#def name #}<i>{{ name }}</i>", "<Icon />"),
+    # Uses a variable that isn't an argument, like a render global
+    ("<i>{{ user }}</i>", "<Icon />"),
+    # Has a subcomponent
+    ("<b><Other /></b>", "<Icon />"),
+    # Called with content
+    ("<i>{{ content }}</i>", "<Icon>Hi</Icon>"),
+    # Is pure
+    ("{#pure#}<i></i>", "<Icon />"),
+    # Mutable default
+    ("{#def items=[] #}<i>{{ items }}</i>", "<Icon />"),
+    # Infinite default, written as an undefined `inf`
+    ("{#def size=1e999 #}<i>{{ size }}</i>", "<Icon />"),
+])
+def test_not_inlined(catalog, folder, source, call):
+    (folder / "Other.jinja").write_text("<b></b>")
+    (folder / "Icon.jinja").write_text(source)
+    (folder / "Page.jinja").write_text(call)
+
+    assert "_render_tag('Icon'" in compiled(catalog, "Page.jinja")
+
+
+def test_inlining_is_opt_in(folder):
+    (folder / "Icon.jinja").write_text("<i></i>")
+    (folder / "Page.jinja").write_text("<Icon />")
+    catalog = jinjax.Catalog()
+    catalog.add_folder(folder)
+
+    assert "_render_tag('Icon'" in compiled(catalog, "Page.jinja")
+
+
+def test_parent_is_compiled_again_when_inlined_changes(catalog, folder):
+    path = folder / "Icon.jinja"
+    path.write_text("<i>old</i>")
+    (folder / "Page.jinja").write_text("<p><Icon /></p>")
+    assert catalog.render("Page") == Markup("<p><i>old</i></p>")
+
+    path.write_text("<i>new</i>")
+    mtime = path.stat().st_mtime + 1
+    os.utime(path, (mtime, mtime))
+    assert catalog.render("Page") == Markup("<p><i>new</i></p>")
+
+
+def test_inline_prefixed_component(catalog, folder, tmp_path):
+    ui = tmp_path / "ui"
+    ui.mkdir()
+    catalog.add_folder(ui, prefix="ui")
+    (ui / "Icon.jinja").write_text("<i>ui</i>")
+    (ui / "Button.jinja").write_text("<button><Icon /></button>")
+    (folder / "Icon.jinja").write_text("<i>default</i>")
+    (folder / "Page.jinja").write_text("<ui:Button /><Icon />")
+
+    assert catalog.render("Page") == Markup("<button><i>ui</i></button><i>default</i>")
+
+
+def test_infinite_default(catalog, folder):
+    # Inlined, it would fail with the default `StrictUndefined`
+    (folder / "Icon.jinja").write_text("{#def size=1e999 #}<i>{{ size }}</i>")
+    (folder / "Page.jinja").write_text("<p><Icon /></p>")
+
+    assert catalog.jinja_env.undefined is jinja2.StrictUndefined
+    assert catalog.render("Page") == Markup("<p><i>inf</i></p>")
+
+
+def test_whitespace_with_trim_and_lstrip_blocks(catalog, folder):
+    catalog.jinja_env.trim_blocks = True
+    catalog.jinja_env.lstrip_blocks = True
+    (folder / "Icon.jinja").write_text("{#def name='a' #}<i>{{ name }}</i>")
+    (folder / "Page.jinja").write_text("<ul>\n  <Icon />\n  <Icon />\n</ul>")
+
+    assert catalog.render("Page") == Markup("<ul>\n  <i>a</i>\n  <i>a</i>\n</ul>")
+    assert "_render_tag('Icon'" not in compiled(catalog, "Page.jinja")
@@ -0,0 +1,152 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import os
+
+from markupsafe import Markup
+
+import jinjax
+
+
+def test_pure_component_is_rendered_once(catalog, folder):
+    (folder / "Icon.jinja").write_text("""
+{#def name #}
+{#pure#}
+<i class="icon-{{ name }}"></i>
+""")
+    (folder / "Table.jinja").write_text("""
+{#def rows #}
+{% for row in rows %}<Icon name="star" />{% endfor %}
+""")
+
+    html = catalog.render("Table", rows=range(500))
+    assert html == Markup('<i class="icon-star"></i>' * 500)
+
+    info = catalog.memo_info()
+    assert info.misses == 1
+    assert info.hits == 499
+    assert info.currsize == 1
+
+
+def test_memo_key_includes_args_and_content(catalog, folder):
+    (folder / "Badge.jinja").write_text("""
+{#def label #}
+{#- pure -#}
+<b>{{ label }}: {{ content }}</b>
+""")
+
+    assert catalog.render("Badge", label="a", _content="1") == Markup("<b>a: 1</b>")
+    assert catalog.render("Badge", label="b", _content="1") == Markup("<b>b: 1</b>")
+    assert catalog.render("Badge", label="a", _content="2") == Markup("<b>a: 2</b>")
+    assert catalog.render("Badge", label="a", _content="1") == Markup("<b>a: 1</b>")
+
+    info = catalog.memo_info()
+    assert info.misses == 3
+    assert info.hits == 1
+
+
+def test_not_pure_components_are_not_memoized(catalog, folder):
+    (folder / "Icon.jinja").write_text("""
+{#def name #}
+<i class="icon-{{ name }}"></i>
+""")
+
+    catalog.render("Icon", name="star")
+    catalog.render("Icon", name="star")
+    assert catalog.memo_info() == (0, 0, catalog.memo_info().maxsize, 0)
+
+
+def test_unhashable_args_are_not_memoized(catalog, folder):
+    (folder / "List.jinja").write_text("""
+{#def items #}
+{#pure#}
+{{ items|join(",") }}
+""")
+
+    items = ["a", "b"]
+    assert catalog.render("List", items=items) == Markup("a,b")
+    items.append("c")
+    assert catalog.render("List", items=items) == Markup("a,b,c")
+    assert catalog.memo_info().currsize == 0
+
+
+def test_memo_hit_collects_subcomponents_assets(catalog, folder):
+    (folder / "Child.jinja").write_text("""
+{#css child.css #}
+{#js child.js #}
+<span>child</span>
+""")
+    (folder / "Parent.jinja").write_text("""
+{#pure#}
+{#css parent.css #}
+<Child />
+""")
+    (folder / "Page.jinja").write_text("""
+{{ catalog.render_assets() }}
+<Parent />
+""")
+
+    expected = Markup("""
+<link rel="stylesheet" href="/static/components/parent.css">
+<link rel="stylesheet" href="/static/components/child.css">
+<script type="module" src="/static/components/child.js"></script>
+<span>child</span>
+""".strip())
+
+    assert catalog.render("Page") == expected
+    assert catalog.render("Page") == expected
+    assert catalog.memo_info().hits == 1
+
+
+def test_memo_entry_has_assets_collected_before(catalog, folder):
+    (folder / "Icon.jinja").write_text("{#css icon.css #}<i></i>")
+    (folder / "Badge.jinja").write_text("{#def label #}{#pure#}<b><Icon />{{ label }}</b>")
+    (folder / "Page1.jinja").write_text('<Icon /><Badge label="x" />')
+    (folder / "Page2.jinja").write_text('<Badge label="x" />')
+
+    catalog.render("Page1")
+    assert catalog.collected_css == ["icon.css"]
+    catalog.render("Page2")
+    assert catalog.memo_info().hits == 1
+    assert catalog.collected_css == ["icon.css"]
+
+
+def test_memo_disabled(folder):
+    catalog = jinjax.Catalog(memo_size=0)
+    catalog.add_folder(folder)
+    (folder / "Icon.jinja").write_text("""
+{#pure#}
+<i class="icon"></i>
+""")
+
+    catalog.render("Icon")
+    catalog.render("Icon")
+    assert catalog.memo_info().currsize == 0
+
+
+def test_memo_clear(catalog, folder):
+    (folder / "Icon.jinja").write_text("""
+{#pure#}
+<i class="icon"></i>
+""")
+
+    catalog.render("Icon")
+    catalog.render("Icon")
+    catalog.memo_clear()
+    assert catalog.memo_info() == (0, 0, catalog.memo_info().maxsize, 0)
+
+
+def test_not_memoized_with_auto_reload(folder):
+    catalog = jinjax.Catalog(auto_reload=True)
+    catalog.add_folder(folder)
+    (folder / "Card.jinja").write_text("{#pure#}<div><Child /></div>")
+    child = folder / "Child.jinja"
+    child.write_text("<b>v1</b>")
+    assert catalog.render("Card") == Markup("<div><b>v1</b></div>")
+
+    child.write_text("<b>v2</b>")
+    mtime = child.stat().st_mtime + 1
+    os.utime(child, (mtime, mtime))
+    assert catalog.render("Card") == Markup("<div><b>v2</b></div>")
+    assert catalog.memo_info().currsize == 0
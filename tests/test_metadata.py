@@ -0,0 +1,112 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import os
+
+import pytest
+from markupsafe import Markup
+
+import jinjax
+from jinjax.component import Component
+
+
+def new_catalog(folder, cache_file):
+    catalog = jinjax.Catalog(metadata_cache=cache_file)
+    catalog.add_folder(folder)
+    return catalog
+
+
+def test_metadata_is_shared_between_catalogs(folder, tmp_path, monkeypatch):
+    cache_file = tmp_path / "metadata.json"
+    (folder / "Card.jinja").write_text("""
+{#def title, items=[] #}
+{#css extra.css #}
+<div>{{ title }} {{ items|length }}</div>
+""")
+    (folder / "Card.js").touch()
+
+    catalog = new_catalog(folder, cache_file)
+    assert catalog.render("Card", title="a") == Markup("<div>a 0</div>")
+    assert not cache_file.exists()
+    catalog.save_metadata()
+    assert cache_file.exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the metadata was parsed again")
+
+    monkeypatch.setattr(Component, "load_metadata", fail)
+
+    catalog = new_catalog(folder, cache_file)
+    html = catalog.render("Card", title="b", items=[1, 2])
+    assert html == Markup("<div>b 2</div>")
+
+    component = catalog._get_component("Card")
+    assert component.required == ["title"]
+    assert component.optional == {"items": []}
+    assert component.css == ["extra.css"]
+    assert component.js == ["Card.js"]
+
+
+def test_changed_file_is_parsed_again(folder, tmp_path):
+    cache_file = tmp_path / "metadata.json"
+    path = folder / "Card.jinja"
+    path.write_text("{#def title #}<div>{{ title }}</div>")
+
+    catalog = new_catalog(folder, cache_file)
+    catalog.render("Card", title="a")
+    catalog.save_metadata()
+
+    path.write_text("{#def title, sub='' #}<div>{{ title }}{{ sub }}</div>")
+    mtime = path.stat().st_mtime + 1
+    os.utime(path, (mtime, mtime))
+
+    catalog = new_catalog(folder, cache_file)
+    assert catalog.render("Card", title="a", sub="b") == Markup("<div>ab</div>")
+    assert catalog._get_component("Card").optional == {"sub": ""}
+
+
+def test_invalid_file_is_ignored(folder, tmp_path):
+    cache_file = tmp_path / "metadata.json"
+    cache_file.write_bytes(b"not a JSON file")
+    (folder / "Card.jinja").write_text("{#def title #}<div>{{ title }}</div>")
+
+    catalog = new_catalog(folder, cache_file)
+    assert catalog.render("Card", title="a") == Markup("<div>a</div>")
+    catalog.save_metadata()
+
+    catalog = new_catalog(folder, cache_file)
+    assert len(catalog._metadata) == 1
+
+
+def test_save_metadata_without_file(catalog):
+    with pytest.raises(RuntimeError):
+        catalog.save_metadata()
+
+
+def test_metadata_not_stored_as_json_is_not_cached(folder, tmp_path):
+    cache_file = tmp_path / "metadata.json"
+    (folder / "Card.jinja").write_text("{#def tags={1, 2} #}<div>{{ tags|length }}</div>")
+    (folder / "Title.jinja").write_text("{#def title #}<h1>{{ title }}</h1>")
+
+    catalog = new_catalog(folder, cache_file)
+    assert catalog.render("Card") == Markup("<div>2</div>")
+    assert catalog.render("Title", title="a") == Markup("<h1>a</h1>")
+    catalog.save_metadata()
+
+    catalog = new_catalog(folder, cache_file)
+    assert len(catalog._metadata) == 1
+    assert catalog.render("Card") == Markup("<div>2</div>")
+
+
+def test_added_asset_file_is_found(folder, tmp_path):
+    cache_file = tmp_path / "metadata.json"
+    (folder / "Card.jinja").write_text("<div></div>")
+
+    catalog = new_catalog(folder, cache_file)
+    catalog.render("Card")
+    catalog.save_metadata()
+
+    (folder / "Card.css").touch()
+    catalog = new_catalog(folder, cache_file)
+    assert catalog._get_component("Card").css == ["Card.css"]
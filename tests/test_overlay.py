@@ -0,0 +1,129 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import pytest
+from markupsafe import Markup
+
+import jinjax
+
+
+@pytest.fixture()
+def base(folder, tmp_path):
+    ui = tmp_path / "ui"
+    ui.mkdir()
+    (folder / "Page.jinja").write_text(
+        "{#css page.css #}<main><Button /><ui:Icon /></main>"
+    )
+    (folder / "Button.jinja").write_text("{#css button.css #}<button>base</button>")
+    (ui / "Icon.jinja").write_text("<i>base</i>")
+
+    catalog = jinjax.Catalog(auto_reload=False)
+    catalog.add_folder(folder)
+    catalog.add_folder(ui, prefix="ui")
+    return catalog
+
+
+@pytest.fixture()
+def tenant(tmp_path):
+    folder = tmp_path / "tenant"
+    folder.mkdir()
+    (folder / "Button.jinja").write_text("{#css tenant.css #}<button>tenant</button>")
+    return folder
+
+
+def test_overlay_overrides_components(base, tenant):
+    overlay = base.overlay(tenant)
+
+    html = overlay.render("Page")
+    assert html == Markup("<main><button>tenant</button><i>base</i></main>")
+    assert overlay.collected_css == ["page.css", "tenant.css"]
+    assert overlay.render("ui:Icon") == Markup("<i>base</i>")
+
+    html = base.render("Page")
+    assert html == Markup("<main><button>base</button><i>base</i></main>")
+    assert base.collected_css == ["page.css", "button.css"]
+
+
+def test_overlay_shares_compiled_templates(base, tenant):
+    base.render("Page")
+    overlay = base.overlay(tenant)
+    overlay.render("Page")
+
+    page = overlay._get_component("Page")
+    assert page.tmpl is base._get_component("Page").tmpl
+    # Only the overridden component was compiled by the overlay
+    assert {key[1] for key in overlay.jinja_env.cache.keys()} == {"Button.jinja"}
+    assert overlay.jinja_env.bytecode_cache is base.jinja_env.bytecode_cache
+
+
+def test_overlay_with_prefix(base, tmp_path):
+    folder = tmp_path / "tenant-ui"
+    folder.mkdir()
+    (folder / "Icon.jinja").write_text("<i>tenant</i>")
+    overlay = base.overlay([folder], prefix="ui")
+
+    html = overlay.render("Page")
+    assert html == Markup("<main><button>base</button><i>tenant</i></main>")
+
+
+def test_overlay_of_overlay(base, tenant, tmp_path):
+    folder = tmp_path / "branch"
+    folder.mkdir()
+    (folder / "Page.jinja").write_text("<section><Button /></section>")
+    overlay = base.overlay(tenant).overlay(folder)
+
+    assert overlay.render("Page") == Markup("<section><button>tenant</button></section>")
+    assert overlay.render("ui:Icon") == Markup("<i>base</i>")
+
+
+def test_overlay_with_inlined_components(folder, tenant):
+    (folder / "Card.jinja").write_text("<div><Button /></div>")
+    (folder / "Button.jinja").write_text("<button>base</button>")
+    catalog = jinjax.Catalog(auto_reload=False, inline_components=True)
+    catalog.add_folder(folder)
+    assert catalog.render("Card") == Markup("<div><button>base</button></div>")
+
+    overlay = catalog.overlay(tenant)
+    assert overlay.render("Card") == Markup("<div><button>tenant</button></div>")
+    assert catalog.render("Card") == Markup("<div><button>base</button></div>")
+
+
+def test_invalidate_parent_component(base, tenant, folder):
+    overlay = base.overlay(tenant)
+    assert "<i>base</i>" in overlay.render("Page")
+
+    (folder.parent / "ui" / "Icon.jinja").write_text("<i>new</i>")
+    base.invalidate("ui:Icon")
+    assert "<i>new</i>" in overlay.render("Page")
+
+
+def test_folder_added_to_parent(base, tenant, tmp_path):
+    overlay = base.overlay(tenant)
+    with pytest.raises(jinjax.ComponentNotFound):
+        overlay.render("Extra")
+
+    extra = tmp_path / "extra"
+    extra.mkdir()
+    (extra / "Extra.jinja").write_text("<p>extra</p>")
+    base.add_folder(extra)
+    assert overlay.render("Extra") == Markup("<p>extra</p>")
+
+
+def test_overlay_has_its_own_memo(folder, tenant):
+    (folder / "Card.jinja").write_text("{#pure#}<div><Button /></div>")
+    (folder / "Button.jinja").write_text("<button>base</button>")
+    catalog = jinjax.Catalog(auto_reload=False)
+    catalog.add_folder(folder)
+    overlay = catalog.overlay(tenant)
+
+    assert catalog.render("Card") == Markup("<div><button>base</button></div>")
+    assert overlay.render("Card") == Markup("<div><button>tenant</button></div>")
+    assert catalog.memo_info().currsize == 1
+    assert overlay.memo_info().currsize == 1
+
+
+def test_overlay_unknown_prefix(base, tenant):
+    overlay = base.overlay(tenant)
+    with pytest.raises(jinjax.catalog.UnknownPrefix):
+        overlay.render("nope:Button")
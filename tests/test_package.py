@@ -0,0 +1,142 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import sys
+import zipfile
+
+import pytest
+from markupsafe import Markup
+
+import jinjax
+from jinjax.resources import INDEX_NAME, ResourceFile
+
+
+FILES = {
+    "Card.jinja": "{#css card.css #}<div><Button>{{ content }}</Button></div>",
+    "card.css": "",
+    "Button.jinja": "{#def kind='button' #}<button type={{ kind }}>{{ content }}</button>",
+    "Button.js": "",
+    "forms/Input.jinja": "<input>",
+    "forms/index.jinja": "<form></form>",
+}
+INDEX = "\n".join(["# Generated", *FILES, ""])
+
+
+@pytest.fixture()
+def package(tmp_path, monkeypatch):
+    """Writes a package with the components in a folder or a zip
+    file in `sys.path` and returns its name."""
+    def make(name, *, zipped=False, index=INDEX):
+        files = {f"{name}/__init__.py": ""}
+        files.update({f"{name}/components/{path}": src for path, src in FILES.items()})
+        if index is not None:
+            files[f"{name}/components/{INDEX_NAME}"] = index
+        files[f"{name}/components/__init__.py"] = ""
+
+        if zipped:
+            root = tmp_path / f"{name}.zip"
+            with zipfile.ZipFile(root, "w") as zf:
+                for path, source in files.items():
+                    zf.writestr(path, source)
+        else:
+            root = tmp_path / "site"
+            for path, source in files.items():
+                filepath = root / path
+                filepath.parent.mkdir(parents=True, exist_ok=True)
+                filepath.write_text(source)
+
+        monkeypatch.syspath_prepend(str(root))
+        monkeypatch.delitem(sys.modules, name, raising=False)
+        monkeypatch.delitem(sys.modules, f"{name}.components", raising=False)
+        return f"{name}.components"
+
+    return make
+
+
+EXPECTED = Markup("<div><button type=button>Hi</button></div>")
+
+
+def test_add_package(package, tmp_path):
+    catalog = jinjax.Catalog()
+    catalog.add_package(package("jx_disk_pkg"), prefix="lib")
+
+    assert catalog.render("lib:Card", _content="Hi") == EXPECTED
+    assert catalog.collected_css == ["lib/card.css"]
+    assert catalog.collected_js == ["lib/Button.js"]
+    assert catalog.render("lib:forms") == Markup("<form></form>")
+    assert catalog.render("lib:forms.Input") == Markup("<input>")
+    assert catalog.paths == [tmp_path / "site" / "jx_disk_pkg" / "components"]
+
+
+def test_add_zipped_package(package):
+    catalog = jinjax.Catalog(auto_reload=False)
+    catalog.add_package(package("jx_zip_pkg", zipped=True), prefix="lib")
+
+    assert catalog.render("lib:Card", _content="Hi") == EXPECTED
+    assert catalog.collected_css == ["lib/card.css"]
+    assert catalog.collected_js == ["lib/Button.js"]
+    assert catalog.render("lib:forms") == Markup("<form></form>")
+
+    component = catalog._get_component("lib:Card")
+    assert isinstance(component.path, ResourceFile)
+    assert component.root_path is None
+    with component.path.open("r") as file:
+        assert file.read() == FILES["Card.jinja"]
+    # Can't be served by the middleware
+    assert catalog.paths == []
+
+
+def test_zipped_package_with_auto_reload(package):
+    catalog = jinjax.Catalog(auto_reload=True)
+    catalog.add_package(package("jx_zip_reload_pkg", zipped=True))
+
+    assert catalog.render("Card", _content="Hi") == EXPECTED
+    assert catalog.render("Card", _content="Hi") == EXPECTED
+
+
+def test_only_the_indexed_files_are_found(package, tmp_path):
+    index = "\n".join(["Card.jinja", "Button.jinja"])
+    catalog = jinjax.Catalog()
+    catalog.add_package(package("jx_partial_pkg", zipped=True, index=index))
+
+    assert catalog.render("Card", _content="Hi") == EXPECTED
+    with pytest.raises(jinjax.ComponentNotFound):
+        catalog.render("forms.Input")
+
+
+def test_package_without_index(package, tmp_path):
+    package("jx_noindex_pkg", zipped=True, index=None)
+    root = zipfile.Path(tmp_path / "jx_noindex_pkg.zip", at="jx_noindex_pkg/components/")
+    catalog = jinjax.Catalog()
+    catalog.add_package(root)
+
+    assert catalog.render("Card", _content="Hi") == EXPECTED
+    assert catalog.render("forms.Input") == Markup("<input>")
+
+
+def test_folder_overrides_package(package, folder):
+    (folder / "Button.jinja").write_text("<b>{{ content }}</b>")
+    catalog = jinjax.Catalog()
+    catalog.add_folder(folder)
+    catalog.add_package(package("jx_override_pkg", zipped=True))
+
+    assert catalog.render("Card", _content="Hi") == Markup("<div><b>Hi</b></div>")
+
+
+def test_package_is_added_once(package):
+    name = package("jx_once_pkg", zipped=True)
+    catalog = jinjax.Catalog()
+    catalog.add_package(name)
+    catalog.add_package(name)
+
+    assert len(catalog.prefixes[""].searchpath) == 1
+
+
+def test_freeze_zipped_package(package):
+    catalog = jinjax.Catalog()
+    catalog.add_package(package("jx_freeze_pkg", zipped=True))
+
+    assert catalog.freeze(gc_freeze=False) == 4
+    assert catalog.check() == []
+    assert catalog.render("Card", _content="Hi") == EXPECTED
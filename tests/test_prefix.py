@@ -6,6 +6,8 @@ import jinja2
 import pytest
 from markupsafe import Markup
 
+import jinjax
+
 
 @pytest.mark.parametrize("undefined", [jinja2.Undefined, jinja2.StrictUndefined])
 @pytest.mark.parametrize("autoescape", [True, False])
@@ -123,3 +125,50 @@ def test_allow_dots_in_prefixes(catalog, folder, folder_t, autoescape, undefined
 
     html = catalog.render("Test")
     assert html == Markup("prefix")
+
+
+def test_include_from_prefixed_component(tmp_path):
+    ui = tmp_path / "ui"
+    ui.mkdir()
+    (ui / "Card.jinja").write_text('<div>{% include "card-body.html" %}</div>')
+    (ui / "card-body.html").write_text("ui body")
+    folder = tmp_path / "components"
+    folder.mkdir()
+    (folder / "card-body.html").write_text("default body")
+
+    catalog = jinjax.Catalog()
+    catalog.add_folder(folder)
+    catalog.add_folder(ui, prefix="ui")
+
+    assert catalog.render("ui:Card") == Markup("<div>ui body</div>")
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_prefix_fallback_is_not_searched_again(folder, folder_t, monkeypatch, use_cache):
+    catalog = jinjax.Catalog(auto_reload=False, use_cache=use_cache)
+    catalog.add_folder(folder)
+    catalog.add_folder(folder_t, prefix="ui")
+    (folder_t / "Title.jinja").write_text("<h1><Icon /></h1>")
+    (folder / "Icon.jinja").write_text("<i></i>")
+    assert catalog.render("ui:Title") == Markup("<h1><i></i></h1>")
+    with pytest.raises(jinjax.ComponentNotFound):
+        catalog.render("ui:Nope")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("searched again")
+
+    monkeypatch.setattr(jinjax.Catalog, "_get_component_path", fail)
+    if use_cache:
+        assert catalog.render("ui:Title") == Markup("<h1><i></i></h1>")
+    with pytest.raises(jinjax.ComponentNotFound):
+        catalog.render("ui:Nope")
+
+
+def test_missing_component_is_found_later_with_auto_reload(folder):
+    catalog = jinjax.Catalog(auto_reload=True)
+    catalog.add_folder(folder)
+    with pytest.raises(jinjax.ComponentNotFound):
+        catalog.render("Later")
+
+    (folder / "Later.jinja").write_text("<p></p>")
+    assert catalog.render("Later") == Markup("<p></p>")
@@ -0,0 +1,99 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import json
+
+
+def setup_components(folder):
+    (folder / "Icon.jinja").write_text("""
+{#css icon.css #}
+<i></i>
+""")
+    (folder / "Card.jinja").write_text("""
+<div>{{ content }}<Icon /></div>
+""")
+    (folder / "Page.jinja").write_text("""
+<Card><Icon /></Card><Card>2</Card>
+""")
+
+
+def test_profile_tree(catalog, folder):
+    setup_components(folder)
+
+    with catalog.profile() as profile:
+        catalog.render("Page")
+        catalog.render("Page")
+
+    page = profile.root.children["Page"]
+    assert page.calls == 2
+    assert page.cache == {"file": 1, "cache": 1}
+
+    card = page.children["Card"]
+    assert card.calls == 4
+    assert set(card.children) == {"Icon"}
+    assert card.children["Icon"].calls == 6
+    assert card.children["Icon"].assets == 6
+
+    assert page.total >= card.total
+    assert page.self_time <= page.total
+    assert len(profile.events) == 2 + 4 + 6
+
+
+def test_profile_is_opt_in(catalog, folder):
+    setup_components(folder)
+
+    with catalog.profile() as profile:
+        catalog.render("Page")
+    catalog.render("Page")
+
+    assert profile.root.children["Page"].calls == 1
+
+
+def test_profile_source(catalog, folder):
+    setup_components(folder)
+
+    with catalog.profile() as profile:
+        catalog.render("Custom", _source="<Icon />")
+
+    custom = profile.root.children["Custom"]
+    assert custom.cache == {"source": 1}
+
+
+def test_export_collapsed(catalog, folder):
+    setup_components(folder)
+
+    with catalog.profile() as profile:
+        catalog.render("Page")
+
+    stacks = [line.rsplit(" ", 1)[0] for line in profile.to_collapsed().splitlines()]
+    assert stacks == ["Page", "Page;Card", "Page;Card;Icon"]
+
+
+def test_export_chrome_trace(catalog, folder):
+    setup_components(folder)
+
+    with catalog.profile() as profile:
+        catalog.render("Page")
+
+    trace = json.loads(profile.to_chrome_trace())
+    events = trace["traceEvents"]
+    assert len(events) == 6
+    assert {event["ph"] for event in events} == {"X"}
+    page = [event for event in events if event["name"] == "Page"][0]
+    assert page["args"] == {"depth": 0, "cache": "file"}
+
+
+def test_profile_irender_many(catalog, folder):
+    setup_components(folder)
+    (folder / "List.jinja").write_text("""
+{#def rows #}
+{{ catalog.irender_many("Card", rows, __prefix=__prefix) }}
+""")
+
+    with catalog.profile() as profile:
+        catalog.render("List", rows=[{"_content": "a"}, {"_content": "b"}])
+
+    card = profile.root.children["List"].children["Card"]
+    assert card.calls == 2
+    assert card.children["Icon"].calls == 2
@@ -893,3 +893,52 @@ def test_kebab_cased_component_names(catalog, folder, autoescape, undefined):
     assert catalog.render("KebabCased") == Markup("kebab")
     assert catalog.render("a_tricky-FOLDER.Greeting") == Markup("pascal")
     assert catalog.render("KebabFolder.KebabCased") == Markup("superkebab")
+
+
+@pytest.mark.parametrize("undefined", [jinja2.Undefined, jinja2.StrictUndefined])
+@pytest.mark.parametrize("autoescape", [True, False])
+def test_render_many(catalog, folder, autoescape, undefined):
+    catalog.jinja_env.autoescape = autoescape
+    catalog.jinja_env.undefined = undefined
+
+    (folder / "Row.jinja").write_text("""
+{#def name, size="md" #}
+{#css row.css #}
+<tr {{ attrs.render(class="size-" + size) }}><td>{{ name }}</td><td>{{ content }}</td></tr>
+""")
+
+    rows = [
+        {"name": "a"},
+        {"name": "b", "size": "lg", "_content": "B"},
+        {"name": "c", "_attrs": {"id": "c"}},
+    ]
+    html = catalog.render_many("Row", rows, sep="\n", size="sm")
+    assert html == Markup("""
+<tr class="size-sm"><td>a</td><td></td></tr>
+<tr class="size-lg"><td>b</td><td>B</td></tr>
+<tr class="size-sm" id="c"><td>c</td><td></td></tr>
+""".strip())
+    assert catalog.collected_css == ["row.css"]
+
+
+@pytest.mark.parametrize("undefined", [jinja2.Undefined, jinja2.StrictUndefined])
+@pytest.mark.parametrize("autoescape", [True, False])
+def test_irender_many_from_template(catalog, folder, autoescape, undefined):
+    catalog.jinja_env.autoescape = autoescape
+    catalog.jinja_env.undefined = undefined
+
+    (folder / "Item.jinja").write_text("""
+{#def label #}
+<li>{{ label }}</li>
+""")
+    (folder / "List.jinja").write_text("""
+{#def items #}
+<ul>{{ catalog.irender_many("Item", items, __prefix=__prefix) }}</ul>
+""")
+
+    items = [{"label": "<b>1</b>"}, {"label": "2"}]
+    html = catalog.render("List", items=items)
+    if autoescape:
+        assert html == Markup("<ul><li>&lt;b&gt;1&lt;/b&gt;</li><li>2</li></ul>")
+    else:
+        assert html == Markup("<ul><li><b>1</b></li><li>2</li></ul>")
@@ -0,0 +1,78 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import multiprocessing as mp
+
+import pytest
+from markupsafe import Markup
+
+import jinjax
+from jinjax import parallel
+
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in mp.get_all_start_methods(),
+    reason="requires the fork start method",
+)
+
+
+def test_render_pages(catalog, folder):
+    (folder / "Page.jinja").write_text("""
+{#def title #}
+{#css page.css #}
+{{ catalog.render_assets() }}
+<h1>{{ title }}</h1>
+""")
+
+    jobs = [("Page", {"title": f"Page {i}"}) for i in range(20)]
+    results = list(catalog.render_pages(jobs, workers=2, chunksize=3))
+
+    assert results == [
+        Markup(
+            '<link rel="stylesheet" href="/static/components/page.css">\n'
+            f"<h1>Page {i}</h1>"
+        )
+        for i in range(20)
+    ]
+
+
+def test_render_pages_to_files(catalog, folder, tmp_path):
+    (folder / "Page.jinja").write_text("""
+{#def title #}
+<h1>{{ title }}</h1>
+""")
+
+    out = tmp_path / "site"
+    jobs = [("Page", {"title": str(i)}, out / f"{i}" / "index.html") for i in range(5)]
+    results = list(catalog.render_pages(jobs, workers=2))
+
+    assert results == [str(out / f"{i}" / "index.html") for i in range(5)]
+    for i in range(5):
+        assert (out / f"{i}" / "index.html").read_text() == f"<h1>{i}</h1>"
+
+
+def test_render_pages_in_process(catalog, folder):
+    (folder / "Page.jinja").write_text("{#def title #}<h1>{{ title }}</h1>")
+
+    jobs = [("Page", {"title": "a"}), ("Page", {"title": "b"})]
+    results = list(catalog.render_pages(jobs, workers=1))
+    assert results == [Markup("<h1>a</h1>"), Markup("<h1>b</h1>")]
+
+
+def test_render_pages_of_two_catalogs(catalog, folder, tmp_path):
+    (folder / "Page.jinja").write_text("<h1>one</h1>")
+    other_folder = tmp_path / "other"
+    other_folder.mkdir()
+    (other_folder / "Page.jinja").write_text("<h1>two</h1>")
+    other = jinjax.Catalog(auto_reload=False)
+    other.add_folder(other_folder)
+
+    jobs = [("Page", {})] * 4
+    first = catalog.render_pages(jobs, workers=2)
+    assert next(first) == Markup("<h1>one</h1>")
+    assert parallel._catalog is None
+    # Started while the pool of the first catalog is still running
+    assert list(other.render_pages(jobs, workers=2)) == [Markup("<h1>two</h1>")] * 4
+    assert list(first) == [Markup("<h1>one</h1>")] * 3
+    assert parallel._catalog is None
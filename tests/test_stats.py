@@ -0,0 +1,90 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import time
+
+import pytest
+
+import jinjax
+
+
+@pytest.fixture()
+def catalog(folder):
+    catalog = jinjax.Catalog(collect_stats=True, fingerprint=True)
+    catalog.add_folder(folder)
+    return catalog
+
+
+def counts(catalog):
+    return {event: data["count"] for event, data in catalog.stats().items()}
+
+
+def test_stats_are_disabled_by_default(folder):
+    catalog = jinjax.Catalog()
+    catalog.add_folder(folder)
+    (folder / "Page.jinja").write_text("<p></p>")
+
+    catalog.render("Page")
+    assert catalog.stats() == {}
+
+
+def test_stats(catalog, folder):
+    (folder / "Icon.jinja").write_text("<i></i>")
+    (folder / "Icon.css").write_text("")
+    (folder / "Page.jinja").write_text("<Icon /><Icon />")
+
+    catalog.render("Page")
+    catalog.render("Page")
+    with pytest.raises(jinjax.ComponentNotFound):
+        catalog.render("Nope")
+
+    assert counts(catalog) == {
+        "cache.hit": 4,
+        "cache.miss": 3,
+        "cache.stale": 0,
+        "lookup": 3,
+        "preprocess": 2,
+        "compile": 2,
+        "fingerprint": 4,
+        "not_found": 1,
+        "template.evict": 0,
+    }
+    stats = catalog.stats()
+    assert stats["compile"]["time"] >= stats["preprocess"]["time"] > 0
+
+
+def test_stale_stats(catalog, folder):
+    (folder / "Page.jinja").write_text("<p>1</p>")
+    catalog.render("Page")
+
+    time.sleep(0.01)
+    (folder / "Page.jinja").write_text("<p>2</p>")
+    catalog.render("Page")
+
+    assert counts(catalog)["cache.stale"] == 1
+    assert counts(catalog)["compile"] == 2
+
+
+def test_reset_stats(catalog, folder):
+    (folder / "Page.jinja").write_text("<p></p>")
+    catalog.render("Page")
+    catalog.reset_stats()
+
+    assert set(counts(catalog).values()) == {0}
+
+
+def test_stats_hooks(folder):
+    catalog = jinjax.Catalog()
+    catalog.add_folder(folder)
+    (folder / "Page.jinja").write_text("<p></p>")
+
+    recorded = []
+    catalog.add_stats_hook(lambda event, duration: recorded.append(event))
+    catalog.render("Page")
+    catalog.render("Page")
+
+    assert recorded == [
+        "cache.miss", "lookup", "preprocess", "compile", "cache.hit",
+    ]
+    assert counts(catalog)["cache.hit"] == 1
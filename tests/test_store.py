@@ -0,0 +1,170 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+import pytest
+from markupsafe import Markup
+
+import jinjax
+from jinjax.store import ComponentStore, StoredFile
+
+
+COMPONENTS = {
+    "Card.jinja": "{#css card.css #}<div><Button>{{ content }}</Button></div>",
+    "Button.jinja": (
+        "{#def kind='button' #}<button type={{ kind }}>{{ content }}</button>"
+    ),
+    "forms/index.jinja": "<form></form>",
+    "forms/Input.jinja": "{#def type='text' #}<input type={{ type }}>",
+}
+
+
+@pytest.fixture()
+def database(tmp_path):
+    return tmp_path / "components.db"
+
+
+@pytest.fixture()
+def store(database):
+    store = ComponentStore(database, namespace="acme")
+    store.put_many(COMPONENTS)
+    yield store
+    store.close()
+
+
+def test_add_store(store):
+    catalog = jinjax.Catalog()
+    catalog.add_store(store, prefix="acme")
+
+    html = catalog.render("acme:Card", _content="Hi")
+    assert html == Markup("<div><button type=button>Hi</button></div>")
+    assert catalog.collected_css == ["acme/card.css"]
+    assert catalog.render("acme:forms") == Markup("<form></form>")
+    html = catalog.render("acme:forms.Input", type="email")
+    assert html == Markup("<input type=email>")
+    # Not a folder, so it can't be served by the middleware
+    assert catalog.paths == []
+
+
+def test_metadata_is_stored(store):
+    row = store.get("forms/Input.jinja")
+    assert row.version == 1
+    assert row.metadata == {
+        "required": [],
+        "optional": {"type": "text"},
+        "css": [],
+        "js": [],
+        "pure": False,
+    }
+
+    catalog = jinjax.Catalog()
+    catalog.add_store(store, prefix="acme")
+    component = catalog._get_component("acme:Card")
+    assert isinstance(component.path, StoredFile)
+    assert component.css == ["acme/card.css"]
+    assert component.mtime == 1
+
+
+def test_metadata_not_stored_as_json(store):
+    assert store.put("Tags.jinja", "{#def tags={1, 2} #}<i>{{ tags|length }}</i>") == 1
+    assert store.get("Tags.jinja").metadata is None
+
+    catalog = jinjax.Catalog()
+    catalog.add_store(store)
+    assert catalog.render("Tags") == Markup("<i>2</i>")
+
+
+def test_invalid_component_is_not_stored(store):
+    with pytest.raises(jinjax.DuplicateDefDeclaration):
+        store.put("Bad.jinja", "{#def a #}{#def b #}")
+    assert store.get("Bad.jinja") is None
+
+
+def test_namespaces(store, database):
+    other = ComponentStore(database, namespace="other")
+    other.put("Card.jinja", "<p>other</p>")
+
+    catalog = jinjax.Catalog()
+    catalog.add_store(store, prefix="acme")
+    catalog.add_store(database, prefix="other", namespace="other")
+
+    assert catalog.render("other:Card") == Markup("<p>other</p>")
+    assert "<div>" in catalog.render("acme:Card")
+    other.close()
+
+
+def test_new_version_with_auto_reload(store):
+    catalog = jinjax.Catalog(auto_reload=True)
+    catalog.add_store(store, prefix="acme")
+    assert catalog.render("acme:forms") == Markup("<form></form>")
+
+    assert store.put("forms/index.jinja", "<form>v2</form>") == 2
+    assert catalog.render("acme:forms") == Markup("<form>v2</form>")
+
+
+def test_changed_by_another_connection(store, database):
+    catalog = jinjax.Catalog(auto_reload=True)
+    catalog.add_store(store, prefix="acme")
+    assert catalog.render("acme:forms") == Markup("<form></form>")
+
+    writer = ComponentStore(database, namespace="acme")
+    writer.put("forms/index.jinja", "<form>v2</form>")
+    writer.put("New.jinja", "<p>new</p>")
+    assert catalog.render("acme:forms") == Markup("<form>v2</form>")
+    assert catalog.render("acme:New") == Markup("<p>new</p>")
+
+    writer.delete("New.jinja")
+    with pytest.raises(jinjax.ComponentNotFound):
+        catalog.render("acme:New")
+    writer.close()
+
+
+def test_preload(store, database, monkeypatch):
+    catalog = jinjax.Catalog(auto_reload=False)
+    catalog.add_store(store, prefix="acme")
+    assert catalog.preload("acme") == 4
+
+    # Everything is already loaded and compiled
+    def fail(*args, **kwargs):
+        raise AssertionError("read")
+
+    monkeypatch.setattr(ComponentStore, "get", fail)
+    assert catalog.render("acme:forms") == Markup("<form></form>")
+    monkeypatch.undo()
+
+    writer = ComponentStore(database, namespace="acme")
+    writer.put("forms/index.jinja", "<form>v2</form>")
+    writer.put("New.jinja", "<p>new</p>")
+    writer.close()
+    # Without `auto_reload` the changes are seen only after preloading
+    assert catalog.render("acme:forms") == Markup("<form></form>")
+    assert catalog.preload("acme") == 5
+    assert catalog.render("acme:forms") == Markup("<form>v2</form>")
+    assert catalog.render("acme:New") == Markup("<p>new</p>")
+
+
+def test_preload_unknown_prefix(store):
+    catalog = jinjax.Catalog()
+    with pytest.raises(jinjax.catalog.UnknownPrefix):
+        catalog.preload("acme")
+
+
+def test_store_overrides_folder(store, folder):
+    (folder / "Button.jinja").write_text("<b>{{ content }}</b>")
+    (folder / "Other.jinja").write_text("<i></i>")
+    catalog = jinjax.Catalog()
+    catalog.add_store(store, prefix="acme")
+    catalog.add_folder(folder, prefix="acme")
+
+    assert "<button" in catalog.render("acme:Card", _content="Hi")
+    assert catalog.render("acme:Other") == Markup("<i></i>")
+
+
+def test_stored_components_are_not_inlined(store):
+    store.put("Page.jinja", "<p><forms.Input /></p>")
+    catalog = jinjax.Catalog(auto_reload=True, inline_components=True)
+    catalog.add_store(store)
+    assert catalog.render("Page") == Markup("<p><input type=text></p>")
+
+    store.put("forms/Input.jinja", "<input>")
+    assert catalog.render("Page") == Markup("<p><input></p>")
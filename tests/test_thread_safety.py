@@ -189,3 +189,32 @@ def test_thread_safety_of_template_globals(catalog, folder):
 
     for i, result in enumerate(results):
         assert result == Markup(str(i))
+
+
+def test_thread_safety_of_prefixes(tmp_path):
+    NUM_THREADS = 8
+    NUM_RENDERS = 50
+
+    catalog = jinjax.Catalog(auto_reload=False)
+    for i in range(NUM_THREADS):
+        folder = tmp_path / f"lib{i}"
+        folder.mkdir()
+        (folder / "Card.jinja").write_text(f"<div>lib{i}</div>")
+        catalog.add_folder(folder, prefix=f"lib{i}")
+
+    def render(i):
+        return {
+            str(catalog.render(f"lib{i}:Card"))
+            for _ in range(NUM_RENDERS)
+        }
+
+    threads = []
+    for i in range(NUM_THREADS):
+        thread = ThreadWithReturnValue(target=render, args=(i,))
+        threads.append(thread)
+        thread.start()
+
+    results = [thread.join() for thread in threads]
+
+    for i, result in enumerate(results):
+        assert result == {f"<div>lib{i}</div>"}
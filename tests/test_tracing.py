@@ -0,0 +1,113 @@
+"""
+JinjaX
+Copyright (c) Juan-Pablo Scaletti <juanpablo@jpscaletti.com>
+"""
+from contextlib import contextmanager
+
+import pytest
+
+import jinjax
+
+
+class Span:
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+        self.attributes = {}
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class InMemoryTracer:
+    """Records the spans like an OpenTelemetry tracer with an
+    in-memory exporter would."""
+
+    def __init__(self):
+        self.spans = []
+        self._current = None
+
+    @contextmanager
+    def start_as_current_span(self, name, **kwargs):
+        span = Span(name, self._current)
+        parent, self._current = self._current, span
+        try:
+            yield span
+        finally:
+            self._current = parent
+            self.spans.append(span)
+
+
+@pytest.fixture()
+def tracer():
+    return InMemoryTracer()
+
+
+def setup_components(folder):
+    (folder / "Icon.jinja").write_text("<i></i>")
+    (folder / "Card.jinja").write_text("<div><Icon /></div>")
+    (folder / "Page.jinja").write_text("<Card /><Card />")
+
+
+def test_render_span(folder, tracer):
+    catalog = jinjax.Catalog(tracer=tracer, trace_depth=0)
+    catalog.add_folder(folder)
+    setup_components(folder)
+
+    catalog.render("Page")
+    catalog.render("Page")
+
+    assert [span.name for span in tracer.spans] == ["jinjax.render", "jinjax.render"]
+    first, second = tracer.spans
+    assert first.attributes == {
+        "jinjax.component": "Page",
+        "jinjax.prefix": "",
+        "jinjax.cache": "file",
+        "jinjax.output_size": len("<div><i></i></div><div><i></i></div>"),
+    }
+    assert second.attributes["jinjax.cache"] == "cache"
+
+
+def test_nested_spans_depth(folder, tracer):
+    catalog = jinjax.Catalog(tracer=tracer, trace_depth=1)
+    catalog.add_folder(folder)
+    setup_components(folder)
+
+    catalog.render("Page")
+
+    names = [(span.name, span.attributes["jinjax.component"]) for span in tracer.spans]
+    assert names == [
+        ("jinjax.component", "Card"),
+        ("jinjax.component", "Card"),
+        ("jinjax.render", "Page"),
+    ]
+    root = tracer.spans[-1]
+    assert tracer.spans[0].parent is root
+
+
+def test_sampling(folder, tracer):
+    catalog = jinjax.Catalog(tracer=tracer, trace_sample_rate=0)
+    catalog.add_folder(folder)
+    setup_components(folder)
+
+    catalog.render("Page")
+    assert tracer.spans == []
+
+
+def test_irender_many_spans(folder, tracer):
+    catalog = jinjax.Catalog(tracer=tracer, trace_depth=1)
+    catalog.add_folder(folder)
+    setup_components(folder)
+    (folder / "List.jinja").write_text(
+        '{#def rows #}{{ catalog.irender_many("Card", rows, __prefix=__prefix) }}'
+    )
+
+    catalog.render("List", rows=[{}, {}, {}])
+
+    names = [(span.name, span.attributes["jinjax.component"]) for span in tracer.spans]
+    assert names == [
+        ("jinjax.component", "Card"),
+        ("jinjax.component", "Card"),
+        ("jinjax.component", "Card"),
+        ("jinjax.render", "List"),
+    ]